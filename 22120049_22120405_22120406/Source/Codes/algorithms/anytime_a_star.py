@@ -0,0 +1,153 @@
+import math
+import time
+
+from .a_star import AStar
+from .base_search import Solution
+from ..data_structures.priority_queue import WeightedPriorityQueue
+from ..core.grid import Grid
+from ..core.node import Node
+
+
+class AnytimeAStar(AStar):
+    """
+    Anytime weighted A*: a weighted A* search that keeps going after its first solution. The frontier is
+    ordered by g + w * h, so a first solution is found quickly with a high weight w. Every solution becomes
+    the incumbent, whose weight bounds the rest of the search: nodes with g + h at least as large cannot
+    lead to a better one and are pruned. After each improvement w is lowered by `weight_step` (down to 1)
+    and the frontier reordered.
+
+    With an inflated heuristic a state may be first expanded through a costlier path, so expanded states
+    are reopened when a cheaper path to them is found. When the frontier is exhausted (or, at w = 1, its
+    lowest f reaches the incumbent) the last solution is weight-optimal, like AStar's. Stopped early by a
+    limit (see BaseSearch), the search still returns the best solution found so far, as a solved Solution
+    whose stop_reason tells that it was not proven optimal.
+
+    Improving solutions can be followed with the `improvements` generator or the `on_solution` callback.
+
+    Args:
+        grid (Grid): The level to solve.
+        heuristic_weight (float): The initial weight w of the heuristic cost.
+        weight_step (float): How much w is lowered after each improvement.
+        on_solution (callable, optional): Called with the Solution of each improvement.
+    """
+
+    def __init__(
+        self,
+        grid: Grid,
+        push_level: bool = True,
+        heuristic_weight: float = 3.0,
+        weight_step: float = 0.5,
+        on_solution=None,
+        **kwargs,
+    ) -> None:
+        super().__init__(
+            grid,
+            WeightedPriorityQueue(heuristic_weight),
+            push_level=push_level,
+            **kwargs,
+        )
+        self.weight_step = weight_step
+        self.on_solution = on_solution
+        self.closed = {}  # State key -> (g, steps) of its last expansion
+        self.solutions = []  # The Solution of each improvement, in order
+        self.optimal = False  # Whether the last solution was proven weight-optimal
+
+    def search(self) -> bool:
+        for _ in self.improvements():
+            pass
+        return self.solution.status == "solved"
+
+    def improvements(self):
+        """
+        Run the search, yielding each time a better solution is found. The final Solution (the best one,
+        with the statistics of the whole search) is then available from `get_solution`, also when the
+        iteration is stopped early (the search then counts as cancelled).
+
+        Yields:
+            Solution: Each improving solution, not yet proven optimal. Its time and node count are those
+            of the search when it was found, and its memory is the current estimate of the instrumentation.
+        """
+        self.begin()
+        frontier = self.next_node_data_structure
+        root = self.create_root()
+        frontier.add(root)
+        self.best_g[self.frontier_key(root)] = (root.g_cost, root.steps)
+
+        incumbent = None
+        bound = math.inf  # The weight of the incumbent
+
+        finished = False
+        try:
+            while not frontier.is_empty():
+                if self.node_count >= self.next_check and self.check_limits():
+                    break
+                node = frontier.pop()
+                key = self.frontier_key(node)
+                best = self.best_g.get(key)
+                if best is None or (node.g_cost, node.steps) > best:
+                    continue  # Stale entry
+                del self.best_g[key]
+                if node.total_cost() >= bound:
+                    if frontier.weight == 1:
+                        break  # Ordered by f: no node left can beat the incumbent
+                    continue
+                self.node_count += 1
+                if self.node_count >= self.next_observation:
+                    self.observe(node)
+                self.closed[key] = (node.g_cost, node.steps)
+
+                if self.is_goal_state(node):
+                    incumbent, bound = node, node.g_cost
+                    solution = self.report(node)
+                    self.solutions.append(solution)
+                    if self.on_solution is not None:
+                        self.on_solution(solution)
+                    yield solution
+                    frontier.reweight(max(1.0, frontier.weight - self.weight_step), bound)
+                    continue
+
+                children = []
+                for move in self.successors(node.position, node.stones, self.deadlock_detector):
+                    child_node = self.perform_move(node, move)
+                    if child_node.g_cost >= bound:
+                        continue
+                    cost = (child_node.g_cost, child_node.steps)
+                    key = self.frontier_key(child_node)
+                    closed = self.closed.get(key)
+                    if closed is not None and cost >= closed:
+                        continue  # Already expanded through a path at least as cheap
+                    best = self.best_g.get(key)
+                    if best is not None and cost >= best:
+                        continue
+                    self.best_g[key] = cost
+                    children.append(child_node)
+
+                self.evaluate_children(node, children)
+                for child_node in children:
+                    if child_node.h_cost == math.inf:
+                        self.deadlock_detector.counts["assignment"] += 1
+                    elif child_node.total_cost() < bound:
+                        frontier.add(child_node)
+            finished = True
+        finally:
+            # Also reached when the caller stops iterating early, which stops the search like a limit
+            if not finished and self.stop_reason is None:
+                self.stop_reason = "cancelled"
+            self.optimal = incumbent is not None and self.stop_reason is None
+            self.finish(incumbent)
+
+    def report(self, goal_node: Node) -> Solution:
+        """Build the Solution of an improvement, with the statistics of the search so far."""
+        path = self.build_path(goal_node)
+        return Solution(
+            len(path),
+            goal_node.weight,
+            self.node_count,
+            (time.perf_counter() - self.start_time) * 1000,
+            self.instrumentation.current(),
+            path,
+            dict(self.deadlock_detector.counts),
+        )
+
+    def visited_size(self) -> int:
+        return len(self.closed)
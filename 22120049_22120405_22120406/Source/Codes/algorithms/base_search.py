@@ -1,9 +1,12 @@
 from ..data_structures.base_data_structure import BaseDataStructure
+from ..core.board import Board
+from ..core.deadlock import DeadlockDetector
 from ..core.grid import Grid
 from ..core.node import Node
-from ..configs.constants import MOVEMENTS
+from ..profiling.instrumentation import RSSInstrumentation, create_instrumentation
+from .cancellation import CancellationToken
+import math
 import time
-import tracemalloc
 from abc import ABC, abstractmethod
 from time import sleep
 
@@ -17,9 +20,22 @@ class Solution:
         steps (int): The number of steps taken to reach the goal.
         weight (int): The total weight or cost of the path to the goal.
         node_count (int): The total number of nodes visited during the search.
-        time (float): The execution time of the search algorithm in milliseconds.
-        memory (float): The peak memory usage of the search algorithm in MB.
+        time (float): The execution time of the search algorithm in milliseconds, from the start of the
+            search to the end of the path reconstruction.
+        memory (float): The peak memory usage of the search algorithm in MB, as measured by the
+            instrumentation mode of the search (0 when it is off).
         path (str): The sequence of actions or moves taken to reach the goal state.
+        deadlocks (dict(str, int)): How many child states each deadlock check pruned.
+        members (dict(str, dict)): For a portfolio run, the statistics of each raced algorithm.
+        phases (dict(str, float)): The time of each phase in milliseconds: "preprocessing" (building
+            the board, deadlock and heuristic tables), "search" and "path" (rebuilding the moves).
+        status (str): "solved", "failed" (the whole state space was searched), or why the search was
+            stopped early: "cancelled", "timeout", "node_limit" or "memory_limit". Only solved solutions
+            have a path; the other fields describe the partial search.
+        cached (bool): Whether the solution was read from a SolutionCache instead of searched.
+        stop_reason (str or None): Why the search was stopped before it ran to completion, None if it
+            was not. A solved solution with a stop reason is the best one found so far by an anytime
+            search, without the guarantee of its algorithm.
 
     Methods:
         __str__(): Returns a formatted string representation of the solution,
@@ -28,7 +44,19 @@ class Solution:
     """
 
     def __init__(
-        self, steps: int, weight: int, node_count: int, time, memory: float, path: str
+        self,
+        steps: int,
+        weight: int,
+        node_count: int,
+        time,
+        memory: float,
+        path: str,
+        deadlocks: dict[str, int] | None = None,
+        members: dict[str, dict] | None = None,
+        phases: dict[str, float] | None = None,
+        status: str = "solved",
+        cached: bool = False,
+        stop_reason: str | None = None,
     ) -> None:
         self.steps = steps
         self.weight = weight
@@ -36,6 +64,12 @@ class Solution:
         self.time = time
         self.memory = memory
         self.path = path
+        self.deadlocks = deadlocks or {}
+        self.members = members or {}
+        self.phases = phases or {}
+        self.status = status
+        self.cached = cached
+        self.stop_reason = stop_reason
 
     def __str__(self) -> str:
         return (
@@ -45,64 +79,273 @@ class Solution:
 
 
 class BaseSearch(ABC):
-    def __init__(self, next_node_data_structure: BaseDataStructure, grid: Grid) -> None:
+    """
+    Base class of the search algorithms. Subclasses choose the frontier data structure and the g and h costs.
+
+    The search runs either on single steps (every move of Ares is a node) or on pushes (every node is
+    one push away from its parent and Ares' position is reduced to the region it can walk in). The
+    push-level state space is much smaller; the walks between pushes are only rebuilt when the solution
+    is emitted, and they still count toward `Node.steps` and the solution's step count.
+
+    Visited states are stored by their 64-bit Zobrist hash, which every child gets from its parent with
+    two or three XORs instead of rehashing all its stones.
+
+    States are closed when they are popped. Until then, `best_g` holds the best (g_cost, steps) of every
+    state on the frontier: a child that is not better than the copy already queued is dropped, and a
+    popped node that was superseded by a better copy (a stale entry) is skipped, so the frontier holds
+    few duplicates and UCS / A* keep their optimality with weighted costs.
+
+    Args:
+        next_node_data_structure (BaseDataStructure): The frontier.
+        grid (Grid): The level to solve.
+        push_level (bool): Search on pushes instead of single steps.
+        verify_states (bool): Also store the full state of every visited hash, so that two states with
+            colliding hashes are never mistaken for one another.
+        instrumentation (str): How memory is measured: "off", "rss" (cheap sampling of the process'
+            resident set size) or "tracemalloc" (exact, but slows the search down).
+        observer (callable, optional): Receives live telemetry (see SearchObserver). Without one, the
+            expansion loop only pays an integer comparison.
+        observe_every (int): The number of expansions between two observer calls.
+        cancel_token (CancellationToken, optional): Stops the search when cancelled.
+        time_limit (float, optional): The wall-clock budget of the search in seconds.
+        node_limit (int, optional): The maximum number of expansions.
+        memory_limit (float, optional): The resident set size of the process, in MB, at which the search
+            stops.
+        symmetry (bool): On levels with automorphisms (see Board.find_automorphisms), hash every state
+            as its symmetry class, so a mirrored or rotated copy of a visited state counts as visited.
+            Nodes keep their real states, so paths need no mapping. Every child is then hashed from
+            scratch under each automorphism, after a flood fill of its region in push-level searches,
+            so it only pays off on symmetric levels with large state spaces. Not used when verifying
+            states, which compares exact states.
+        macros (bool): Let push-level searches push stones through tunnels and into the goal room in
+            one action (see Board.follow_push). Goal-room macros fill the switches in a fixed order, so
+            the optimality guarantees only hold without them.
+        packing (bool): Refuse pushes that leave a stone for good on a switch before the switches it
+            blocks are filled (see Board.packing_prerequisites). Such pushes are deadlocks, so no solution
+            is lost.
+
+    The limits are checked before the first expansion and then every CHECK_INTERVAL expansions (the node
+    limit exactly), and a search that hits one returns a partial Solution whose status tells which.
+    """
+
+    CHECK_INTERVAL = 256
+
+    def __init__(
+        self,
+        next_node_data_structure: BaseDataStructure,
+        grid: Grid,
+        push_level: bool = False,
+        verify_states: bool = False,
+        instrumentation: str = "rss",
+        observer=None,
+        observe_every: int = 1000,
+        cancel_token: CancellationToken | None = None,
+        time_limit: float | None = None,
+        node_limit: int | None = None,
+        memory_limit: float | None = None,
+        symmetry: bool = False,
+        macros: bool = False,
+        packing: bool = False,
+    ) -> None:
+        self.created_time = time.perf_counter()  # Preprocessing lasts until the search starts
         self.next_node_data_structure = next_node_data_structure
         self.grid = grid
-        self.visited = set[Node]()  # Set of visited nodes
+        self.board = Board(grid, macros, packing)  # Static walls, switches and neighbor tables used while searching
+        self.push_level = push_level
+        self.deadlock_detector = DeadlockDetector(self.board)
+        self.successors = (
+            self.board.push_successors if push_level else self.board.successors
+        )
+        self.verify_states = verify_states
+        self.symmetry = symmetry and not verify_states and bool(self.board.automorphisms)
+        # Zobrist hashes of visited states, mapped to the full state when verifying
+        self.visited: set[int] | dict[int, tuple] = {} if verify_states else set()
+        self.collisions = set()  # Full states whose hash was already taken by another state
+        self.best_g = {}  # Best (g_cost, steps) of each state on the frontier
         self.node_count = 0  # Number of nodes visited
-        self.weight = [0]
         self.path = ""  # Path to the goal state
+        self.result_weight = 0  # Total weight pushed on the path to the goal state
         self.execution_time = 0.0  # To store execution time in milliseconds
         self.memory_used = 0.0  # To store peak memory usage in MB
-        # Start memory tracking
-        tracemalloc.start()
-
+        self.instrumentation = create_instrumentation(instrumentation)
+        self.phases = {}  # Time of each phase in milliseconds
+        self.start_time = self.created_time
+        self.observer = observer
+        self.observe_every = observe_every
+        # Expansion count of the next observer call, never reached without an observer
+        self.next_observation = observe_every if observer is not None else math.inf
+        self.cancel_token = cancel_token
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.memory_limit = memory_limit
+        self.deadline = None
+        self.stop_reason = None  # The limit that stopped the search, if any
+        # Expansion count of the next limit check, never reached without limits
+        self.next_check = math.inf
+
+    def begin(self) -> None:
+        """Start the timer and the memory measurement. Every search calls it first, and `finish` last."""
         self.start_time = time.perf_counter()
+        self.phases["preprocessing"] = (self.start_time - self.created_time) * 1000
+        self.instrumentation.start()
+        if self.time_limit is not None:
+            self.deadline = self.start_time + self.time_limit
+        limits = (self.cancel_token, self.time_limit, self.node_limit, self.memory_limit)
+        if any(limit is not None for limit in limits):
+            # Checked before the first expansion too, so even a short search honors a spent budget
+            self.next_check = self.node_count
+
+    def schedule_check(self) -> None:
+        """Set the expansion count of the next limit check."""
+        self.next_check = self.node_count + self.CHECK_INTERVAL
+        if self.node_limit is not None:
+            self.next_check = min(self.next_check, self.node_limit)
+
+    def check_limits(self) -> bool:
+        """
+        Check the cancellation token and the budgets, and schedule the next check.
 
-    def search(self) -> bool:
-        # print("Len before search: " + str(len(self.next_node_data_structure)))
+        Returns:
+            bool: True if the search must stop; `stop_reason` then tells why.
+        """
+        if self.cancel_token is not None and self.cancel_token.cancelled:
+            self.stop_reason = "cancelled"
+        elif self.node_limit is not None and self.node_count >= self.node_limit:
+            self.stop_reason = "node_limit"
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.stop_reason = "timeout"
+        elif (
+            self.memory_limit is not None
+            and RSSInstrumentation.read_rss() >= self.memory_limit
+        ):
+            self.stop_reason = "memory_limit"
+        self.schedule_check()
+        return self.stop_reason is not None
+
+    def create_root(self) -> Node:
+        """Create the node of the initial state, with its heuristic cost."""
+        position, stones = self.board.start_position, self.board.start_stones
+        region = self.board.normalize(position, stones) if self.push_level else position
         init_node = Node(
-            position=self.grid.ares_position,
-            stones=sorted(
-                [(row, col, weight) for (row, col), weight in self.grid.stones.items()],
-                key=lambda x: (x[0], x[1]),  # Sort by row, then by column
-            ),
+            position=position,
+            stones=stones,
+            region=region,
+            zobrist=self.state_key(position, stones, region),
         )
+        init_node.h_cost = self.calculate_h(init_node)
+        return init_node
+
+    def search(self) -> bool:
+        self.begin()
+        init_node = self.create_root()
         self.next_node_data_structure.add(init_node)
+        self.best_g[self.frontier_key(init_node)] = (init_node.g_cost, init_node.steps)
 
-        flag = False
+        goal_node = None
 
         while not self.next_node_data_structure.is_empty():
+            if self.node_count >= self.next_check and self.check_limits():
+                break
             node = self.next_node_data_structure.pop()
+            key = self.frontier_key(node)
+            best = self.best_g.get(key)
+            if best is None or (node.g_cost, node.steps) > best:
+                # Stale entry: the state was already expanded or a better copy is still queued
+                continue
+            del self.best_g[key]
             self.node_count += 1
+            if self.node_count >= self.next_observation:
+                self.observe(node)
 
-            self.visited.add(node)
+            self.mark_visited(node)
 
             if self.is_goal_state(node):
-                self.path = "".join(node.get_path())
-                self.result_weight = node.weight
-                flag = True
+                goal_node = node
                 break
 
-            for direction in MOVEMENTS:
-                self.grid.reset_grid(node.position, node.stones)
-                child_node = self.perform_move(node, direction)
+            children = []
+            for move in self.successors(node.position, node.stones, self.deadlock_detector):
+                child_node = self.perform_move(node, move)
+                if self.is_visited(child_node):
+                    continue
+
+                cost = (child_node.g_cost, child_node.steps)
+                key = self.frontier_key(child_node)
+                best = self.best_g.get(key)
+                if best is not None and cost >= best:
+                    continue  # An equal or better copy is already queued
+                self.best_g[key] = cost
+                children.append(child_node)
+
+            # Heuristics are evaluated once for all the new children of the node
+            self.evaluate_children(node, children)
+            for child_node in children:
+                if child_node.h_cost == math.inf:
+                    # The stones cannot all be matched to reachable switches
+                    self.deadlock_detector.counts["assignment"] += 1
+                    continue
+                self.next_node_data_structure.add(child_node)
+
+        return self.finish(goal_node)
+
+    def observe(self, node: Node | None, finished: bool = False) -> None:
+        """
+        Send a telemetry sample to the observer (see SearchObserver) and schedule the next one.
+
+        Args:
+            node (Node or None): The node just expanded.
+            finished (bool): Whether this is the last sample of the search.
+        """
+        self.next_observation = self.node_count + self.observe_every
+        elapsed = time.perf_counter() - self.start_time
+        self.observer(
+            {
+                "node_count": self.node_count,
+                "elapsed": elapsed * 1000,
+                "frontier": self.frontier_size(),
+                "visited": self.visited_size(),
+                "best_f": node.total_cost() if node is not None else None,
+                "nodes_per_second": self.node_count / elapsed if elapsed > 0 else 0.0,
+                "memory": self.instrumentation.current(),
+                "deadlocks": dict(self.deadlock_detector.counts),
+                "finished": finished,
+            }
+        )
+
+    def frontier_size(self) -> int:
+        """Return the number of nodes waiting to be expanded, for telemetry."""
+        return len(self.next_node_data_structure)
+
+    def visited_size(self) -> int:
+        """Return the number of states in the visited table, for telemetry."""
+        return len(self.visited)
+
+    def finish(self, goal_node: Node | None) -> bool:
+        """
+        Stop the measurements and build the Solution of the search.
+
+        Args:
+            goal_node (Node or None): The goal node that was reached, or None if the search failed.
+
+        Returns:
+            bool: True if a goal was reached, False otherwise.
+        """
+        search_time = time.perf_counter()
+        if goal_node is not None:
+            self.path = self.build_path(goal_node)
+            self.result_weight = goal_node.weight
 
-                if child_node is not None and child_node not in self.visited:
-                    self.next_node_data_structure.add(child_node)
+        if self.observer is not None:
+            self.observe(goal_node, finished=True)
 
         # Stop the timer
         self.end_time = time.perf_counter()
+        self.memory_used = self.instrumentation.stop()
 
-        # Stop memory tracking and get peak memory
-        _, peak_memory = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
-
-        # Calculate time and memory usage
-        self.execution_time = (
-            self.end_time - self.start_time
-        ) * 1000  # Convert to milliseconds
-        self.memory_used = peak_memory / (1024 * 1024)  # Convert to MB
+        # Calculate time in milliseconds
+        self.execution_time = (self.end_time - self.start_time) * 1000
+        self.phases["search"] = (search_time - self.start_time) * 1000
+        self.phases["path"] = (self.end_time - search_time) * 1000
 
         self.solution = Solution(
             len(self.path),
@@ -111,47 +354,135 @@ class BaseSearch(ABC):
             self.execution_time,
             self.memory_used,
             self.path,
+            dict(self.deadlock_detector.counts),
+            phases=dict(self.phases),
+            status="solved" if goal_node is not None else self.stop_reason or "failed",
+            stop_reason=self.stop_reason,
         )
 
-        return flag
+        return goal_node is not None
 
-    def perform_move(self, node: Node, direction: str) -> Node | None:
+    def perform_move(self, node: Node, move: tuple) -> Node:
         """
-        Perform an action on the current node.
+        Build the child node for a move generated by the board. Its heuristic cost is set afterwards by
+        `evaluate_children`.
 
         Args:
             node (Node): The current node.
-            direction (str): The action to be performed.
+            move (tuple): (action, new_position, new_stones, push_cost, steps, region, stone_key) as
+                yielded by Board.successors or Board.push_successors.
 
         Returns:
             Node: The resulting node after performing the action.
         """
-        prev_weight = self.weight[0]
-        action, push_cost = self.grid.move_ares(direction, weight=self.weight)
-
-        if not action:
-            return None
+        action, position, stones, push_cost, steps, region, stone_key = move
+        if self.symmetry:
+            zobrist = self.state_key(position, stones, region)
+        else:
+            zobrist_ares = self.board.zobrist_ares
+            zobrist = (
+                node.zobrist ^ stone_key ^ zobrist_ares[node.region] ^ zobrist_ares[region]
+            )
 
         # Create new node
         new_node = Node(
-            position=self.grid.ares_position,
-            stones=sorted(
-                [
-                    (row, col, weight)
-                    for (row, col), weight in self.grid.current_stones.items()
-                ],
-                key=lambda x: (x[0], x[1]),  # Sort by row, then by column
-            ),
+            position=position,
+            stones=stones,
             parent=node,
             action=action,
-            weight=node.weight + self.weight[0] - prev_weight,
+            weight=node.weight + push_cost,
+            steps=node.steps + steps,
+            region=region,
+            zobrist=zobrist,
         )
 
         new_node.g_cost = self.calculate_g(new_node, push_cost)
-        new_node.h_cost = self.calculate_h(new_node)
 
         return new_node
 
+    def state_key(self, position: int, stones: tuple[int, ...], region: int) -> int:
+        """
+        Compute the hash of a state from scratch: its Zobrist hash, or that of its symmetry class when
+        symmetry reduction is on (see Board.symmetric_zobrist).
+        """
+        zobrist = self.board.zobrist(region, stones)
+        if not self.symmetry:
+            return zobrist
+        cells = self.board.walk_distances(position, stones) if self.push_level else (position,)
+        return self.board.symmetric_zobrist(cells, stones, zobrist)
+
+    def evaluate_children(self, node: Node, children: list[Node]) -> None:
+        """
+        Set the heuristic cost of the new children of an expanded node. Subclasses with an expensive
+        heuristic can override this to evaluate all children in one batch.
+
+        Args:
+            node (Node): The expanded node.
+            children (list of Node): Its children that are about to be queued.
+        """
+        for child_node in children:
+            child_node.h_cost = self.calculate_h(child_node)
+
+    def frontier_key(self, node: Node) -> int | tuple:
+        """Return the key of a node's state in `best_g`: its hash, or the full state when verifying."""
+        if self.verify_states:
+            return (node.region, node.stones)
+        return node.zobrist
+
+    def mark_visited(self, node: Node) -> None:
+        """Add the state of a node to the visited table."""
+        if not self.verify_states:
+            self.visited.add(node.zobrist)
+            return
+        state = (node.region, node.stones)
+        if self.visited.setdefault(node.zobrist, state) != state:
+            self.collisions.add(state)
+
+    def is_visited(self, node: Node) -> bool:
+        """Check if the state of a node is in the visited table."""
+        if not self.verify_states:
+            return node.zobrist in self.visited
+        stored = self.visited.get(node.zobrist)
+        if stored is None:
+            return False
+        state = (node.region, node.stones)
+        return stored == state or state in self.collisions
+
+    def build_path(self, node: Node) -> str:
+        """
+        Rebuild the full move sequence leading to a node.
+
+        In a push-level search each action is a push (or a macro starting with one, see
+        Board.follow_push), so the walk from the previous position of Ares to the cell where the action
+        starts is inserted before it.
+
+        Args:
+            node (Node): The goal node.
+
+        Returns:
+            str: The moves, lowercase for walking and uppercase for pushing.
+        """
+        if not self.push_level:
+            return "".join(node.get_path())
+
+        chain = []
+        while node:
+            chain.append(node)
+            node = node.parent
+        chain.reverse()
+
+        board = self.board
+        moves = []
+        for parent, child in zip(chain, chain[1:]):
+            # Retrace the action (a push, or a whole macro) back to where Ares started it
+            origin = child.position
+            for move in reversed(child.action):
+                direction = board.directions.index(move.upper())
+                origin = board.neighbors[origin][board.opposite[direction]]
+            moves.append(board.walk_path(parent.position, origin, parent.stones))
+            moves.append(child.action)
+        return "".join(moves)
+
     def is_goal_state(self, node: Node) -> bool:
         """
         Checks if the current node is the goal state.
@@ -162,13 +493,7 @@ class BaseSearch(ABC):
         Returns:
             bool: True if the goal state is reached, False otherwise.
         """
-        # Implement the logic to check if all stones are on switches
-        # For example:
-        count = 0
-        for [rol, col, weight] in node.stones:
-            if (rol, col) in self.grid.switches:
-                count += 1
-        return count == len(self.grid.switches)
+        return self.board.is_goal(node.stones)
 
     def get_solution(self) -> Solution:
         return self.solution
@@ -4,10 +4,16 @@ from ..core.grid import Grid
 
 
 class BFS(BaseSearch):
-    def __init__(self, grid: Grid, next_node_data_structure: Queue = None) -> None:
+    def __init__(
+        self,
+        grid: Grid,
+        next_node_data_structure: Queue = None,
+        push_level: bool = False,
+        **kwargs,
+    ) -> None:
         if next_node_data_structure is None:
             next_node_data_structure = Queue()  # Create a new Queue if none is provided
-        super().__init__(next_node_data_structure, grid)
+        super().__init__(next_node_data_structure, grid, push_level, **kwargs)
 
     def calculate_g(self, node, push_cost) -> int:
         return 0
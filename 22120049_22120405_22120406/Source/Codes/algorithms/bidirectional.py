@@ -0,0 +1,169 @@
+from .base_search import BaseSearch
+from ..data_structures.queue import Queue
+from ..core.grid import Grid
+from ..core.node import Node
+
+
+class Bidirectional(BaseSearch):
+    """
+    Bidirectional breadth-first search on single steps. A forward search makes moves and pushes from the
+    initial state while a backward search undoes them (walks back and pulls stones) from every solved
+    state: each arrangement of the stones on the switches (see Board.goal_arrangements) with Ares on any
+    free cell he can reach, which covers all of his regions. Both sides hash states with the same Zobrist keys, so they
+    meet when a state generated on one side has a hash the other side has already seen.
+
+    The side with the smaller frontier expands one whole layer at a time, and the shortest meeting of
+    that layer is kept, so the solution has the same (optimal) step count as BFS while each side only
+    goes about half as deep.
+
+    Args:
+        grid (Grid): The level to solve.
+    """
+
+    def __init__(
+        self,
+        grid: Grid,
+        next_node_data_structure: Queue = None,
+        **kwargs,
+    ) -> None:
+        if next_node_data_structure is None:
+            next_node_data_structure = Queue()  # Create a new Queue if none is provided
+        super().__init__(next_node_data_structure, grid, push_level=False, **kwargs)
+        # Joining the two sides needs the exact meeting state, not its symmetry class
+        self.symmetry = False
+        self.backward = Queue()
+        # Zobrist hash -> the first (shallowest) node of each side with that state
+        self.forward_seen: dict[int, Node] = {}
+        self.backward_seen: dict[int, Node] = {}
+
+    def calculate_g(self, node, push_cost) -> int:
+        return 0
+
+    def calculate_h(self, node) -> int:
+        return 0
+
+    def create_goals(self) -> None:
+        """
+        Queue every solved state as a root of the backward search. Ares only stands on cells he can walk
+        to from his initial one (ignoring stones): floor outside the walls is never reached.
+        """
+        board = self.board
+        free = sorted(board.walk_distances(board.start_position, ()))
+        for stones in board.goal_arrangements():
+            for position in free:
+                if position in stones:
+                    continue
+                node = Node(position, stones, zobrist=board.zobrist(position, stones))
+                self.backward_seen[node.zobrist] = node
+                self.backward.add(node)
+
+    def search(self) -> bool:
+        self.begin()
+        init_node = self.create_root()
+        if self.is_goal_state(init_node):
+            return self.finish(init_node)
+        self.forward_seen[init_node.zobrist] = init_node
+        self.next_node_data_structure.add(init_node)
+        self.create_goals()
+
+        meeting = None
+        while meeting is None and self.stop_reason is None:
+            if self.next_node_data_structure.is_empty():
+                break
+            if self.backward.is_empty() or len(self.next_node_data_structure) <= len(
+                self.backward
+            ):
+                meeting = self.expand_layer(
+                    self.next_node_data_structure,
+                    self.forward_seen,
+                    self.backward_seen,
+                    self.board.successors,
+                    forward=True,
+                )
+            else:
+                meeting = self.expand_layer(
+                    self.backward,
+                    self.backward_seen,
+                    self.forward_seen,
+                    self.board.pull_successors,
+                    forward=False,
+                )
+
+        return self.finish(self.join(*meeting) if meeting is not None else None)
+
+    def frontier_size(self) -> int:
+        return len(self.next_node_data_structure) + len(self.backward)
+
+    def visited_size(self) -> int:
+        return len(self.forward_seen) + len(self.backward_seen)
+
+    def expand_layer(self, frontier, seen, other_seen, successors, forward) -> tuple | None:
+        """
+        Expand every node of the current layer of one side.
+
+        Args:
+            frontier (Queue): The frontier of the side.
+            seen (dict): The nodes generated so far by the side.
+            other_seen (dict): The nodes generated so far by the other side.
+            successors (callable): Board.successors or Board.pull_successors.
+            forward (bool): Whether this is the forward side.
+
+        Returns:
+            tuple or None: The (forward_node, backward_node) pair of the shortest meeting found in the
+            layer (backward_node is None if the forward side reached a goal by itself), or None if the
+            sides did not meet.
+        """
+        best = None
+        for _ in range(len(frontier)):
+            if self.node_count >= self.next_check and self.check_limits():
+                return None
+            node = frontier.pop()
+            self.node_count += 1
+            if self.node_count >= self.next_observation:
+                self.observe(node)
+            moves = (
+                successors(node.position, node.stones, self.deadlock_detector)
+                if forward
+                else successors(node.position, node.stones)
+            )
+            for move in moves:
+                child_node = self.perform_move(node, move)
+                if child_node.zobrist in seen:
+                    continue
+                seen[child_node.zobrist] = child_node
+                frontier.add(child_node)
+
+                # Without goal arrangements (more stones than switches) the forward side finds goals alone
+                if forward and self.is_goal_state(child_node):
+                    candidate = (child_node.steps, (child_node, None))
+                else:
+                    other = other_seen.get(child_node.zobrist)
+                    if other is None or other != child_node:
+                        continue
+                    pair = (child_node, other) if forward else (other, child_node)
+                    candidate = (child_node.steps + other.steps, pair)
+                if best is None or candidate[0] < best[0]:
+                    best = candidate
+        return best[1] if best is not None else None
+
+    def join(self, forward_node: Node, backward_node: Node) -> Node:
+        """
+        Continue the forward path of a meeting with the moves of the backward path, and return the goal node.
+
+        Each backward node holds the forward move leading to its parent, and its weight is the total
+        weight pushed from it to the goal.
+        """
+        node = forward_node
+        while backward_node is not None and backward_node.parent is not None:
+            target = backward_node.parent
+            node = Node(
+                target.position,
+                target.stones,
+                parent=node,
+                action=backward_node.action,
+                weight=node.weight + backward_node.weight - target.weight,
+                steps=node.steps + 1,
+                zobrist=target.zobrist,
+            )
+            backward_node = target
+        return node
@@ -0,0 +1,24 @@
+import threading
+
+
+class CancellationToken:
+    """
+    Lets another thread (or process) ask a running search to stop. The search polls the token in its
+    expansion loop and returns a partial Solution with the "cancelled" status.
+
+    Args:
+        event (Event, optional): The flag behind the token. Defaults to a threading.Event; pass a
+            multiprocessing Event to cancel a search running in another process.
+    """
+
+    def __init__(self, event=None):
+        self.event = event if event is not None else threading.Event()
+
+    def cancel(self) -> None:
+        """Ask the search to stop."""
+        self.event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation was requested."""
+        return self.event.is_set()
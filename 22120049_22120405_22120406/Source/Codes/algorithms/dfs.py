@@ -4,10 +4,16 @@ from ..core.grid import Grid
 
 
 class DFS(BaseSearch):
-    def __init__(self, grid: Grid, next_node_data_structure: Stack = None) -> None:
+    def __init__(
+        self,
+        grid: Grid,
+        next_node_data_structure: Stack = None,
+        push_level: bool = True,
+        **kwargs,
+    ) -> None:
         if next_node_data_structure is None:
             next_node_data_structure = Stack()  # Create a new Stack if none is provided
-        super().__init__(next_node_data_structure, grid)
+        super().__init__(next_node_data_structure, grid, push_level, **kwargs)
 
     def calculate_g(self, node, push_cost) -> int:
         return 0
@@ -0,0 +1,459 @@
+import heapq
+import math
+import multiprocessing
+import os
+import queue
+import traceback
+import tracemalloc
+
+from .a_star import AStar
+from ..core.board import Board
+from ..core.deadlock import DeadlockDetector
+from ..core.grid import Grid
+from ..core.node import Node
+from ..heuristics.assignment import AssignmentHeuristic, push_distances
+from ..heuristics.pattern_database import PatternDatabase
+
+
+class HDAStar(AStar):
+    """
+    Hash-distributed A* (HDA*): the push-level A* search split across worker processes, so it is not
+    limited to one core by the GIL. Every state is owned by the worker `zobrist % workers`, which keeps
+    the open list, the best g costs and the parent links of its states. Children owned by another worker
+    are buffered and sent to it in batches through its message queue, and the owner evaluates their
+    heuristic.
+
+    When a worker expands a goal, its cost becomes a bound broadcast to all workers, which then drop every
+    node whose f cost is not below it. The search ends when every worker is idle and all sent batches were
+    received (checked with two consecutive probe waves giving the same message counts). Since the
+    heuristic is consistent and states are reopened when reached with a lower g cost, the best goal found
+    has the same optimal weight as AStar. The path is then rebuilt by asking the owners for the parent
+    link of each state. Expansions happen in the workers, so an observer only gets the final sample, and
+    the node limit is not enforced (the other limits are checked by the coordinator). A worker that
+    fails or exits early makes the search raise RuntimeError instead of waiting for it forever.
+
+    Args:
+        grid (Grid): The level to solve.
+        workers (int): The number of worker processes. Defaults to the number of CPUs.
+        batch_size (int): The number of children buffered for a worker before they are sent.
+    """
+
+    # Seconds the coordinator waits for a message before checking the limits and the workers
+    POLL_INTERVAL = 0.05
+
+    def __init__(
+        self,
+        grid: Grid,
+        workers: int | None = None,
+        batch_size: int = 64,
+        **kwargs,
+    ) -> None:
+        super().__init__(grid, **kwargs)
+        # Workers hash children incrementally and rebuild the path through the hashes of exact states
+        self.symmetry = False
+        self.grid = grid
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.processes = []
+
+    def search(self) -> bool:
+        self.begin()
+        init_node = self.create_root()
+        if self.is_goal_state(init_node):
+            return self.finish(init_node)
+
+        context = multiprocessing.get_context()
+        inboxes = [context.Queue() for _ in range(self.workers)]
+        results = context.Queue()
+        self.processes = [
+            context.Process(
+                target=run_worker,
+                args=(
+                    index,
+                    self.grid,
+                    inboxes,
+                    results,
+                    self.batch_size,
+                    self.board.macros,
+                    self.board.packing,
+                    # The workers map the database file the coordinator built
+                    self.pattern_directory if self.pattern_database is not None else None,
+                ),
+                daemon=True,
+            )
+            for index in range(self.workers)
+        ]
+        for process in self.processes:
+            process.start()
+
+        try:
+            root = (
+                init_node.position,
+                init_node.stones,
+                0,
+                0,
+                init_node.region,
+                init_node.zobrist,
+                None,
+                "",
+            )
+            inboxes[init_node.zobrist % self.workers].put(("nodes", [root]))
+            goal = self.coordinate(inboxes, results, sent=1)
+
+            # Collect the statistics of every worker
+            for inbox in inboxes:
+                inbox.put(("stop",))
+            for _ in range(self.workers):
+                message = self.receive(results, "stats")
+                self.node_count += message[1]
+                for name, count in message[2].items():
+                    self.deadlock_detector.counts[name] += count
+
+            goal_node = self.rebuild(goal, init_node, inboxes, results) if goal else None
+        finally:
+            for inbox in inboxes:
+                inbox.put(("exit",))
+            for process in self.processes:
+                process.join()
+            self.processes = []
+        return self.finish(goal_node)
+
+    def coordinate(self, inboxes: list, results, sent: int) -> tuple | None:
+        """
+        Relay goal bounds between the workers and detect the end of the search.
+
+        Args:
+            inboxes (list): The message queue of each worker.
+            results (Queue): The message queue of the coordinator.
+            sent (int): The number of batches the coordinator sent itself (the root).
+
+        Returns:
+            tuple or None: (g_cost, steps, zobrist) of the best goal, or None if there is no solution.
+        """
+        best_goal = None
+        idle = [False] * self.workers
+        wave = 0
+        previous_counts = None
+        acks = {}
+        for inbox in inboxes:
+            inbox.put(("probe", wave))
+
+        limited = self.next_check < math.inf
+        while True:
+            message = self.poll(results)
+            if limited and self.check_limits():
+                return None  # The bound found so far is not proven optimal
+            if message[0] == "goal":
+                goal = message[1:]
+                if best_goal is None or goal < best_goal:
+                    best_goal = goal
+                    for inbox in inboxes:
+                        inbox.put(("bound", goal[0]))
+            elif message[0] == "idle":
+                idle[message[1]] = True
+                if all(idle) and not acks:
+                    wave += 1
+                    for inbox in inboxes:
+                        inbox.put(("probe", wave))
+            elif message[0] == "busy":
+                idle[message[1]] = False
+            elif message[0] == "ack" and message[1] == wave:
+                acks[message[2]] = message[3:]
+                if len(acks) < self.workers:
+                    continue
+                states = list(acks.values())
+                acks = {}
+                counts = (
+                    sent + sum(worker_sent for _, worker_sent, _ in states),
+                    sum(received for _, _, received in states),
+                )
+                if all(is_idle for is_idle, _, _ in states) and counts[0] == counts[1]:
+                    if counts == previous_counts:
+                        return best_goal
+                    previous_counts = counts
+                    wave += 1
+                    for inbox in inboxes:
+                        inbox.put(("probe", wave))
+                else:
+                    previous_counts = None
+                    if all(idle):
+                        # The workers went idle (or a batch arrived) while the wave was running
+                        wave += 1
+                        for inbox in inboxes:
+                            inbox.put(("probe", wave))
+
+    def poll(self, results) -> tuple:
+        """
+        Wait a short while for the next message of the workers.
+
+        Args:
+            results (Queue): The message queue of the coordinator.
+
+        Returns:
+            tuple: The message, or ("tick",) if none arrived in time.
+
+        Raises:
+            RuntimeError: If a worker reported an error or exited before it was told to.
+        """
+        try:
+            message = results.get(timeout=self.POLL_INTERVAL)
+        except queue.Empty:
+            for index, process in enumerate(self.processes):
+                if not process.is_alive():
+                    raise RuntimeError(
+                        f"HDA* worker {index} exited with code {process.exitcode}"
+                    ) from None
+            return ("tick",)
+        if message[0] == "error":
+            raise RuntimeError(f"HDA* worker {message[1]} failed:\n{message[2]}")
+        return message
+
+    def receive(self, results, kind: str) -> tuple:
+        """Wait for the next message of a kind, skipping the leftovers of the search."""
+        while True:
+            message = self.poll(results)
+            if message[0] == kind:
+                return message
+
+    def rebuild(self, goal: tuple, init_node: Node, inboxes: list, results) -> Node:
+        """Follow the parent links of the goal across the workers and rebuild its chain of nodes."""
+        records = []
+        zobrist = goal[2]
+        while zobrist is not None:
+            inboxes[zobrist % self.workers].put(("lookup", zobrist))
+            record = self.receive(results, "record")[1]
+            records.append(record)
+            zobrist = record[6]
+        records.pop()  # The root
+
+        node = init_node
+        for position, stones, g_cost, steps, region, zobrist, _, action in reversed(records):
+            node = Node(
+                position,
+                stones,
+                parent=node,
+                action=action,
+                g_cost=g_cost,
+                weight=g_cost,
+                steps=steps,
+                region=region,
+                zobrist=zobrist,
+            )
+        return node
+
+
+def run_worker(
+    index: int,
+    grid: Grid,
+    inboxes: list,
+    results,
+    batch_size: int,
+    macros: bool,
+    packing: bool,
+    pattern_directory: str | None,
+) -> None:
+    """The entry point of an HDA* worker process. Errors are reported to the coordinator."""
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()  # Inherited from the parent; only the coordinator is measured
+    try:
+        HDAWorker(
+            index, grid, inboxes, results, batch_size, macros, packing, pattern_directory
+        ).run()
+    except Exception:
+        results.put(("error", index, traceback.format_exc()))
+
+
+class HDAWorker:
+    """
+    One worker of HDAStar. It owns the states whose hash maps to its index.
+
+    States travel between workers as plain tuples:
+    (position, stones, g_cost, steps, region, zobrist, parent_zobrist, action).
+
+    Attributes:
+        open (list): The heap of (f_cost, steps, order, state) of the owned states to expand.
+        best_g (dict(int, int)): The best g cost each owned state was reached with, expanded or not.
+        parents (dict(int, tuple)): The state tuple of each owned state at its best g cost.
+        bound (float): The cost of the best goal found by any worker.
+
+    A worker given the directory of the coordinator's pattern databases maps the same file, so the
+    tables are shared between the processes instead of copied.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        grid: Grid,
+        inboxes: list,
+        results,
+        batch_size: int,
+        macros: bool = False,
+        packing: bool = False,
+        pattern_directory: str | None = None,
+    ):
+        self.index = index
+        self.inboxes = inboxes
+        self.results = results
+        self.batch_size = batch_size
+        self.board = Board(grid, macros, packing)
+        self.detector = DeadlockDetector(self.board)
+        self.heuristic = AssignmentHeuristic(self.board, push_distances(self.board))
+        self.pattern_database = (
+            PatternDatabase.for_board(self.board, pattern_directory)
+            if pattern_directory is not None
+            else None
+        )
+        self.open = []
+        self.order = 0
+        self.best_g = {}
+        self.parents = {}
+        self.bound = math.inf
+        self.outboxes = [[] for _ in inboxes]
+        self.sent = 0
+        self.received = 0
+        self.expanded = 0
+        self.idle = False
+        self.stopped = False
+        self.exited = False
+
+    def run(self) -> None:
+        while not self.stopped:
+            if self.has_work():
+                self.drain(block=False)
+                if self.has_work():
+                    self.expand()
+                    continue
+            # Nothing to expand: send everything that is buffered, then wait for messages
+            self.flush()
+            if not self.idle:
+                self.idle = True
+                self.results.put(("idle", self.index))
+            self.drain(block=True)
+        if self.exited:
+            return  # The coordinator gave up on the search
+
+        self.results.put(("stats", self.expanded, self.detector.counts))
+        while True:
+            message = self.inboxes[self.index].get()
+            if message[0] == "lookup":
+                self.results.put(("record", self.parents[message[1]]))
+            elif message[0] == "exit":
+                return
+
+    def has_work(self) -> bool:
+        """Check if the open list holds a node that can still beat the bound."""
+        while self.open and self.open[0][0] >= self.bound:
+            heapq.heappop(self.open)
+        return bool(self.open)
+
+    def drain(self, block: bool) -> None:
+        """Handle the messages waiting in the inbox, waiting for the first one if `block` is set."""
+        inbox = self.inboxes[self.index]
+        while not self.stopped:
+            try:
+                message = inbox.get() if block else inbox.get_nowait()
+            except queue.Empty:
+                return
+            block = False
+            kind = message[0]
+            if kind == "nodes":
+                self.received += 1
+                if self.idle:
+                    self.idle = False
+                    self.results.put(("busy", self.index))
+                self.insert(message[1])
+            elif kind == "bound":
+                self.bound = min(self.bound, message[1])
+            elif kind == "probe":
+                self.flush()
+                idle = self.idle and not self.has_work()
+                self.results.put(("ack", message[1], self.index, idle, self.sent, self.received))
+            elif kind == "stop":
+                self.stopped = True
+            elif kind == "exit":
+                self.stopped = self.exited = True
+
+    def insert(self, states: list[tuple], parent_stones: tuple[int, ...] | None = None) -> None:
+        """Queue the owned states that improve on their best g cost."""
+        fresh = []
+        for state in states:
+            best = self.best_g.get(state[5])
+            if best is not None and best <= state[2]:
+                continue
+            fresh.append(state)
+        if not fresh:
+            return
+
+        configurations = [state[1] for state in fresh]
+        costs = self.heuristic.estimate_batch(configurations, parent_stones)
+        if self.pattern_database is not None:
+            pattern_costs = self.pattern_database.estimate_batch(
+                configurations, [state[0] for state in fresh]
+            )
+            costs = [max(pair) for pair in zip(costs, pattern_costs)]
+        for state, h_cost in zip(fresh, costs):
+            best = self.best_g.get(state[5])
+            if best is not None and best <= state[2]:
+                continue  # The same state came earlier in the batch at a lower cost
+            if h_cost == math.inf:
+                self.detector.counts["assignment"] += 1
+                continue
+            f_cost = state[2] + h_cost
+            if f_cost >= self.bound:
+                continue
+            self.best_g[state[5]] = state[2]
+            self.parents[state[5]] = state
+            self.order += 1
+            heapq.heappush(self.open, (f_cost, state[3], self.order, state))
+
+    def expand(self) -> None:
+        """Expand the best node of the open list, sending the children owned by other workers."""
+        _, _, _, state = heapq.heappop(self.open)
+        position, stones, g_cost, steps, region, zobrist, _, _ = state
+        if self.best_g[zobrist] < g_cost:
+            return  # Stale entry: reopened with a lower cost
+        self.expanded += 1
+
+        if self.board.is_goal(stones):
+            if g_cost < self.bound:
+                self.bound = g_cost
+                self.results.put(("goal", g_cost, steps, zobrist))
+            return
+
+        local = []
+        workers = len(self.inboxes)
+        zobrist_ares = self.board.zobrist_ares
+        for action, new_position, new_stones, push_cost, walk, new_region, stone_key in (
+            self.board.push_successors(position, stones, self.detector)
+        ):
+            child_zobrist = zobrist ^ stone_key ^ zobrist_ares[region] ^ zobrist_ares[new_region]
+            child = (
+                new_position,
+                new_stones,
+                g_cost + push_cost,
+                steps + walk,
+                new_region,
+                child_zobrist,
+                zobrist,
+                action,
+            )
+            owner = child_zobrist % workers
+            if owner == self.index:
+                local.append(child)
+            else:
+                self.outboxes[owner].append(child)
+                if len(self.outboxes[owner]) >= self.batch_size:
+                    self.send(owner)
+        self.insert(local, stones)
+
+    def send(self, owner: int) -> None:
+        """Send the buffered children of a worker as one batch."""
+        self.inboxes[owner].put(("nodes", self.outboxes[owner]))
+        self.outboxes[owner] = []
+        self.sent += 1
+
+    def flush(self) -> None:
+        """Send every non-empty buffer."""
+        for owner, outbox in enumerate(self.outboxes):
+            if outbox:
+                self.send(owner)
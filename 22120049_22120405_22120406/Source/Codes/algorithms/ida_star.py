@@ -0,0 +1,125 @@
+from array import array
+import math
+
+from .a_star import AStar
+from ..core.grid import Grid
+from ..core.node import Node
+
+
+class IDAStar(AStar):
+    """
+    Iterative-deepening A*: a series of depth-first searches bounded by f = g + h, where each iteration
+    raises the bound to the smallest f that exceeded it. Only the current path and the children of its
+    nodes are kept, so memory grows with the depth of the solution instead of the size of the frontier.
+
+    It uses the same successors, costs and heuristic as AStar, so its solutions have the same optimal
+    weight. Re-expansion of states reached again by another path is limited by a fixed-size
+    transposition table: a state already explored in the current iteration with a g cost at most as
+    large is not explored again.
+
+    Args:
+        grid (Grid): The level to solve.
+        transposition_size (int): The number of entries of the transposition table (a power of two).
+    """
+
+    def __init__(
+        self,
+        grid: Grid,
+        push_level: bool = True,
+        transposition_size: int = 1 << 18,
+        **kwargs,
+    ) -> None:
+        super().__init__(grid, push_level=push_level, **kwargs)
+        self.transposition_mask = transposition_size - 1
+        self.iterations = 0
+        self.stack = []  # The path of the current iteration, with the children left to try
+        self.on_path = set()
+
+    def search(self) -> bool:
+        self.begin()
+        root = self.create_root()
+        threshold = root.total_cost()
+        goal_node = None
+        while goal_node is None and threshold < math.inf and self.stop_reason is None:
+            self.iterations += 1
+            goal_node, threshold = self.bounded_search(root, threshold)
+        return self.finish(goal_node)
+
+    def bounded_search(self, root: Node, threshold) -> tuple[Node | None, float]:
+        """
+        Run one depth-first iteration with an explicit stack.
+
+        Args:
+            root (Node): The initial node.
+            threshold (int): The f cost bound of this iteration.
+
+        Returns:
+            tuple: (goal_node, next_threshold). goal_node is None if no goal was found within the bound,
+            and next_threshold is the smallest f cost that exceeded it.
+        """
+        size = self.transposition_mask + 1
+        keys = array("Q", bytes(8 * size))
+        costs = array("q", [-1]) * size
+        next_threshold = math.inf
+
+        self.on_path = on_path = {root.zobrist}
+        self.stack = stack = [(root, iter(self.expand(root)))]
+        self.node_count += 1
+        if self.is_goal_state(root):
+            return root, threshold
+
+        while stack:
+            node, children = stack[-1]
+            child_node = next(children, None)
+            if child_node is None:
+                stack.pop()
+                on_path.discard(node.zobrist)
+                continue
+
+            f_cost = child_node.total_cost()
+            if f_cost > threshold:
+                next_threshold = min(next_threshold, f_cost)
+                continue
+            if child_node.zobrist in on_path:
+                continue  # Cycle on the current path
+
+            slot = child_node.zobrist & self.transposition_mask
+            if keys[slot] == child_node.zobrist and 0 <= costs[slot] <= child_node.g_cost:
+                continue  # Already explored in this iteration from an equal or cheaper path
+            keys[slot] = child_node.zobrist
+            costs[slot] = child_node.g_cost
+
+            if self.node_count >= self.next_check and self.check_limits():
+                return None, math.inf
+            self.node_count += 1
+            if self.node_count >= self.next_observation:
+                self.observe(child_node)
+            if self.is_goal_state(child_node):
+                return child_node, threshold
+
+            on_path.add(child_node.zobrist)
+            stack.append((child_node, iter(self.expand(child_node))))
+
+        return None, next_threshold
+
+    def frontier_size(self) -> int:
+        return len(self.stack)
+
+    def visited_size(self) -> int:
+        return len(self.on_path)
+
+    def expand(self, node: Node) -> list[Node]:
+        """Generate the children of a node, cheapest f first, without the ones that can never be solved."""
+        children = [
+            self.perform_move(node, move)
+            for move in self.successors(node.position, node.stones, self.deadlock_detector)
+        ]
+        self.evaluate_children(node, children)
+        solvable = []
+        for child_node in children:
+            if child_node.h_cost == math.inf:
+                self.deadlock_detector.counts["assignment"] += 1
+            else:
+                solvable.append(child_node)
+        solvable.sort(key=lambda child_node: (child_node.total_cost(), child_node.steps))
+        return solvable
@@ -5,13 +5,17 @@ from ..core.grid import Grid
 
 class UCS(BaseSearch):
     def __init__(
-        self, grid: Grid, next_node_data_structure: PriorityQueue = None
+        self,
+        grid: Grid,
+        next_node_data_structure: PriorityQueue = None,
+        push_level: bool = True,
+        **kwargs,
     ) -> None:
         if next_node_data_structure is None:
             next_node_data_structure = (
                 PriorityQueue()
             )  # Create a new PriorityQueue if none is provided
-        super().__init__(next_node_data_structure, grid)
+        super().__init__(next_node_data_structure, grid, push_level, **kwargs)
 
     def calculate_g(self, node, push_cost) -> int:
         return node.parent.g_cost + push_cost
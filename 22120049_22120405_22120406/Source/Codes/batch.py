@@ -0,0 +1,316 @@
+"""
+Headless batch runner: solves every level matching a glob with one or more algorithms, spread over a pool
+of processes, and streams one result per (level, algorithm) as soon as it finishes.
+
+Usage (from the Source directory):
+    python -m Codes.batch "input-*.txt" -a A* BFS --workers 4 --time-limit 60 --memory-limit 2048 \
+        --output results.jsonl
+"""
+
+import argparse
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+
+try:
+    import resource  # Unix only; memory limits are not enforced without it
+except ImportError:
+    resource = None
+
+from .custom_io.input_output_handler import InputOutputHandler as IOHandler
+from .custom_io.solution_cache import SolutionCache
+from .profiling.instrumentation import INSTRUMENTATION_MODES
+from .profiling.telemetry import TelemetrySampler
+from .solver import ALGORITHMS, GUARANTEES
+
+# The columns of every result, in CSV order
+FIELDS = (
+    "level",
+    "algorithm",
+    "status",
+    "stop_reason",
+    "steps",
+    "weight",
+    "node_count",
+    "time",
+    "memory",
+    "rss",
+    "wall_time",
+    "path",
+    "cached",
+    "error",
+)
+
+
+def run_task(
+    level: str,
+    algorithm_name: str,
+    time_limit: float | None,
+    memory_limit: int | None,
+    instrumentation: str,
+    telemetry_dir: str | None,
+    cache_path: str | None,
+    results,
+) -> None:
+    """The entry point of a task process: solve one level with one algorithm and report the result."""
+    address_space = None
+    if memory_limit is not None and resource is not None:
+        # Only the soft limit is lowered, so that it can be lifted again to report the result
+        address_space = resource.getrlimit(resource.RLIMIT_AS)
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, address_space[1]))
+    record = {"level": level, "algorithm": algorithm_name}
+    sampler = cache = solution = None
+    try:
+        if cache_path is not None:
+            cache = SolutionCache(cache_path)
+            solution = cache.lookup(level, algorithm_name)
+        if solution is None:
+            if telemetry_dir is not None:
+                # "*" is not allowed in Windows file names
+                name = os.path.splitext(os.path.basename(level))[0] + "-" + algorithm_name
+                name = name.replace("*", "star")
+                sampler = TelemetrySampler(os.path.join(telemetry_dir, name + ".jsonl"))
+            grid = IOHandler(level, None).load_from_file()
+            algorithm = ALGORITHMS[algorithm_name](
+                grid,
+                instrumentation=instrumentation,
+                observer=sampler,
+                time_limit=time_limit,
+                memory_limit=memory_limit,
+            )
+            algorithm.search()
+            solution = algorithm.get_solution()
+            if cache is not None and solution.stop_reason is None:
+                cache.store(level, algorithm_name, GUARANTEES[algorithm_name], solution)
+        record.update(
+            status=solution.status,
+            stop_reason=solution.stop_reason,
+            steps=solution.steps,
+            weight=solution.weight,
+            node_count=solution.node_count,
+            time=solution.time,
+            memory=solution.memory,
+            path=solution.path,
+            cached=solution.cached,
+        )
+    except MemoryError:
+        record.update(status="memory_limit")
+    except Exception as error:
+        record.update(status="error", error=repr(error))
+    finally:
+        if sampler is not None:
+            sampler.close()
+        if cache is not None:
+            cache.close()
+        if address_space is not None:
+            # Sending the record starts a thread, which needs more address space than the limit leaves
+            resource.setrlimit(resource.RLIMIT_AS, address_space)
+    if resource is not None:
+        # Peak resident set size of the process, in KB on Linux and in bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        record["rss"] = peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    results.put(record)
+
+
+class BatchRunner:
+    """
+    Runs (level, algorithm) tasks in separate processes, at most `workers` at a time. The searches get the
+    time and memory limits as budgets and stop by themselves when they reach one. As a safety net, a task
+    is killed KILL_GRACE seconds after its time limit, and its address space is capped by the memory limit
+    where the platform supports it (the search then fails with a MemoryError).
+
+    Args:
+        levels (list of str): The level files.
+        algorithms (list of str): Keys of ALGORITHMS.
+        workers (int): The number of tasks running at once.
+        time_limit (float, optional): The wall-clock limit of a task in seconds.
+        memory_limit (int, optional): The memory limit of a task in MB.
+        instrumentation (str): How the searches measure memory: "off", "rss" or "tracemalloc".
+        telemetry_dir (str, optional): A directory where the telemetry of each task is written, as
+            "<level>-<algorithm>.jsonl", with "*" spelled "star" (see TelemetrySampler).
+        cache_path (str, optional): The SolutionCache file where solutions are looked up first and stored.
+    """
+
+    KILL_GRACE = 5.0
+
+    def __init__(
+        self,
+        levels: list[str],
+        algorithms: list[str],
+        workers: int = 1,
+        time_limit: float | None = None,
+        memory_limit: int | None = None,
+        instrumentation: str = "rss",
+        telemetry_dir: str | None = None,
+        cache_path: str | None = None,
+    ):
+        for name in algorithms:
+            if name not in ALGORITHMS:
+                raise ValueError(f"Invalid algorithm name: {name}")
+        self.tasks = [(level, name) for level in levels for name in algorithms]
+        self.workers = max(1, workers)
+        self.time_limit = time_limit
+        self.memory_limit = memory_limit
+        self.instrumentation = instrumentation
+        self.telemetry_dir = telemetry_dir
+        self.cache_path = cache_path
+
+    def run(self):
+        """
+        Run every task.
+
+        Yields:
+            dict: The result of each task, in the order they finish, with the keys of FIELDS. status is
+            "solved", "failed" (no solution exists), "timeout", "memory_limit" or "error". stop_reason is
+            set when the search was stopped early, also for the unproven solution of an anytime search.
+        """
+        context = multiprocessing.get_context()
+        results = context.Queue()
+        pending = list(reversed(self.tasks))
+        running = {}  # (level, algorithm) -> (process, start time)
+
+        while pending or running:
+            while pending and len(running) < self.workers:
+                task = pending.pop()
+                process = context.Process(
+                    target=run_task,
+                    args=(
+                        *task,
+                        self.time_limit,
+                        self.memory_limit,
+                        self.instrumentation,
+                        self.telemetry_dir,
+                        self.cache_path,
+                        results,
+                    ),
+                )
+                process.start()
+                running[task] = (process, time.perf_counter())
+
+            try:
+                record = results.get(timeout=0.05)
+            except queue.Empty:
+                record = None
+            task = (record["level"], record["algorithm"]) if record else None
+            if task in running:
+                process, start_time = running.pop(task)
+                process.join()
+                record["wall_time"] = (time.perf_counter() - start_time) * 1000
+                yield record
+                continue
+
+            now = time.perf_counter()
+            for task, (process, start_time) in list(running.items()):
+                timed_out = (
+                    self.time_limit is not None
+                    and now - start_time > self.time_limit + self.KILL_GRACE
+                )
+                if timed_out:
+                    process.terminate()
+                elif process.is_alive() or not results.empty():
+                    continue
+                process.join()
+                del running[task]
+                yield {
+                    "level": task[0],
+                    "algorithm": task[1],
+                    "status": "timeout" if timed_out else "error",
+                    "wall_time": (now - start_time) * 1000,
+                }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Solve a set of Sokoban levels with one or more algorithms."
+    )
+    parser.add_argument("levels", help='A glob of level files, e.g. "input-*.txt".')
+    parser.add_argument(
+        "-a",
+        "--algorithms",
+        nargs="+",
+        default=["A*"],
+        choices=list(ALGORITHMS),
+        help="The algorithms to run on every level.",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="The number of levels solved at once.",
+    )
+    parser.add_argument(
+        "-t", "--time-limit", type=float, help="The time limit per level in seconds."
+    )
+    parser.add_argument(
+        "-m", "--memory-limit", type=int, help="The memory limit per level in MB."
+    )
+    parser.add_argument(
+        "-i",
+        "--instrumentation",
+        choices=list(INSTRUMENTATION_MODES),
+        default="rss",
+        help="How the searches measure memory.",
+    )
+    parser.add_argument(
+        "--telemetry-dir",
+        help="Write the live telemetry of every task to a JSONL file in this directory.",
+    )
+    parser.add_argument(
+        "--cache",
+        help="Look solutions up in this solution cache file before searching, and store new ones.",
+    )
+    parser.add_argument(
+        "-o", "--output", help="The results file. Defaults to JSONL on the standard output."
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=("jsonl", "csv"),
+        help="The results format. Defaults to the extension of the output file, else jsonl.",
+    )
+    args = parser.parse_args(argv)
+
+    levels = sorted(glob.glob(args.levels))
+    if not levels:
+        parser.error(f"No level matches {args.levels}")
+    result_format = args.format or (
+        "csv" if args.output and args.output.endswith(".csv") else "jsonl"
+    )
+
+    runner = BatchRunner(
+        levels,
+        args.algorithms,
+        args.workers,
+        args.time_limit,
+        args.memory_limit,
+        args.instrumentation,
+        args.telemetry_dir,
+        args.cache,
+    )
+    output = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        writer = None
+        if result_format == "csv":
+            writer = csv.DictWriter(output, FIELDS, extrasaction="ignore")
+            writer.writeheader()
+        for record in runner.run():
+            if writer is not None:
+                writer.writerow(record)
+            else:
+                output.write(json.dumps(record) + "\n")
+            output.flush()  # Stream each result as soon as it is known
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
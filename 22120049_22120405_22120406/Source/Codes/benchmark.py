@@ -0,0 +1,290 @@
+"""
+Benchmark suite: runs the search algorithms over a fixed level corpus, with warmups and repetitions,
+and compares the results with a stored baseline.
+
+The corpus is the bundled input-*.txt levels plus one generated level per bundled level, scrambled from
+its solved state by seeded random pulls (see generate_level), so it is always solvable and the same on
+every run.
+
+Usage (from the Source directory):
+    python -m Codes.benchmark --repetitions 5 --output results.json --baseline baseline.json
+    python -m Codes.benchmark --save-baseline baseline.json
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+
+from .batch import BatchRunner
+from .core.board import Board
+from .custom_io.input_output_handler import InputOutputHandler as IOHandler
+from .solver import ALGORITHMS
+from .configs.constants import GridConstants
+
+GENERATOR_SEED = 0xB07  # Fixed so the generated levels are the same on every run
+
+
+def generate_level(input_file: str, seed: int, pulls: int = 60) -> str:
+    """
+    Generate a new level with the walls, switches and stones of a bundled one: the stones start on the
+    switches and a seeded random sequence of pulls (see Board.pull_successors), each made from any cell
+    Ares can walk to, moves them away. Undoing the pulls solves the level.
+
+    Args:
+        input_file (str): The bundled level file.
+        seed (int): The seed of the random pulls.
+        pulls (int): The number of pulls.
+
+    Returns:
+        str: The content of the generated level file.
+    """
+    grid = IOHandler(input_file, None).load_from_file()
+    board = Board(grid)
+    generator = random.Random(seed)
+
+    stones = next(board.goal_arrangements(), None)
+    if stones is None:
+        raise ValueError(f"{input_file} has a different number of stones and switches")
+    # Ares starts on the free cell closest to his initial one
+    distances = board.walk_distances(board.start_position, ())
+    position = min(
+        (cell for cell in distances if cell not in stones), key=distances.__getitem__
+    )
+    for _ in range(pulls):
+        options = [
+            move
+            for cell in board.walk_distances(position, stones)
+            for move in board.pull_successors(cell, stones)
+            if move[3]  # Only the pulls, not the plain steps back
+        ]
+        if not options:
+            break
+        _, position, stones, *_ = generator.choice(options)
+
+    # Redraw the level: clear the movable objects, then place them again
+    rows = [
+        [
+            GridConstants.SWITCH if (row, col) in grid.switches else char
+            for col, char in enumerate(line)
+        ]
+        for row, line in enumerate(grid.grid)
+    ]
+    for row, line in enumerate(rows):
+        for col, char in enumerate(line):
+            if char in (GridConstants.STONE, GridConstants.ARES):
+                line[col] = GridConstants.FREE_SPACE
+    weights = {}
+    for slot, cell in enumerate(stones):
+        row, col = board.coordinates[cell]
+        on_switch = cell in board.switch_set
+        rows[row][col] = (
+            GridConstants.STONE_ON_SWITCH if on_switch else GridConstants.STONE
+        )
+        weights[cell] = board.weights[slot]
+    row, col = board.coordinates[position]
+    rows[row][col] = (
+        GridConstants.ARES_ON_SWITCH
+        if position in board.switch_set
+        else GridConstants.ARES
+    )
+
+    # Weights are listed in the row-major order of the stones
+    weight_line = " ".join(str(weights[cell]) for cell in sorted(weights))
+    return weight_line + "\n" + "".join("".join(line) for line in rows)
+
+
+def build_corpus(levels: list[str], directory: str) -> list[str]:
+    """Return the bundled levels followed by one generated level per bundled level, written to a directory."""
+    corpus = list(levels)
+    for index, level in enumerate(levels):
+        name = os.path.join(directory, "generated-" + os.path.basename(level))
+        with open(name, "w") as file:
+            file.write(generate_level(level, GENERATOR_SEED + index))
+        corpus.append(name)
+    return corpus
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Benchmark:
+    """
+    Runs every algorithm on every level of the corpus, each run in its own process (see BatchRunner), and
+    summarizes the timed repetitions of each case.
+
+    Args:
+        corpus (list of str): The level files.
+        algorithms (list of str): Keys of ALGORITHMS.
+        warmups (int): The number of untimed runs of each case.
+        repetitions (int): The number of timed runs of each case.
+        time_limit (float): The time limit of a run in seconds. A case that times out is not repeated.
+    """
+
+    def __init__(
+        self,
+        corpus: list[str],
+        algorithms: list[str],
+        warmups: int = 1,
+        repetitions: int = 5,
+        time_limit: float = 60.0,
+    ):
+        self.corpus = corpus
+        self.algorithms = algorithms
+        self.warmups = warmups
+        self.repetitions = repetitions
+        self.time_limit = time_limit
+
+    def run_once(self, level: str, algorithm_name: str) -> dict:
+        """Run one case in a fresh process and return its record (see BatchRunner.run)."""
+        runner = BatchRunner([level], [algorithm_name], 1, self.time_limit)
+        return next(runner.run())
+
+    def run(self) -> dict[str, dict]:
+        """
+        Run the benchmark.
+
+        Returns:
+            dict(str, dict): The summary of each case, keyed by "level algorithm": its status, node count,
+            median and p95 search time in milliseconds, nodes per second (from the median time) and the
+            highest peak RSS of the runs in MB.
+        """
+        results = {}
+        for level in self.corpus:
+            for algorithm_name in self.algorithms:
+                key = f"{os.path.basename(level)} {algorithm_name}"
+                records = []
+                for repetition in range(self.warmups + self.repetitions):
+                    record = self.run_once(level, algorithm_name)
+                    if record["status"] not in ("solved", "failed"):
+                        records = [record]
+                        break
+                    if repetition >= self.warmups:
+                        records.append(record)
+                results[key] = self.summarize(records)
+                print(key, results[key], file=sys.stderr, flush=True)
+        return results
+
+    @staticmethod
+    def summarize(records: list[dict]) -> dict:
+        """Summarize the timed runs of a case."""
+        status = records[0]["status"]
+        if status not in ("solved", "failed"):
+            return {"status": status}
+        times = [record["time"] for record in records]
+        median = statistics.median(times)
+        return {
+            "status": status,
+            "node_count": records[0]["node_count"],
+            "median": median,
+            "p95": percentile(times, 0.95),
+            "nodes_per_second": records[0]["node_count"] * 1000 / median if median else 0.0,
+            "rss": max(record.get("rss") or 0.0 for record in records),
+        }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Compare benchmark results with a baseline.
+
+    Args:
+        results (dict): The summaries of Benchmark.run.
+        baseline (dict): Summaries from an earlier run.
+        threshold (float): The tolerated relative increase (0.2 is 20 %).
+
+    Returns:
+        list of str: One message per regression: a case that no longer finishes, or whose median time,
+        p95 time, peak RSS or node count grew by more than the threshold.
+    """
+    regressions = []
+    for key, old in baseline.items():
+        new = results.get(key)
+        if new is None or old["status"] not in ("solved", "failed"):
+            continue
+        if new["status"] != old["status"]:
+            regressions.append(f"{key}: {old['status']} -> {new['status']}")
+            continue
+        for metric in ("median", "p95", "rss", "node_count"):
+            if old.get(metric) and new.get(metric, 0) > old[metric] * (1 + threshold):
+                regressions.append(
+                    f"{key}: {metric} {old[metric]:.1f} -> {new[metric]:.1f}"
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the search algorithms.")
+    parser.add_argument(
+        "--levels", default="input-*.txt", help="A glob of the bundled level files."
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithms",
+        nargs="+",
+        default=list(ALGORITHMS),
+        choices=list(ALGORITHMS),
+        help="The algorithms to benchmark. Defaults to all of them.",
+    )
+    parser.add_argument("--no-generated", action="store_true", help="Skip the generated levels.")
+    parser.add_argument("--warmups", type=int, default=1)
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument(
+        "-t", "--time-limit", type=float, default=60.0, help="The time limit per run in seconds."
+    )
+    parser.add_argument("-o", "--output", help="Write the results to a JSON file.")
+    parser.add_argument("--save-baseline", help="Write the results as the new baseline JSON file.")
+    parser.add_argument("--baseline", help="Compare the results with a baseline JSON file.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="The relative increase over the baseline reported as a regression.",
+    )
+    args = parser.parse_args(argv)
+
+    levels = sorted(glob.glob(args.levels))
+    if not levels:
+        parser.error(f"No level matches {args.levels}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = levels if args.no_generated else build_corpus(levels, directory)
+        benchmark = Benchmark(
+            corpus, args.algorithms, args.warmups, args.repetitions, args.time_limit
+        )
+        results = benchmark.run()
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+
+    print(f"{'case':32} {'status':8} {'nodes':>9} {'median ms':>10} {'p95 ms':>10} {'nodes/s':>10} {'RSS MB':>8}")
+    for key, summary in results.items():
+        if summary["status"] not in ("solved", "failed"):
+            print(f"{key:32} {summary['status']:8}")
+            continue
+        print(
+            f"{key:32} {summary['status']:8} {summary['node_count']:9d} {summary['median']:10.1f} "
+            f"{summary['p95']:10.1f} {summary['nodes_per_second']:10.0f} {summary['rss']:8.1f}"
+        )
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for message in regressions:
+            print("REGRESSION", message)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,963 @@
+import heapq
+import random
+from itertools import combinations
+
+from ..configs.constants import MOVEMENTS, GridConstants
+from .grid import Grid
+
+
+class Board:
+    """
+    The Board class holds the static part of a Sokoban level: everything that never changes while
+    searching (walls, floor cells, switches, stone weights and the neighbor of every floor cell in every
+    direction). It is built once from a Grid, and then generates successor states without mutating
+    anything, so the search algorithms never have to reset and redraw the character grid.
+
+    Cells are flat indices (row * width + col). A state is Ares' cell plus a tuple of stone cells where
+    the i-th entry is the cell of stone slot i. Slots are ordered by weight, so the weight of a stone is
+    looked up once in `weights` instead of being stored in every state. Stones with equal weights are
+    interchangeable, so their cells are kept sorted inside their slot group to give each state a single
+    representation.
+
+    With `macros`, push-level successors follow two macros (see `push_successors`): a stone pushed into a
+    tunnel is pushed on until it leaves it, and a stone pushed into the goal room is pushed straight to
+    the next switch of the packing order.
+
+    The packing order of the switches is computed once per level layout and kept in PACKING_CACHE, so
+    later searches of the same level (and their Boards) reuse it along with the goal-room paths.
+
+    Parameters:
+        grid (Grid): The parsed level the board is built from.
+        macros (bool): Whether push-level successors use the tunnel and goal-room macros. Off by default,
+            like in BaseSearch.
+        packing (bool): Whether successors refuse pushes that break the packing order. Off by default,
+            like in BaseSearch.
+
+    Attributes:
+        width (int): The number of columns used to flatten (row, col) positions into cells.
+        coordinates (list of tuple): The (row, col) position of every cell.
+        floor (list of bool): Whether Ares and stones can stand on each cell.
+        switches (tuple of int): The cells of all switches.
+        switch_set (frozenset of int): The same cells, for membership tests.
+        directions (tuple of str): The directions of MOVEMENTS, in order.
+        opposite (tuple of int): For each direction index, the index of the opposite direction.
+        neighbors (list of tuple): For each cell, the cell reached in each direction (-1 for walls).
+        push_distances (list of list of int): push_distances[j][cell] is the minimum number of pushes to
+            bring a stone from `cell` to the j-th switch when no other stone is in the way, -1 if impossible.
+        dead_squares (bytearray): 1 for each floor cell from which a stone can never reach any switch,
+            even with no other stone on the board. Pushing a stone there is a deadlock unless the level
+            has surplus stones.
+        weights (tuple of int): The weight of each stone slot, in increasing order.
+        surplus (int): The number of stones beyond the switches, which may stay anywhere in the end.
+        slot_groups (list of tuple): For each slot, the (start, end) range of slots sharing its weight.
+        shared_groups (list of tuple): The slot ranges holding more than one stone.
+        start_position (int): The initial cell of Ares.
+        start_stones (tuple of int): The initial cell of each stone slot.
+        zobrist_ares (list of int): A random 64-bit key for Ares (or his region) on each cell.
+        zobrist_stones (dict(int, list of int)): A random 64-bit key for a stone on each cell, per slot
+            group (keyed by the group's first slot), so interchangeable stones share their keys.
+        automorphisms (list of list of int): The rotations and reflections (other than the identity)
+            that map the cells Ares can reach, and the switches among them, onto themselves. Each maps
+            every cell to its image, -1 outside the reachable cells.
+        tunnels (list of bytearray): tunnels[d][cell] is 1 for a floor cell walled on both sides across
+            direction d, so a stone on it can only be pushed along d or back.
+        room_entrance (int): The single cell through which Ares and stones enter the goal room, -1 if the
+            level has no goal room.
+        goal_room (frozenset of int): The cells behind the entrance, holding every switch. Empty if the
+            level has none.
+        packing_order (tuple of int): A valid filling order of the switches: each one can still be
+            filled once the previous ones hold stones (through the entrance, with a goal room). Empty when
+            no such order was found.
+        packing_prerequisites (dict(int, tuple of int)): For each switch whose stone can never be pushed
+            off again (see `is_frozen`) and that blocks others, the switches that can only be filled with
+            Ares standing on it and that its stone cannot be pushed on to. A stone left there before
+            they are filled makes the level unsolvable, so successors refuse such pushes (see
+            `breaks_packing`). Empty without a packing order.
+    """
+
+    ZOBRIST_SEED = 0x5EED  # Fixed so hashes and search order are reproducible between runs
+    MAX_ROOM_CELLS = 64  # Larger areas behind an entrance are searched push by push
+    PACKING_CACHE = {}  # Level layout -> the goal room, packing order and room paths, see __init__
+    PACKING_CACHE_SIZE = 100
+
+    FLOOR_CHARS = (
+        GridConstants.FREE_SPACE,
+        GridConstants.STONE,
+        GridConstants.ARES,
+        GridConstants.SWITCH,
+        GridConstants.STONE_ON_SWITCH,
+        GridConstants.ARES_ON_SWITCH,
+    )
+
+    def __init__(self, grid: Grid, macros: bool = False, packing: bool = False):
+        self.height = len(grid.grid)
+        self.width = max((len(row) for row in grid.grid), default=0)
+        size = self.height * self.width
+        self.coordinates = [divmod(cell, self.width) for cell in range(size)]
+
+        # Every character that is not a wall (or a line break) is walkable
+        self.floor = [False] * size
+        for row_idx, row in enumerate(grid.grid):
+            for col_idx, char in enumerate(row):
+                if char in self.FLOOR_CHARS:
+                    self.floor[self.cell(row_idx, col_idx)] = True
+
+        self.switches = tuple(sorted(self.cell(row, col) for row, col in grid.switches))
+        self.switch_set = frozenset(self.switches)
+
+        self.directions = tuple(MOVEMENTS)
+        deltas = list(MOVEMENTS.values())
+        self.opposite = tuple(
+            deltas.index((-delta_row, -delta_col)) for delta_row, delta_col in deltas
+        )
+        self.neighbors = []
+        for cell in range(size):
+            row, col = self.coordinates[cell]
+            self.neighbors.append(
+                tuple(
+                    self.cell(row + delta_row, col + delta_col)
+                    if self.is_floor(row + delta_row, col + delta_col)
+                    else -1
+                    for delta_row, delta_col in MOVEMENTS.values()
+                )
+            )
+
+        self.push_distances = [self.pull_distances(switch) for switch in self.switches]
+        self.dead_squares = self.find_dead_squares()
+
+        # Stones keep the row-major order of the Grid inside a weight, so slots are stable
+        stones = [
+            (weight, self.cell(row, col))
+            for (row, col), weight in grid.stones.items()
+        ]
+        stones.sort(key=lambda x: x[0])
+        self.weights = tuple(weight for weight, _ in stones)
+        self.surplus = max(0, len(self.weights) - len(self.switches))
+        self.slot_groups = []
+        for weight in self.weights:
+            start = self.weights.index(weight)
+            end = start + self.weights.count(weight)
+            self.slot_groups.append((start, end))
+        self.shared_groups = sorted(
+            {(start, end) for start, end in self.slot_groups if end - start > 1}
+        )
+
+        self.start_position = self.cell(*grid.ares_position)
+        self.start_stones = self.canonical_stones([cell for _, cell in stones])
+
+        generator = random.Random(self.ZOBRIST_SEED)
+        self.zobrist_ares = [generator.getrandbits(64) for _ in range(size)]
+        self.zobrist_stones = {
+            start: [generator.getrandbits(64) for _ in range(size)]
+            for start, _ in sorted(set(self.slot_groups))
+        }
+        self.slot_keys = [self.zobrist_stones[start] for start, _ in self.slot_groups]
+        self.automorphisms = self.find_automorphisms()
+
+        self.macros = macros
+        self.packing = packing
+        self.tunnels = self.find_tunnels()
+        # Everything the goal room and the packing order depend on
+        layout = (
+            self.width,
+            tuple(self.floor),
+            self.switches,
+            self.start_position,
+            frozenset(self.start_stones),
+        )
+        if layout not in self.PACKING_CACHE:
+            if len(self.PACKING_CACHE) >= self.PACKING_CACHE_SIZE:
+                self.PACKING_CACHE.clear()
+            self.PACKING_CACHE[layout] = self.analyze_packing()
+        (
+            self.room_entrance,
+            self.goal_room,
+            self.packing_order,
+            self.packing_prerequisites,
+            self.room_paths,  # Shared with the cache: paths found by one search serve the next
+        ) = self.PACKING_CACHE[layout]
+        # A symmetry has to preserve what the successors depend on
+        self.automorphisms = [
+            image for image in self.automorphisms if self.preserves_packing(image)
+        ]
+
+    def cell(self, row: int, col: int) -> int:
+        """Return the flat cell index of a (row, col) position."""
+        return row * self.width + col
+
+    def is_floor(self, row: int, col: int) -> bool:
+        """Check if a (row, col) position is inside the board and not a wall."""
+        return (
+            0 <= row < self.height
+            and 0 <= col < self.width
+            and self.floor[self.cell(row, col)]
+        )
+
+    def pull_distances(self, switch: int) -> list[int]:
+        """
+        Compute the minimum number of pushes needed to bring a stone from every cell to a switch, ignoring
+        the other stones, by pulling a stone backward from the switch.
+
+        A stone on `cell` can have been pushed there in direction d if `cell - d` (where the stone came
+        from) and `cell - 2d` (where Ares stood) are floor. Since the other stones and the walk of Ares are
+        ignored, the result is a lower bound on the real number of pushes.
+
+        Args:
+            switch (int): The cell of the switch.
+
+        Returns:
+            list of int: The number of pushes from each cell, -1 if a stone there can never reach the switch.
+        """
+        distances = [-1] * len(self.floor)
+        distances[switch] = 0
+        frontier = [switch]
+        for cell in frontier:
+            for direction, previous in enumerate(self.neighbors[cell]):
+                # The stone moved from `previous` to `cell` in the opposite direction
+                if previous < 0 or distances[previous] >= 0:
+                    continue
+                if self.neighbors[previous][direction] < 0:
+                    continue  # No room for Ares behind the stone
+                distances[previous] = distances[cell] + 1
+                frontier.append(previous)
+        return distances
+
+    def find_dead_squares(self) -> bytearray:
+        """
+        Mark the cells from which a stone can never be pushed onto a switch: the floor cells no pull
+        sequence from any switch reaches (see `pull_distances`). This covers corners as well as whole wall
+        segments without a switch.
+
+        Returns:
+            bytearray: 1 for dead cells, 0 for live cells and walls.
+        """
+        return bytearray(
+            1
+            if self.floor[cell] and all(table[cell] < 0 for table in self.push_distances)
+            else 0
+            for cell in range(len(self.floor))
+        )
+
+    def find_tunnels(self) -> list[bytearray]:
+        """
+        Mark, for each direction, the floor cells walled on both sides across it.
+
+        Returns:
+            list of bytearray: 1 for each tunnel cell of a direction, 0 elsewhere.
+        """
+        tunnels = []
+        for direction in range(len(self.directions)):
+            across = [
+                other
+                for other in range(len(self.directions))
+                if other not in (direction, self.opposite[direction])
+            ]
+            tunnels.append(
+                bytearray(
+                    1
+                    if self.floor[cell]
+                    and all(self.neighbors[cell][other] < 0 for other in across)
+                    else 0
+                    for cell in range(len(self.floor))
+                )
+            )
+        return tunnels
+
+    def find_goal_room(self) -> tuple[int, frozenset]:
+        """
+        Find the smallest goal room: an area of at most MAX_ROOM_CELLS cells holding every switch, but no
+        stone or Ares at the start, that the rest of the level only reaches through one entrance cell.
+
+        Returns:
+            tuple: (entrance, room cells), or (-1, empty set) if there is none.
+        """
+        reachable = self.walk_distances(self.start_position, ())
+        if not self.switches or any(switch not in reachable for switch in self.switches):
+            return -1, frozenset()
+        best = (-1, frozenset())
+        for entrance in sorted(reachable):
+            if entrance in self.switch_set:
+                continue
+            # The cells still connected to the switches when the entrance is blocked
+            room = set(self.walk_distances(self.switches[0], (entrance,)))
+            if (
+                len(room) > self.MAX_ROOM_CELLS
+                or any(switch not in room for switch in self.switches)
+                or self.start_position in room
+                or any(stone in room for stone in self.start_stones)
+            ):
+                continue
+            if best[0] < 0 or len(room) < len(best[1]):
+                best = (entrance, frozenset(room))
+        return best
+
+    def room_path(
+        self, stone: int, ares: int, occupied: frozenset, slot: int
+    ) -> str | None:
+        """
+        Find the cheapest way to push a stone inside the goal room onto a switch, fewest pushes first and
+        then fewest steps, with the stones already in the room left in place. Ares stays in the room, on
+        the entrance or on his starting cell. Results are cached in `room_paths`.
+
+        Args:
+            stone (int): The cell of the stone, in the room or on the entrance.
+            ares (int): The cell of Ares.
+            occupied (frozenset of int): The cells of the other stones in the room.
+            slot (int): The switch to push the stone onto.
+
+        Returns:
+            str: The moves, lowercase for walking and uppercase for pushing, or None if it is impossible.
+        """
+        key = (stone, ares, occupied, slot)
+        if key in self.room_paths:
+            return self.room_paths[key]
+
+        walkable = self.goal_room | {self.room_entrance, ares}
+        start = (stone, ares)
+        parents = {start: None}
+        costs = {start: (0, 0)}
+        heap = [(0, 0, stone, ares)]
+        path = None
+        while heap:
+            pushes, steps, stone, ares = heapq.heappop(heap)
+            if costs[stone, ares] < (pushes, steps):
+                continue
+            if stone == slot:
+                moves = []
+                state = (stone, ares)
+                while parents[state] is not None:
+                    state, move = parents[state]
+                    moves.append(move)
+                path = "".join(reversed(moves))
+                break
+            for direction, neighbor in enumerate(self.neighbors[ares]):
+                if neighbor not in walkable or neighbor in occupied:
+                    continue
+                if neighbor != stone:
+                    child, cost = (stone, neighbor), (pushes, steps + 1)
+                    move = self.directions[direction].lower()
+                else:
+                    target = self.neighbors[stone][direction]
+                    if (
+                        target not in self.goal_room
+                        or target in occupied
+                        or (self.dead_squares[target] and not self.surplus)
+                    ):
+                        continue
+                    child, cost = (target, stone), (pushes + 1, steps + 1)
+                    move = self.directions[direction]
+                if child not in costs or cost < costs[child]:
+                    costs[child] = cost
+                    parents[child] = ((stone, ares), move)
+                    heapq.heappush(heap, (*cost, *child))
+        self.room_paths[key] = path
+        return path
+
+    def analyze_packing(self) -> tuple:
+        """
+        Find the goal room, the packing order and its prerequisites. A goal room without a packing order
+        through its entrance is dropped, and the order is then looked for over the whole level.
+
+        Returns:
+            tuple: (room_entrance, goal_room, packing_order, packing_prerequisites, room_paths).
+        """
+        self.room_entrance, self.goal_room = self.find_goal_room()
+        self.room_paths = {}  # (stone, Ares, occupied switches, slot) -> moves, see room_path
+        order = self.find_packing_order()
+        if not order and self.room_entrance >= 0:
+            self.room_entrance, self.goal_room = -1, frozenset()
+            order = self.find_packing_order()
+        prerequisites = {}
+        if order:
+            for switch in self.switches:
+                if not self.is_frozen(switch):
+                    continue  # A stone resting here can still make way later
+                # The switches that need Ares to stand on this one while they are filled, and that a
+                # stone on this one cannot be pushed on to
+                blocked = tuple(
+                    other
+                    for index, other in enumerate(self.switches)
+                    if other != switch
+                    and self.push_distances[index][switch] < 0
+                    and not self.can_fill(other, (), {switch})
+                )
+                if blocked:
+                    prerequisites[switch] = blocked
+        return self.room_entrance, self.goal_room, order, prerequisites, self.room_paths
+
+    def is_frozen(self, cell: int) -> bool:
+        """
+        Check if a stone on a cell can never be pushed off it: in every direction, either the cell Ares
+        would push from or the cell the stone would go to is a wall, or the stone would go to a dead
+        square. Other stones are ignored since they may move away, so this never says yes wrongly.
+
+        Args:
+            cell (int): The cell of the stone.
+
+        Returns:
+            bool: True if the stone stays on the cell for the rest of the game.
+        """
+        for direction, target in enumerate(self.neighbors[cell]):
+            origin = self.neighbors[cell][self.opposite[direction]]
+            if origin < 0 or target < 0:
+                continue
+            if self.dead_squares[target] and not self.surplus:
+                continue
+            return False
+        return True
+
+    def can_fill(self, slot: int, occupied, blocked=()) -> bool:
+        """
+        Check if a stone can be pushed onto a switch from a cell that is not a switch (or from where a
+        stone starts) while the occupied cells hold stones that never move. Like `pull_distances`, the
+        walk of Ares between pushes is ignored, so this may say yes when the answer is no, never the
+        other way around.
+
+        Args:
+            slot (int): The switch to fill.
+            occupied (set of int): The cells of the stones in the way.
+            blocked (set of int): Cells Ares may not stand on to push, though stones may cross them.
+
+        Returns:
+            bool: False if the switch can never be filled.
+        """
+        seen = {slot}
+        frontier = [slot]
+        for cell in frontier:
+            if cell not in self.switch_set or cell in self.start_stones:
+                return True
+            for direction, previous in enumerate(self.neighbors[cell]):
+                # The stone moved from `previous` to `cell`, pushed by Ares standing beyond `previous`
+                if previous < 0 or previous in seen or previous in occupied:
+                    continue
+                ares = self.neighbors[previous][direction]
+                if ares < 0 or ares in occupied or ares in blocked:
+                    continue
+                seen.add(previous)
+                frontier.append(previous)
+        return False
+
+    def find_packing_order(self) -> tuple[int, ...]:
+        """
+        Order the switches so each can be filled once the previous ones hold stones, by a retrograde
+        search: with every switch full, the last one is a switch that can still be filled when all the
+        others are occupied, and so on. With a goal room, a switch is filled by pushing a stone through
+        the entrance (see `room_path`) and the one reached with the fewest pushes is taken; otherwise
+        `can_fill` decides.
+
+        Returns:
+            tuple of int: The switches in filling order, or an empty tuple if no order was found.
+        """
+        entrance = self.room_entrance
+        # Where Ares stands to push a stone from the entrance into the room
+        origins = []
+        if entrance >= 0:
+            for direction, inside in enumerate(self.neighbors[entrance]):
+                origin = self.neighbors[entrance][self.opposite[direction]]
+                if inside in self.goal_room and origin >= 0 and origin not in self.goal_room:
+                    origins.append(origin)
+        remaining = set(self.switches)
+        order = []
+        while remaining:
+            best = None
+            for slot in sorted(remaining):
+                occupied = frozenset(remaining - {slot})
+                if entrance < 0:
+                    if self.can_fill(slot, occupied):
+                        best = (None, slot)
+                        break
+                    continue
+                for origin in origins:
+                    path = self.room_path(entrance, origin, occupied, slot)
+                    if path is None:
+                        continue
+                    cost = (sum(move.isupper() for move in path), len(path))
+                    if best is None or cost < best[0]:
+                        best = (cost, slot)
+            if best is None:
+                return ()
+            order.append(best[1])
+            remaining.remove(best[1])
+        return tuple(reversed(order))
+
+    def preserves_packing(self, image: list[int]) -> bool:
+        """Check if an automorphism maps the goal room's fixed order and the prerequisites onto themselves."""
+        if self.macros and self.room_entrance >= 0:
+            # The macros fill the switches in a fixed order
+            fixed = (self.room_entrance,) + self.packing_order
+            if any(image[cell] != cell for cell in fixed):
+                return False
+        if self.packing:
+            for switch in self.switches:
+                required = self.packing_prerequisites.get(switch, ())
+                mapped = self.packing_prerequisites.get(image[switch], ())
+                if {image[cell] for cell in required} != set(mapped):
+                    return False
+        return True
+
+    def breaks_packing(self, stones: tuple[int, ...], target: int) -> bool:
+        """
+        Check if a push leaves a stone for good on a switch while a switch it blocks is still empty (see
+        `packing_prerequisites`). That switch can then never be filled, so the push is a deadlock.
+
+        Args:
+            stones (tuple of int): The cell of each stone slot after the push.
+            target (int): The cell the stone was pushed to.
+
+        Returns:
+            bool: True if the push breaks the packing order.
+        """
+        required = self.packing_prerequisites.get(target)
+        if not self.packing or required is None:
+            return False
+        return not all(cell in stones for cell in required)
+
+    def zobrist(self, region: int, stones: tuple[int, ...]) -> int:
+        """
+        Compute the Zobrist hash of a state from scratch. Searches only do this for the initial state and
+        update the hash of every child with `push_key`.
+
+        Args:
+            region (int): The cell identifying Ares' part of the state.
+            stones (tuple of int): The cell of each stone slot.
+
+        Returns:
+            int: The 64-bit hash.
+        """
+        key = self.zobrist_ares[region]
+        for slot, cell in enumerate(stones):
+            key ^= self.slot_keys[slot][cell]
+        return key
+
+    def find_automorphisms(self) -> list[list[int]]:
+        """
+        Find the symmetries of the level: the rotations and reflections of the bounding box of the cells
+        Ares can reach (ignoring stones) that map those cells onto themselves and switches onto switches.
+        A state and its image under such a symmetry have solutions of the same steps and weight.
+
+        Returns:
+            list of list of int: For each symmetry other than the identity, the image of every cell (-1
+            for cells Ares cannot reach).
+        """
+        reachable = self.walk_distances(self.start_position, ())
+        if any(stone not in reachable for stone in self.start_stones):
+            return []
+        rows = [self.coordinates[cell][0] for cell in reachable]
+        cols = [self.coordinates[cell][1] for cell in reachable]
+        top, left = min(rows), min(cols)
+        height, width = max(rows) - top + 1, max(cols) - left + 1
+
+        automorphisms = []
+        for transpose in (False, True):
+            if transpose and height != width:
+                continue
+            for flip_rows in (False, True):
+                for flip_cols in (False, True):
+                    if not (transpose or flip_rows or flip_cols):
+                        continue  # The identity
+                    image = [-1] * len(self.floor)
+                    for cell in reachable:
+                        row, col = self.coordinates[cell]
+                        row, col = row - top, col - left
+                        if transpose:
+                            row, col = col, row
+                        if flip_rows:
+                            row = height - 1 - row
+                        if flip_cols:
+                            col = width - 1 - col
+                        target = self.cell(row + top, col + left)
+                        if target not in reachable or (cell in self.switch_set) != (
+                            target in self.switch_set
+                        ):
+                            break
+                        image[cell] = target
+                    else:
+                        automorphisms.append(image)
+        return automorphisms
+
+    def symmetric_zobrist(self, cells, stones: tuple[int, ...], zobrist: int) -> int:
+        """
+        Return the smallest Zobrist hash of a state and its images under the automorphisms, which is the
+        same for every state of a symmetry class.
+
+        Args:
+            cells (iterable of int): The cells of Ares' region (or just his cell in a step-level search).
+            stones (tuple of int): The cell of each stone slot.
+            zobrist (int): The hash of the state itself (see `zobrist`).
+
+        Returns:
+            int: The hash of the class.
+        """
+        slot_keys = self.slot_keys
+        for image in self.automorphisms:
+            # Hashes ignore the order of interchangeable stones, so the image needs no sorting
+            key = self.zobrist_ares[min(image[cell] for cell in cells)]
+            for slot, cell in enumerate(stones):
+                key ^= slot_keys[slot][image[cell]]
+            if key < zobrist:
+                zobrist = key
+        return zobrist
+
+    def canonical_stones(self, stones: list[int]) -> tuple[int, ...]:
+        """
+        Sort the cells of interchangeable (equal weight) stones so each state has one representation.
+
+        Args:
+            stones (list of int): The cell of each stone slot. Modified in place.
+
+        Returns:
+            tuple of int: The canonical stone tuple.
+        """
+        for start, end in self.shared_groups:
+            stones[start:end] = sorted(stones[start:end])
+        return tuple(stones)
+
+    def push(self, stones: tuple[int, ...], slot: int, target: int) -> tuple[int, ...]:
+        """
+        Return the stone tuple after moving the stone of a slot to a target cell.
+
+        Args:
+            stones (tuple of int): The cell of each stone slot.
+            slot (int): The slot of the pushed stone.
+            target (int): The cell the stone is pushed to.
+
+        Returns:
+            tuple of int: The canonical stone tuple after the push.
+        """
+        start, end = self.slot_groups[slot]
+        if end - start > 1:
+            new_stones = list(stones)
+            new_stones[slot] = target
+            return self.canonical_stones(new_stones)
+        return stones[:slot] + (target,) + stones[slot + 1 :]
+
+    def move(
+        self,
+        position: int,
+        stones: tuple[int, ...],
+        direction: int,
+        detector=None,
+    ) -> tuple[str, int, tuple[int, ...], int, int, int, int] | None:
+        """
+        Compute the state reached by moving Ares in a direction, without side effects.
+
+        Args:
+            position (int): The cell of Ares.
+            stones (tuple of int): The cell of each stone slot.
+            direction (int): The index of the direction in `directions`.
+            detector (DeadlockDetector, optional): Rejects pushes into dynamic deadlocks and counts prunes.
+
+        Returns:
+            tuple or None: (action, new_position, new_stones, push_cost, steps, region, stone_key) if the move
+            is valid, otherwise None. The action is lowercase for a plain move and uppercase for a push,
+            push_cost is the weight of the pushed stone (0 for a plain move), steps is always 1, region is
+            the new position (single moves are searched on exact positions) and stone_key is the value to
+            XOR into the parent's Zobrist hash for the stone that moved (0 for a plain move).
+        """
+        new_position = self.neighbors[position][direction]
+        if new_position < 0:
+            return None
+
+        if new_position not in stones:
+            # Regular move
+            return (
+                self.directions[direction].lower(),
+                new_position,
+                stones,
+                0,
+                1,
+                new_position,
+                0,
+            )
+
+        # Try to push the stone
+        target = self.neighbors[new_position][direction]
+        if target < 0 or target in stones:
+            return None
+        if self.dead_squares[target] and not self.surplus:
+            if detector is not None:
+                detector.counts["dead_square"] += 1
+            return None
+
+        slot = stones.index(new_position)
+        new_stones = self.push(stones, slot, target)
+        if self.breaks_packing(new_stones, target):
+            if detector is not None:
+                detector.counts["packing"] += 1
+            return None
+        if detector is not None and detector.is_deadlock(new_stones, target):
+            return None
+        keys = self.slot_keys[slot]
+        return (
+            self.directions[direction],
+            new_position,
+            new_stones,
+            self.weights[slot],
+            1,
+            new_position,
+            keys[new_position] ^ keys[target],
+        )
+
+    def successors(self, position: int, stones: tuple[int, ...], detector=None):
+        """
+        Generate every state reachable from the given state with a single move.
+
+        Args:
+            position (int): The cell of Ares.
+            stones (tuple of int): The cell of each stone slot.
+            detector (DeadlockDetector, optional): Rejects pushes into dynamic deadlocks and counts prunes.
+
+        Yields:
+            tuple: (action, new_position, new_stones, push_cost, steps, region, stone_key) for each valid
+            move, in MOVEMENTS order.
+        """
+        for direction in range(len(self.directions)):
+            result = self.move(position, stones, direction, detector)
+            if result is not None:
+                yield result
+
+    def pull_successors(self, position: int, stones: tuple[int, ...]):
+        """
+        Generate every state from which a single move leads to the given state, for searching backward
+        from the goal. Undoing a plain move walks Ares back; undoing a push pulls the stone in front of
+        him back onto his cell. Pulled stones never land on dead squares, so no deadlock check is needed.
+
+        Args:
+            position (int): The cell of Ares.
+            stones (tuple of int): The cell of each stone slot.
+
+        Yields:
+            tuple: (action, new_position, new_stones, push_cost, steps, region, stone_key) like `successors`,
+            where the action is the forward move that leads from the new state back to the given one.
+        """
+        for direction in range(len(self.directions)):
+            previous = self.neighbors[position][self.opposite[direction]]
+            if previous < 0 or previous in stones:
+                continue
+            yield (
+                self.directions[direction].lower(),
+                previous,
+                stones,
+                0,
+                1,
+                previous,
+                0,
+            )
+
+            stone = self.neighbors[position][direction]
+            if stone < 0 or stone not in stones:
+                continue
+            slot = stones.index(stone)
+            keys = self.slot_keys[slot]
+            yield (
+                self.directions[direction],
+                previous,
+                self.push(stones, slot, position),
+                self.weights[slot],
+                1,
+                previous,
+                keys[stone] ^ keys[position],
+            )
+
+    def goal_arrangements(self):
+        """
+        Generate every canonical stone tuple that covers all switches, one per way of sharing the switches
+        between the slot groups. Only defined when there are as many stones as switches.
+
+        Yields:
+            tuple of int: A solved stone configuration.
+        """
+        if len(self.weights) != len(self.switches):
+            return
+        groups = sorted(set(self.slot_groups))
+
+        def assign(index, free):
+            if index == len(groups):
+                yield ()
+                return
+            start, end = groups[index]
+            for chosen in combinations(free, end - start):
+                remaining = tuple(cell for cell in free if cell not in chosen)
+                for rest in assign(index + 1, remaining):
+                    yield chosen + rest
+
+        yield from assign(0, self.switches)
+
+    def walk_distances(self, position: int, stones: tuple[int, ...]) -> dict[int, int]:
+        """
+        Flood fill the cells Ares can walk to without pushing any stone.
+
+        Args:
+            position (int): The cell of Ares.
+            stones (tuple of int): The cell of each stone slot.
+
+        Returns:
+            dict(int, int): The number of steps to each reachable cell.
+        """
+        distances = {position: 0}
+        frontier = [position]
+        for cell in frontier:  # The list grows while it is scanned, like a FIFO queue
+            steps = distances[cell] + 1
+            for neighbor in self.neighbors[cell]:
+                if neighbor >= 0 and neighbor not in distances and neighbor not in stones:
+                    distances[neighbor] = steps
+                    frontier.append(neighbor)
+        return distances
+
+    def normalize(self, position: int, stones: tuple[int, ...]) -> int:
+        """
+        Return the representative cell (the smallest index) of the region Ares can walk in.
+
+        States whose Ares positions share a region are equivalent for a push-level search.
+        """
+        return min(self.walk_distances(position, stones))
+
+    def push_successors(
+        self, position: int, stones: tuple[int, ...], detector=None
+    ):
+        """
+        Generate every state reachable from the given state by walking to a stone and pushing it once, or
+        several times when a macro applies (see `follow_push`).
+
+        Args:
+            position (int): The exact cell of Ares.
+            stones (tuple of int): The cell of each stone slot.
+            detector (DeadlockDetector, optional): Rejects pushes into dynamic deadlocks (including
+                corrals, since the walkable region after the push is known) and counts prunes.
+
+        Yields:
+            tuple: (action, new_position, new_stones, push_cost, steps, region, stone_key) for each push,
+            where the action is the uppercase push direction followed by the moves of its macro (if any),
+            new_position is the exact cell of Ares afterwards, steps counts the walk plus the moves of the
+            action and region is the normalized region after the push.
+        """
+        distances = self.walk_distances(position, stones)
+        for slot, stone in enumerate(stones):
+            for direction in range(len(self.directions)):
+                origin = self.neighbors[stone][self.opposite[direction]]
+                if origin not in distances:
+                    continue
+                target = self.neighbors[stone][direction]
+                if target < 0 or target in stones:
+                    continue
+                if self.dead_squares[target] and not self.surplus:
+                    if detector is not None:
+                        detector.counts["dead_square"] += 1
+                    continue
+                action, ares = self.directions[direction], stone
+                if self.macros:
+                    action, ares, target = self.follow_push(stones, stone, direction)
+                new_stones = self.push(stones, slot, target)
+                if self.breaks_packing(new_stones, target):
+                    if detector is not None:
+                        detector.counts["packing"] += 1
+                    continue
+                reachable = self.walk_distances(ares, new_stones)
+                if detector is not None and detector.is_deadlock(
+                    new_stones, target, reachable
+                ):
+                    continue
+                keys = self.slot_keys[slot]
+                yield (
+                    action,
+                    ares,
+                    new_stones,
+                    self.weights[slot] * sum(move.isupper() for move in action),
+                    distances[origin] + len(action),
+                    min(reachable),
+                    keys[stone] ^ keys[target],
+                )
+
+    def follow_push(
+        self, stones: tuple[int, ...], stone: int, direction: int
+    ) -> tuple[str, int, int]:
+        """
+        Push a stone once and carry on with the macros that apply:
+
+            - tunnel: while the stone and Ares behind it are both in a tunnel along the push, the stone is
+              not on a switch and the next cell is free and not dead, push again. Left inside, the stone
+              could only block the tunnel, so no solution needs the intermediate states.
+            - goal room: when the stone enters the goal room through its entrance, push it to the next
+              free switch of the packing order along `room_path`. If the stones already in the room
+              leave no way there, the stone stays where it entered.
+
+        Args:
+            stones (tuple of int): The cell of each stone slot before the push.
+            stone (int): The cell of the pushed stone.
+            direction (int): The index of the push direction in `directions`.
+
+        Returns:
+            tuple: (moves, Ares' cell, the stone's cell) after the macro, where moves starts with the
+            first push.
+        """
+        push = self.directions[direction]
+        tunnel = self.tunnels[direction]
+        moves, ares, stone = push, stone, self.neighbors[stone][direction]
+        while (
+            tunnel[stone]
+            and tunnel[ares]
+            and stone not in self.switch_set
+            and stone not in self.goal_room
+        ):
+            target = self.neighbors[stone][direction]
+            if target < 0 or target in stones:
+                break
+            if self.dead_squares[target] and not self.surplus:
+                break
+            moves += push
+            ares, stone = stone, target
+
+        if ares == self.room_entrance and stone in self.goal_room:
+            occupied = frozenset(cell for cell in stones if cell in self.goal_room)
+            slot = next((cell for cell in self.packing_order if cell not in occupied), -1)
+            path = self.room_path(stone, ares, occupied, slot) if slot >= 0 else None
+            if path:
+                moves += path
+                # Ares ends behind the stone, which ends on the switch
+                ares = self.neighbors[slot][self.opposite[self.directions.index(path[-1])]]
+                stone = slot
+        return moves, ares, stone
+
+    def walk_path(self, source: int, destination: int, stones: tuple[int, ...]) -> str:
+        """
+        Find the shortest sequence of plain moves between two cells, used to rebuild push-level paths.
+
+        Args:
+            source (int): The cell Ares starts from.
+            destination (int): The cell Ares has to reach.
+            stones (tuple of int): The cell of each stone slot, treated as obstacles.
+
+        Returns:
+            str: The lowercase moves, or None if the destination cannot be reached.
+        """
+        parents = {source: None}
+        frontier = [source]
+        for cell in frontier:
+            if cell == destination:
+                break
+            for direction, neighbor in enumerate(self.neighbors[cell]):
+                if neighbor >= 0 and neighbor not in parents and neighbor not in stones:
+                    parents[neighbor] = (cell, direction)
+                    frontier.append(neighbor)
+        if destination not in parents:
+            return None
+
+        moves = []
+        cell = destination
+        while parents[cell] is not None:
+            cell, direction = parents[cell]
+            moves.append(self.directions[direction].lower())
+        return "".join(reversed(moves))
+
+    def is_goal(self, stones: tuple[int, ...]) -> bool:
+        """
+        Check if every switch is covered by a stone.
+
+        Args:
+            stones (tuple of int): The cell of each stone slot.
+
+        Returns:
+            bool: True if all switches have stones, False otherwise.
+        """
+        covered = sum(1 for cell in stones if cell in self.switch_set)
+        return covered == len(self.switches)
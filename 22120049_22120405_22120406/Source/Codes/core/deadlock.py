@@ -0,0 +1,243 @@
+from .board import Board
+
+
+class DeadlockDetector:
+    """
+    The DeadlockDetector class recognizes states that can never be solved, right after a push, so the
+    search can drop them before they reach the frontier. It complements the static dead squares of the
+    Board with checks that depend on the other stones:
+
+        - block: the pushed stone completes a 2x2 square of stones and walls with a stone off a switch.
+        - freeze: the pushed stone can no longer move along either axis (blocked by walls, dead squares or
+          other frozen stones) and one of the frozen stones is not on a switch.
+        - corral: the push closes an area Ares cannot enter, and a small search over the stones around it
+          (with every other stone removed) finds no way to either fill the area's switches or open it up.
+
+    When there are more stones than switches, the surplus stones may end anywhere, so a state is only a
+    deadlock when more stones than the surplus are stuck off the switches.
+
+    Parameters:
+        board (Board): The static board the states belong to.
+        corral_node_limit (int): The number of states the corral search may visit before giving up.
+
+    Attributes:
+        counts (dict(str, int)): How many states each check pruned, including "dead_square" and
+            "packing" which are counted by the Board when it refuses a push onto a dead square or one that
+            breaks the packing order (see Board.breaks_packing), and "assignment" which is
+            counted by the search when a heuristic finds that the stones cannot all reach distinct switches.
+    """
+
+    CORRAL_CACHE_SIZE = 10000
+
+    def __init__(self, board: Board, corral_node_limit: int = 200):
+        self.board = board
+        self.corral_node_limit = corral_node_limit
+        self.surplus = board.surplus
+        self.counts = {
+            "dead_square": 0,
+            "block": 0,
+            "freeze": 0,
+            "corral": 0,
+            "assignment": 0,
+            "packing": 0,
+        }
+
+        # The three other cells of each 2x2 square a cell belongs to. Cells outside the board are walls.
+        self.squares = []
+        for cell in range(len(board.floor)):
+            row, col = board.coordinates[cell]
+            squares = []
+            for delta_row in (-1, 1):
+                for delta_col in (-1, 1):
+                    squares.append(
+                        (
+                            self._cell_or_wall(row + delta_row, col),
+                            self._cell_or_wall(row, col + delta_col),
+                            self._cell_or_wall(row + delta_row, col + delta_col),
+                        )
+                    )
+            self.squares.append(tuple(squares))
+
+        # Pairs of opposite directions, one per axis
+        self.axes = []
+        for direction, opposite in enumerate(board.opposite):
+            if direction < opposite:
+                self.axes.append((direction, opposite))
+        self.corral_cache = {}
+
+    def _cell_or_wall(self, row: int, col: int) -> int:
+        """Return the cell at (row, col), or -1 if it is a wall or outside the board."""
+        return self.board.cell(row, col) if self.board.is_floor(row, col) else -1
+
+    def is_deadlock(
+        self,
+        stones: tuple[int, ...],
+        pushed: int,
+        reachable: dict[int, int] | None = None,
+    ) -> bool:
+        """
+        Check if the state after a push is a deadlock, and count which check found it.
+
+        Args:
+            stones (tuple of int): The cell of each stone slot after the push.
+            pushed (int): The cell the pushed stone moved to.
+            reachable (dict, optional): The cells Ares can walk to after the push. The corral check only
+                runs when it is given (push-level search computes it anyway).
+
+        Returns:
+            bool: True if the state can never be solved, False otherwise.
+        """
+        occupied = set(stones)
+        if self.is_block(occupied, pushed):
+            self.counts["block"] += 1
+            return True
+        if self.is_freeze(occupied, pushed):
+            self.counts["freeze"] += 1
+            return True
+        if reachable is not None and self.is_corral(occupied, pushed, reachable):
+            self.counts["corral"] += 1
+            return True
+        return False
+
+    def is_block(self, occupied: set[int], pushed: int) -> bool:
+        """
+        Check if the pushed stone completes a 2x2 square of walls and stones with more stones off a
+        switch than the surplus.
+        """
+        switches = self.board.switch_set
+        for square in self.squares[pushed]:
+            if all(cell < 0 or cell in occupied for cell in square):
+                stuck = sum(
+                    1 for cell in (pushed, *square) if cell >= 0 and cell not in switches
+                )
+                if stuck > self.surplus:
+                    return True
+        return False
+
+    def is_freeze(self, occupied: set[int], pushed: int) -> bool:
+        """Check if the pushed stone is frozen together with more stones off a switch than the surplus."""
+        frozen = []
+        if not self._is_frozen(pushed, occupied, set(), frozen):
+            return False
+        stuck = sum(1 for cell in frozen if cell not in self.board.switch_set)
+        return stuck > self.surplus
+
+    def _is_frozen(
+        self, cell: int, occupied: set[int], walls: set[int], frozen: list[int]
+    ) -> bool:
+        """
+        Check if the stone on a cell can never move again.
+
+        Stones already being examined are treated as walls, which resolves stones blocking each other.
+        Every stone found frozen is appended to `frozen`.
+        """
+        walls.add(cell)
+        neighbors = self.board.neighbors[cell]
+        dead_squares = self.board.dead_squares
+        result = True
+        for first, second in self.axes:
+            before, after = neighbors[first], neighbors[second]
+            if before < 0 or after < 0 or before in walls or after in walls:
+                continue
+            if dead_squares[before] and dead_squares[after] and not self.surplus:
+                continue  # Surplus stones may still be pushed onto dead squares
+            if (before in occupied and self._is_frozen(before, occupied, walls, frozen)) or (
+                after in occupied and self._is_frozen(after, occupied, walls, frozen)
+            ):
+                continue
+            result = False
+            break
+        walls.discard(cell)
+        if result:
+            frozen.append(cell)
+        return result
+
+    def is_corral(
+        self, occupied: set[int], pushed: int, reachable: dict[int, int]
+    ) -> bool:
+        """
+        Check if the push closed an area (a corral) Ares cannot enter and that can never be resolved.
+
+        The stones touching the area are searched alone, with every other stone removed. Removing stones
+        only makes the level easier, so if even then the corral stones can neither fill every switch of the
+        area nor open it (a stone leaving it or Ares walking into it), the real state is a deadlock too.
+        """
+        board = self.board
+        checked = set()
+        for seed in board.neighbors[pushed]:
+            if seed < 0 or seed in occupied or seed in reachable or seed in checked:
+                continue
+
+            # Flood fill the area Ares cannot reach behind the pushed stone
+            area = {seed}
+            frontier = [seed]
+            corral_stones = set()
+            for cell in frontier:
+                for neighbor in board.neighbors[cell]:
+                    if neighbor < 0 or neighbor in area:
+                        continue
+                    if neighbor in occupied:
+                        corral_stones.add(neighbor)
+                    else:
+                        area.add(neighbor)
+                        frontier.append(neighbor)
+
+            # Ares stands where the flood fill of `reachable` started
+            ares = next(iter(reachable))
+            corral = tuple(sorted(corral_stones))
+            key = (frozenset(area), corral, self._region(ares, corral))
+            if key not in self.corral_cache:
+                if len(self.corral_cache) >= self.CORRAL_CACHE_SIZE:
+                    self.corral_cache.clear()
+                self.corral_cache[key] = self._is_corral_deadlock(area, corral, ares)
+            if self.corral_cache[key]:
+                return True
+            checked |= area
+        return False
+
+    def _is_corral_deadlock(
+        self, area: set[int], corral: tuple[int, ...], ares: int
+    ) -> bool:
+        """Search the pushes of the corral stones alone; True if the corral can never be resolved."""
+        board = self.board
+        switches = board.switch_set
+        area_switches = switches & area
+        enclosure = area.union(corral)
+
+        visited = {(corral, self._region(ares, corral))}
+        frontier = [(ares, corral)]
+        for position, corral in frontier:
+            if len(visited) > self.corral_node_limit:
+                return False  # Unknown, keep the state
+
+            distances = board.walk_distances(position, corral)
+            if not area.isdisjoint(distances):
+                return False  # Ares can walk into the corral
+            stuck = sum(1 for cell in corral if cell not in switches)
+            if stuck <= self.surplus and area_switches <= set(corral):
+                return False  # The corral can be solved on its own
+
+            for index, stone in enumerate(corral):
+                for direction in range(len(board.directions)):
+                    origin = board.neighbors[stone][board.opposite[direction]]
+                    if origin not in distances:
+                        continue
+                    target = board.neighbors[stone][direction]
+                    if target < 0 or target in corral:
+                        continue
+                    if board.dead_squares[target] and not self.surplus:
+                        continue
+                    if target not in enclosure:
+                        return False  # A stone leaves the corral
+                    new_corral = tuple(
+                        sorted(corral[:index] + (target,) + corral[index + 1 :])
+                    )
+                    key = (new_corral, self._region(stone, new_corral))
+                    if key not in visited:
+                        visited.add(key)
+                        frontier.append((stone, new_corral))
+        return True
+
+    def _region(self, position: int, stones: tuple[int, ...]) -> int:
+        """Return the normalized region of Ares among the given stones."""
+        return self.board.normalize(position, stones)
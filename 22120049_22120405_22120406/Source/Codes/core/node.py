@@ -1,55 +1,86 @@
-from copy import deepcopy
-
-
 class Node:
     """
     A class to represent a node in the search algorithm.
 
+    States are stored in the compact encoding of Board: Ares and the stones are flat cell indices, and
+    stone weights live once on the board, so a node only holds a few integers and a shared tuple.
+
+    In a push-level search a node is one push away from its parent: `position` is the exact cell of Ares
+    after the push, and `region` is the normalized region Ares can walk in, which is what identifies the
+    state. In a step-level search both are the same cell.
+
     Attributes:
-        position (tuple): A tuple representing the (row, column) position of Ares.
-        stones (list): A list of tuples representing the positions of stones in the grid.
+        position (int): The cell of Ares.
+        region (int): The cell identifying Ares' part of the state (see Board.normalize).
+        stones (tuple of int): The cell of each stone slot (see Board).
         parent (Node): The parent node from which this node was derived.
         action (str): The action taken to reach this node (e.g., 'u', 'd', 'l', 'r', 'U', 'D', 'L', 'R').
         g_cost (int): The cost to reach this node from the start node (for pathfinding algorithms).
         h_cost (int): The heuristic cost estimate to reach the goal from this node (for A* algorithm).
+        weight (int): The total weight of the stones pushed to reach this node.
+        steps (int): The number of moves (walking and pushing) taken to reach this node.
+        zobrist (int): The 64-bit Zobrist hash of the state (see Board.zobrist), used as the node's hash.
     """
 
+    __slots__ = (
+        "position",
+        "stones",
+        "parent",
+        "action",
+        "g_cost",
+        "h_cost",
+        "weight",
+        "steps",
+        "region",
+        "zobrist",
+    )
+
     def __init__(
         self,
-        position: tuple[int, int],
-        stones: list[tuple[int, int, int]],
+        position: int,
+        stones: tuple[int, ...],
         parent=None,
         action: str = "",
         g_cost=0,
         h_cost=0,
         weight=0,
+        steps=0,
+        region=None,
+        zobrist=None,
     ):
         """
         Initializes a Node with the given parameters.
 
         Args:
-            position (tuple): The (row, column) position of Ares.
-            stones (list of tuple(row, col, weight)): The current positions of stones on the grid.
+            position (int): The cell of Ares.
+            stones (tuple of int): The cell of each stone slot. The tuple is shared, not copied.
             parent (Node, optional): The parent node. Defaults to None.
             action (str, optional): The action taken to reach this node. Defaults to None.
             g_cost (int, optional): The cost to reach this node. Defaults to 0.
             h_cost (int, optional): The heuristic cost to reach the goal. Defaults to 0.
+            weight (int, optional): The total weight pushed so far. Defaults to 0.
+            steps (int, optional): The number of moves taken so far. Defaults to 0.
+            region (int, optional): The cell identifying Ares' region. Defaults to the position.
+            zobrist (int, optional): The Zobrist hash of the state. Defaults to Python's hash of the state.
         """
-        self.position = deepcopy(position)
-        self.stones = deepcopy(stones)
+        self.position = position
+        self.stones = stones
         self.parent = parent
         self.action = action
         self.g_cost = g_cost
         self.h_cost = h_cost
         self.weight = weight
+        self.steps = steps
+        self.region = position if region is None else region
+        self.zobrist = hash((self.region, stones)) if zobrist is None else zobrist
 
     def __eq__(self, other):
-        """Check if two nodes are equal based on their position and stones."""
-        return (self.position == other.position) and (self.stones == other.stones)
+        """Check if two nodes are equal based on Ares' region and stones."""
+        return (self.region == other.region) and (self.stones == other.stones)
 
     def __hash__(self):
-        """Generate a hash for the node based on its position and stones."""
-        return hash((self.position, tuple(self.stones)))
+        """Return the hash of the node's state, computed once on creation."""
+        return self.zobrist
 
     def total_cost(self) -> int:
         """Calculate the total cost of the node (g_cost + h_cost)."""
@@ -69,5 +100,5 @@ class Node:
         return f"Node: {self.position}, Stones: {self.stones}, Cost: {self.total_cost()}, Action: {self.action}"
 
     def __lt__(self, other):
-        """Return True if the data structure is less than the other data structure."""
-        return True
+        """Break ties between nodes of equal cost in favor of the one reached in fewer steps."""
+        return self.steps < other.steps
@@ -0,0 +1,297 @@
+import hashlib
+import sqlite3
+import time
+
+from ..algorithms.base_search import Solution
+from ..configs.constants import MOVEMENTS, GridConstants
+
+# The row and column delta of each move character (lowercase walks, uppercase pushes)
+MOVE_DELTAS = {
+    **MOVEMENTS,
+    **{move.lower(): delta for move, delta in MOVEMENTS.items()},
+}
+
+# The 8 symmetries of a board, as (transpose, flip rows, flip columns) applied in that order
+SYMMETRIES = [
+    (transpose, flip_rows, flip_cols)
+    for transpose in (False, True)
+    for flip_rows in (False, True)
+    for flip_cols in (False, True)
+]
+
+STONE_CHARS = (GridConstants.STONE, GridConstants.STONE_ON_SWITCH)
+
+
+def transform_rows(rows: list[str], symmetry: tuple) -> list[str]:
+    """Apply a symmetry to a rectangular grid of characters."""
+    transpose, flip_rows, flip_cols = symmetry
+    if transpose:
+        rows = ["".join(column) for column in zip(*rows)]
+    if flip_rows:
+        rows = rows[::-1]
+    if flip_cols:
+        rows = [row[::-1] for row in rows]
+    return rows
+
+
+def transform_cell(cell: tuple, height: int, width: int, symmetry: tuple) -> tuple:
+    """Apply a symmetry to the (row, col) of a cell of a height x width grid."""
+    transpose, flip_rows, flip_cols = symmetry
+    row, col = cell
+    if transpose:
+        row, col, height, width = col, row, width, height
+    return (height - 1 - row if flip_rows else row), (width - 1 - col if flip_cols else col)
+
+
+def path_table(symmetry: tuple, inverse: bool) -> dict[int, str]:
+    """Build the str.translate table mapping every move character through a symmetry (or its inverse)."""
+    transpose, flip_rows, flip_cols = symmetry
+    characters = {(delta, move.isupper()): move for move, delta in MOVE_DELTAS.items()}
+    table = {}
+    for move, (row, col) in MOVE_DELTAS.items():
+        if transpose and not inverse:
+            row, col = col, row
+        row, col = (-row if flip_rows else row), (-col if flip_cols else col)
+        if transpose and inverse:
+            row, col = col, row
+        table[ord(move)] = characters[((row, col), move.isupper())]
+    return table
+
+
+# The translation table of each (symmetry, inverse) pair
+PATH_TABLES = {
+    (symmetry, inverse): path_table(symmetry, inverse)
+    for symmetry in SYMMETRIES
+    for inverse in (False, True)
+}
+
+
+def transform_path(path: str, symmetry: tuple, inverse: bool = False) -> str:
+    """
+    Map a move sequence through a symmetry of the board.
+
+    Args:
+        path (str): The moves on the original board.
+        symmetry (tuple): (transpose, flip rows, flip columns).
+        inverse (bool): Map from the transformed board back to the original one instead.
+
+    Returns:
+        str: The same moves on the other board.
+    """
+    return path.translate(PATH_TABLES[symmetry, inverse])
+
+
+def canonical_level(text: str) -> tuple[str, tuple]:
+    """
+    Compute the canonical key of a level, the same for the level and any rotation or reflection of it.
+
+    The grid is padded to a rectangle and trimmed of its empty border rows and columns. Each of the 8
+    symmetric images is written as its rows followed by the stone weights in its row-major stone order,
+    and the smallest one is hashed.
+
+    Args:
+        text (str): The content of a level file: the weights line, then the grid.
+
+    Returns:
+        tuple: (key, symmetry). key is a hex digest, and symmetry maps the level onto its canonical image
+        (see transform_path).
+    """
+    weight_line, _, grid_text = text.partition("\n")
+    weights = weight_line.split()
+    lines = grid_text.replace("\r", "").split("\n")
+    width = max((len(line) for line in lines), default=0)
+    rows = [line.ljust(width) for line in lines]
+    # Trim empty border rows, then empty border columns
+    filled = [index for index, row in enumerate(rows) if row.strip()]
+    if filled:
+        rows = rows[filled[0] : filled[-1] + 1]
+    filled = [index for index in range(width) if any(row[index] != " " for row in rows)]
+    if filled:
+        rows = [row[filled[0] : filled[-1] + 1] for row in rows]
+
+    # Stones are listed in row-major order, so each weight follows its stone around
+    stones = [
+        (row, col)
+        for row, line in enumerate(rows)
+        for col, char in enumerate(line)
+        if char in STONE_CHARS
+    ]
+    height, width = len(rows), len(rows[0]) if rows else 0
+
+    best = None
+    for symmetry in SYMMETRIES:
+        cells = [transform_cell(cell, height, width, symmetry) for cell in stones]
+        order = [weight for _, weight in sorted(zip(cells, weights))]
+        serialized = "\n".join(transform_rows(rows, symmetry)) + "\n" + " ".join(order)
+        if best is None or serialized < best[0]:
+            best = (serialized, symmetry)
+    return hashlib.sha1(best[0].encode()).hexdigest(), best[1]
+
+
+class SolutionCache:
+    """
+    A persistent cache of solutions in an SQLite file, keyed by the canonical level key (see
+    canonical_level) and the algorithm, so a level is recognized after being rotated, reflected or
+    re-padded. Paths are stored on the canonical board and mapped back to the board they are read for.
+
+    Only searches that ran to completion are stored: solved ones, and failed ones of complete algorithms.
+    When the cache holds more than `max_entries` solutions, the least recently used are evicted.
+
+    Args:
+        path (str): The SQLite file, created if needed.
+        max_entries (int): The number of solutions kept.
+    """
+
+    def __init__(self, path: str = "solution_cache.sqlite", max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        # Autocommit; WAL without fsync on every commit keeps lookups and stores cheap
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS solutions (
+                level TEXT NOT NULL,
+                algorithm TEXT NOT NULL,
+                guarantee TEXT NOT NULL,
+                status TEXT NOT NULL,
+                steps INTEGER NOT NULL,
+                weight INTEGER NOT NULL,
+                node_count INTEGER NOT NULL,
+                time REAL NOT NULL,
+                memory REAL NOT NULL,
+                path TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (level, algorithm)
+            )
+            """
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used)"
+        )
+
+    @staticmethod
+    def level_key(level_file: str) -> tuple[str, tuple]:
+        """Read a level file and return its canonical key and symmetry (see canonical_level)."""
+        with open(level_file) as file:
+            return canonical_level(file.read())
+
+    def lookup(self, level_file: str, algorithm: str) -> Solution | None:
+        """
+        Find the stored solution of a level by an algorithm.
+
+        Args:
+            level_file (str): The level file.
+            algorithm (str): The algorithm name.
+
+        Returns:
+            Solution or None: The stored solution, its path mapped onto this level, or None on a miss.
+        """
+        key, symmetry = self.level_key(level_file)
+        row = self.connection.execute(
+            "SELECT status, steps, weight, node_count, time, memory, path FROM solutions "
+            "WHERE level = ? AND algorithm = ?",
+            (key, algorithm),
+        ).fetchone()
+        if row is None:
+            return None
+        self.touch(key, algorithm)
+        return self.to_solution(row, symmetry)
+
+    def lookup_guarantee(
+        self, level_file: str, guarantee: str
+    ) -> tuple[str, Solution] | None:
+        """
+        Find the lightest stored solution of a level among the algorithms with a guarantee.
+
+        Args:
+            level_file (str): The level file.
+            guarantee (str): "any" (every algorithm qualifies), "step-optimal" or "weight-optimal".
+
+        Returns:
+            tuple or None: (algorithm, solution), or None if no qualifying algorithm solved the level.
+        """
+        key, symmetry = self.level_key(level_file)
+        row = self.connection.execute(
+            "SELECT algorithm, status, steps, weight, node_count, time, memory, path FROM solutions "
+            "WHERE level = ? AND status = 'solved' AND (? = 'any' OR guarantee = ?) "
+            "ORDER BY weight, steps LIMIT 1",
+            (key, guarantee, guarantee),
+        ).fetchone()
+        if row is None:
+            return None
+        self.touch(key, row[0])
+        return row[0], self.to_solution(row[1:], symmetry)
+
+    def store(
+        self, level_file: str, algorithm: str, guarantee: str, solution: Solution
+    ) -> None:
+        """
+        Store the solution of a level by an algorithm, replacing the previous one, and evict the least
+        recently used solutions beyond `max_entries`. A solution with a stop reason is ignored: a search
+        stopped early says nothing certain about the level, even when it found a solution.
+
+        Args:
+            level_file (str): The level file.
+            algorithm (str): The algorithm name.
+            guarantee (str): The guarantee of the algorithm's solutions.
+            solution (Solution): A finished search's solution.
+        """
+        if solution.stop_reason is not None:
+            return
+        key, symmetry = self.level_key(level_file)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                key,
+                algorithm,
+                guarantee,
+                solution.status,
+                solution.steps,
+                solution.weight,
+                solution.node_count,
+                solution.time,
+                solution.memory,
+                transform_path(solution.path, symmetry),
+                time.time(),
+            ),
+        )
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM solutions").fetchone()
+        if count > self.max_entries:
+            self.connection.execute(
+                "DELETE FROM solutions WHERE rowid IN "
+                "(SELECT rowid FROM solutions ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def touch(self, key: str, algorithm: str) -> None:
+        """Mark a solution as just used, for eviction."""
+        self.connection.execute(
+            "UPDATE solutions SET last_used = ? WHERE level = ? AND algorithm = ?",
+            (time.time(), key, algorithm),
+        )
+
+    @staticmethod
+    def to_solution(row: tuple, symmetry: tuple) -> Solution:
+        """Build a Solution from a stored row, mapping its path back onto the level."""
+        status, steps, weight, node_count, search_time, memory, path = row
+        return Solution(
+            steps,
+            weight,
+            node_count,
+            search_time,
+            memory,
+            transform_path(path, symmetry, inverse=True),
+            status=status,
+            cached=True,
+        )
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,6 +1,7 @@
 from .base_data_structure import BaseDataStructure
 from ..core.node import Node
 import heapq
+import math
 
 
 class PriorityQueue(BaseDataStructure):
@@ -15,4 +16,40 @@ class PriorityQueue(BaseDataStructure):
         """Remove and return the item with the lowest cost from the priority queue."""
         if self.is_empty():
             raise IndexError("Pop from empty priority queue")
-        return heapq.heappop(self.container)[1]
\ No newline at end of file
+        return heapq.heappop(self.container)[1]
+
+
+class WeightedPriorityQueue(PriorityQueue):
+    """
+    A priority queue ordered by g + weight * h, as in weighted A*. A weight above 1 favors nodes close to
+    the goal over cheap ones.
+
+    Args:
+        weight (float): The weight of the heuristic cost.
+    """
+
+    def __init__(self, weight: float = 1.0):
+        super().__init__()
+        self.weight = weight
+
+    def add(self, item: Node):
+        """Add an item to the priority queue."""
+        heapq.heappush(
+            self.container, (item.g_cost + self.weight * item.h_cost, item)
+        )
+
+    def reweight(self, weight: float, bound=math.inf) -> None:
+        """
+        Change the weight and reorder the queued items, dropping those whose f cost reaches a bound.
+
+        Args:
+            weight (float): The new weight of the heuristic cost.
+            bound (int, optional): Items with g + h at least this large are dropped.
+        """
+        self.weight = weight
+        self.container = [
+            (item.g_cost + weight * item.h_cost, item)
+            for _, item in self.container
+            if item.total_cost() < bound
+        ]
+        heapq.heapify(self.container)
@@ -0,0 +1,275 @@
+from collections import OrderedDict
+from itertools import permutations
+
+import numpy as np
+
+from ..core.board import Board
+
+
+def manhattan_distances(board: Board) -> list[list[int]]:
+    """
+    Build the distance table from every cell to every switch using the Manhattan distance.
+
+    Args:
+        board (Board): The static board.
+
+    Returns:
+        list of list of int: distances[j][cell] is the distance from `cell` to the j-th switch.
+    """
+    tables = []
+    for switch in board.switches:
+        switch_row, switch_col = board.coordinates[switch]
+        tables.append(
+            [
+                abs(switch_row - row) + abs(switch_col - col)
+                for row, col in board.coordinates
+            ]
+        )
+    return tables
+
+
+def push_distances(board: Board) -> list[list[int]]:
+    """
+    Build the distance table from every cell to every switch using the real minimum number of pushes
+    (see Board.pull_distances). Unlike the Manhattan distance it accounts for walls, and it is still a
+    lower bound, so the heuristic stays admissible.
+
+    Args:
+        board (Board): The static board.
+
+    Returns:
+        list of list of int: distances[j][cell] is the push distance from `cell` to the j-th switch, or
+        AssignmentHeuristic.UNREACHABLE if the stone can never get there.
+    """
+    return [
+        [
+            distance if distance >= 0 else AssignmentHeuristic.UNREACHABLE
+            for distance in table
+        ]
+        for table in board.push_distances
+    ]
+
+
+class AssignmentHeuristic:
+    """
+    The AssignmentHeuristic class estimates the cost to solve a state as the cheapest way to send every
+    stone to a different switch, where sending the stone of slot i to switch j costs
+    weights[i] * distances[j][cell_i]. The minimum is found with the Hungarian algorithm (the shortest
+    augmenting path version, which keeps row and column potentials).
+
+    Solutions are memoized per stone configuration in a bounded LRU cache. When a state differs from its
+    parent by a single stone, the parent's assignment and potentials are reused: the moved stone's row
+    is unassigned, its potential is lowered until it is feasible again, and a single augmentation
+    restores the optimum. This is O(n^2) instead of O(n^3) from scratch.
+
+    A configuration where the stones cannot be matched to distinct switches at all (some stone would have
+    to use an UNREACHABLE distance) is estimated as infinite: it can never be solved.
+
+    `estimate_batch` evaluates all the children of an expanded node at once with NumPy: the weighted cost
+    matrices of every configuration are gathered from the distance table in one indexing operation, and
+    for up to BATCH_STONE_LIMIT stones every assignment (permutation) is scored in the same array
+    operation, which is cheaper than running the Hungarian algorithm in Python for each child.
+
+    Parameters:
+        board (Board): The static board.
+        distances (list of list of int): The per-switch distance tables, computed once per level.
+        cache_size (int): The maximum number of stone configurations kept in the cache.
+
+    Attributes:
+        hits (int): The number of estimates answered from the cache.
+        batched (int): The number of estimates solved in a NumPy batch.
+        incremental (int): The number of estimates solved from the parent's assignment.
+        full (int): The number of estimates solved from scratch.
+    """
+
+    UNREACHABLE = 10**9  # Finite so the potentials stay integers; any total this large is infeasible
+    BATCH_STONE_LIMIT = 6  # 720 permutations; beyond that the Hungarian algorithm is cheaper
+
+    def __init__(
+        self, board: Board, distances: list[list[int]], cache_size: int = 50000
+    ):
+        self.board = board
+        self.distances = distances
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.size = len(board.weights)
+        # Extra stones (more stones than switches) go to free dummy switches
+        self.padding = [0] * (self.size - len(distances))
+        self.hits = 0
+        self.incremental = 0
+        self.full = 0
+        self.batched = 0
+
+        # cell_costs[cell, slot, j]: the cost of sending the stone of a slot from a cell to switch j
+        table = np.array(distances, dtype=np.int64).reshape(len(distances), -1).T
+        if self.padding:
+            table = np.hstack([table, np.zeros((len(table), len(self.padding)), np.int64)])
+        self.cell_costs = table[:, None, :] * np.array(board.weights, dtype=np.int64)[None, :, None]
+        self.permutations = (
+            np.array(list(permutations(range(self.size))), dtype=np.intp)
+            if 0 < self.size <= self.BATCH_STONE_LIMIT
+            else None
+        )
+
+    def cost_row(self, slot: int, cell: int) -> list[int]:
+        """Return the cost of sending the stone of a slot, standing on a cell, to each switch."""
+        weight = self.board.weights[slot]
+        return [weight * table[cell] for table in self.distances] + self.padding
+
+    def estimate(
+        self, stones: tuple[int, ...], parent_stones: tuple[int, ...] | None = None
+    ) -> int | float:
+        """
+        Return the minimum weighted assignment cost of a stone configuration.
+
+        Args:
+            stones (tuple of int): The cell of each stone slot.
+            parent_stones (tuple of int, optional): The configuration this one was reached from.
+
+        Returns:
+            int or float: The heuristic cost, or infinity if the configuration can never be solved.
+        """
+        entry = self.cache.get(stones)
+        if entry is not None:
+            self.cache.move_to_end(stones)
+            self.hits += 1
+            return entry[0]
+
+        parent = self.cache.get(parent_stones) if parent_stones is not None else None
+        changed = (
+            [slot for slot in range(self.size) if stones[slot] != parent_stones[slot]]
+            if parent is not None and parent[1] is not None  # Batched entries keep no potentials
+            else ()
+        )
+        if len(changed) == 1:
+            entry = self.solve_incremental(stones, parent, changed[0])
+            self.incremental += 1
+        else:
+            entry = self.solve(stones)
+            self.full += 1
+
+        self.store(stones, entry)
+        return entry[0]
+
+    def estimate_batch(
+        self,
+        configurations: list[tuple[int, ...]],
+        parent_stones: tuple[int, ...] | None = None,
+    ) -> list[int | float]:
+        """
+        Return the heuristic cost of several stone configurations, typically all children of a node.
+
+        Args:
+            configurations (list of tuple of int): The stone configurations to evaluate.
+            parent_stones (tuple of int, optional): The configuration they were all reached from.
+
+        Returns:
+            list of int or float: The heuristic cost of each configuration, in order.
+        """
+        results = [None] * len(configurations)
+        missing = []
+        for index, stones in enumerate(configurations):
+            entry = self.cache.get(stones)
+            if entry is not None:
+                self.cache.move_to_end(stones)
+                self.hits += 1
+                results[index] = entry[0]
+            else:
+                missing.append(index)
+
+        if self.permutations is None or len(missing) < 2:
+            for index in missing:
+                results[index] = self.estimate(configurations[index], parent_stones)
+            return results
+
+        # Gather every cost matrix at once: costs[k, slot, j]
+        stones = np.array([configurations[index] for index in missing], dtype=np.intp)
+        slots = np.arange(self.size)
+        costs = self.cell_costs[stones, slots[None, :], :]
+        # Score every permutation of every configuration: totals[k, permutation]
+        totals = costs[:, slots[None, :], self.permutations].sum(axis=2)
+        for index, total in zip(missing, totals.min(axis=1).tolist()):
+            value = total if total < self.UNREACHABLE else float("inf")
+            self.store(configurations[index], (value, None, None, None))
+            results[index] = value
+        self.batched += len(missing)
+        return results
+
+    def store(self, stones: tuple[int, ...], entry: tuple) -> None:
+        """Cache the entry of a configuration, evicting the least recently used one if the cache is full."""
+        self.cache[stones] = entry
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def solve(self, stones: tuple[int, ...]) -> tuple:
+        """Solve the assignment from scratch. Returns (cost, u, v, p) with 1-indexed potentials."""
+        n = self.size
+        costs = [self.cost_row(slot, cell) for slot, cell in enumerate(stones)]
+        u = [0] * (n + 1)  # Row (stone) potentials
+        v = [0] * (n + 1)  # Column (switch) potentials
+        p = [0] * (n + 1)  # p[j]: the row assigned to column j, 0 if none
+        for row in range(1, n + 1):
+            self.augment(costs, row, u, v, p)
+        return self.total(costs, p), tuple(u), tuple(v), tuple(p)
+
+    def solve_incremental(
+        self, stones: tuple[int, ...], parent: tuple, slot: int
+    ) -> tuple:
+        """Re-solve an assignment where only the stone of one slot moved, starting from the parent's."""
+        n = self.size
+        _, u, v, p = parent
+        u, v, p = list(u), list(v), list(p)
+        costs = [self.cost_row(index, cell) for index, cell in enumerate(stones)]
+
+        # Free the moved stone's row, and make its potential feasible for its new costs
+        row = slot + 1
+        p[p.index(row, 1)] = 0
+        u[row] = min(costs[slot][j - 1] - v[j] for j in range(1, n + 1))
+        self.augment(costs, row, u, v, p)
+        return self.total(costs, p), tuple(u), tuple(v), tuple(p)
+
+    @staticmethod
+    def augment(costs: list[list[int]], row: int, u: list, v: list, p: list) -> None:
+        """Assign a free row along a shortest augmenting path, updating the potentials in place."""
+        n = len(costs)
+        p[0] = row
+        column = 0
+        min_reduced = [float("inf")] * (n + 1)
+        used = [False] * (n + 1)
+        way = [0] * (n + 1)
+        while True:
+            used[column] = True
+            current_row = p[column]
+            cost_row = costs[current_row - 1]
+            row_potential = u[current_row]
+            delta = float("inf")
+            next_column = 0
+            for j in range(1, n + 1):
+                if not used[j]:
+                    reduced = cost_row[j - 1] - row_potential - v[j]
+                    if reduced < min_reduced[j]:
+                        min_reduced[j] = reduced
+                        way[j] = column
+                    if min_reduced[j] < delta:
+                        delta = min_reduced[j]
+                        next_column = j
+            for j in range(n + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_reduced[j] -= delta
+            column = next_column
+            if p[column] == 0:
+                break
+        # Flip the augmenting path
+        while column:
+            previous = way[column]
+            p[column] = p[previous]
+            column = previous
+
+    @classmethod
+    def total(cls, costs: list[list[int]], p: list) -> int | float:
+        """Return the cost of the assignment described by p, or infinity if it uses an unreachable switch."""
+        cost = sum(costs[p[j] - 1][j - 1] for j in range(1, len(p)))
+        return cost if cost < cls.UNREACHABLE else float("inf")
@@ -0,0 +1,301 @@
+import argparse
+import glob
+import hashlib
+import heapq
+import math
+import os
+import sys
+
+import numpy as np
+
+from ..core.board import Board
+from ..custom_io.input_output_handler import InputOutputHandler as IOHandler
+
+
+class PatternDatabase:
+    """
+    Additive pattern databases for weighted stones. The stones are split into disjoint patterns of up to
+    two slots, the heaviest ones paired first, and the database of a pattern holds the exact cost of
+    bringing its stones onto switches when the other stones are removed, for every cell of its stones and
+    of Ares. Every push moves the stone of a single pattern and costs that stone's weight, so the costs of
+    the patterns add up to a lower bound on the cost of the whole state. Unlike the assignment heuristic,
+    a pair accounts for the two stones blocking each other and for where Ares has to stand to push them.
+
+    A database is computed by a retrograde Dijkstra search: starting from every placement of the pattern's
+    stones on distinct switches (with Ares in every region), stones are pulled backward, each pull costing
+    the weight of the pulled stone. Every table is indexed by
+    ((live index of the first stone) * live + live index of the second stone) * cells + cell index of Ares,
+    where live cells are the reachable cells that are not dead squares. Entries that can never be solved
+    hold UNSOLVABLE.
+
+    The tables of a level are saved to one .npy file, named after a hash of the level's layout and
+    weights, and loaded with a NumPy memmap, so later searches (and HDA* workers) share the pages of the
+    file instead of building or copying the tables. Lookups are plain array indexing: through a
+    memoryview of the mapping for single states and small batches, and with one NumPy gather per pattern
+    for batches of at least NUMPY_BATCH states, where the fixed cost of NumPy calls pays off.
+
+    Args:
+        board (Board): The static board.
+        patterns (list of tuple of int): The slots of each pattern.
+        tables (list of ndarray): The table of each pattern, in order.
+    """
+
+    UNSOLVABLE = np.iinfo(np.uint32).max
+    MAX_ENTRIES = 1 << 22  # Per pair table; larger boards fall back to single-stone patterns
+    NUMPY_BATCH = 64
+    DEFAULT_DIRECTORY = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "pattern_databases",
+    )
+
+    def __init__(self, board: Board, patterns: list[tuple[int, ...]], tables: list):
+        self.board = board
+        self.patterns = patterns
+        self.tables = tables
+        # Python-level views of the same memory; indexing one returns a plain int
+        self.views = [memoryview(table) for table in tables]
+        self.cells, self.live = self.index_cells(board)
+        self.cell_count, self.live_count = len(self.cells), len(self.live)
+        # Board cell -> index among the reachable cells and among the live cells, -1 elsewhere
+        self.cell_index = np.full(len(board.floor), -1, dtype=np.int64)
+        self.cell_index[self.cells] = np.arange(self.cell_count)
+        self.live_index = np.full(len(board.floor), -1, dtype=np.int64)
+        self.live_index[self.live] = np.arange(self.live_count)
+        self.cell_lookup = self.cell_index.tolist()
+        self.live_lookup = self.live_index.tolist()
+
+    @staticmethod
+    def index_cells(board: Board) -> tuple[list[int], list[int]]:
+        """Return the cells Ares can reach (ignoring stones) and the live ones among them, in order."""
+        cells = sorted(board.walk_distances(board.start_position, ()))
+        return cells, [cell for cell in cells if not board.dead_squares[cell]]
+
+    @classmethod
+    def choose_patterns(cls, board: Board) -> list[tuple[int, ...]]:
+        """Pair the slots from the heaviest down; a pair table too large for MAX_ENTRIES is split."""
+        cells, live = cls.index_cells(board)
+        pairs_fit = len(live) ** 2 * len(cells) <= cls.MAX_ENTRIES
+        slots = list(range(len(board.weights)))
+        patterns = []
+        while len(slots) >= 2 and pairs_fit:
+            first, second = slots[-2], slots[-1]
+            patterns.append((first, second))
+            del slots[-2:]
+        patterns.extend((slot,) for slot in slots)
+        return patterns
+
+    @classmethod
+    def for_board(cls, board: Board, directory: str | None = None):
+        """
+        Load the pattern databases of a level from their file, building and saving them first if needed.
+
+        Args:
+            board (Board): The static board.
+            directory (str, optional): Where the files are kept. Defaults to DEFAULT_DIRECTORY.
+
+        Returns:
+            PatternDatabase or None: The databases, or None when the level has a different number of
+            stones and switches (the stones then need not all end on switches), or a stone or switch
+            Ares can never reach (the tables only cover the cells he can reach).
+        """
+        if not board.weights or len(board.weights) != len(board.switches):
+            return None
+        cells = set(cls.index_cells(board)[0])
+        if any(cell not in cells for cell in board.start_stones + board.switches):
+            return None
+        directory = directory or cls.DEFAULT_DIRECTORY
+        patterns = cls.choose_patterns(board)
+        path = os.path.join(directory, cls.file_name(board, patterns))
+        if not os.path.exists(path):
+            tables = [cls.build(board, pattern) for pattern in patterns]
+            os.makedirs(directory, exist_ok=True)
+            # Written under a temporary name so a concurrent reader never maps a partial file
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as file:
+                np.save(file, np.concatenate(tables))
+            os.replace(temporary, path)
+        data = np.load(path, mmap_mode="r")
+
+        database = cls(board, patterns, [])
+        offset = 0
+        for pattern in patterns:
+            size = database.live_count ** len(pattern) * database.cell_count
+            # A plain ndarray over the mapping: slicing a memmap would keep its slower subclass
+            database.tables.append(np.asarray(data[offset : offset + size]))
+            database.views.append(memoryview(database.tables[-1]))
+            offset += size
+        return database
+
+    @staticmethod
+    def file_name(board: Board, patterns: list[tuple[int, ...]]) -> str:
+        """Name the file of a level after everything its tables depend on."""
+        cells, _ = PatternDatabase.index_cells(board)
+        layout = repr((board.width, cells, board.switches, board.weights, patterns))
+        return "pdb-" + hashlib.sha1(layout.encode()).hexdigest() + ".npy"
+
+    @classmethod
+    def build(cls, board: Board, pattern: tuple[int, ...]) -> np.ndarray:
+        """
+        Compute the table of a pattern by a retrograde Dijkstra search over pulls.
+
+        Args:
+            board (Board): The static board.
+            pattern (tuple of int): The slots of the pattern's stones.
+
+        Returns:
+            ndarray: The uint32 table (see the class documentation for its layout).
+        """
+        cells, live = cls.index_cells(board)
+        cell_index = {cell: index for index, cell in enumerate(cells)}
+        live_index = {cell: index for index, cell in enumerate(live)}
+        weights = [board.weights[slot] for slot in pattern]
+        table = np.full(len(live) ** len(pattern) * len(cells), cls.UNSOLVABLE, np.uint32)
+        neighbors = board.neighbors
+        region = board.walk_distances
+
+        def offset(stones):
+            index = 0
+            for stone in stones:
+                index = index * len(live) + live_index[stone]
+            return index * len(cells)
+
+        # Solved placements: the stones on distinct switches, Ares in any region around them
+        heap = []
+        best = {}
+        placements = [()]
+        for _ in pattern:
+            placements = [
+                placement + (switch,)
+                for placement in placements
+                for switch in board.switches
+                if switch not in placement
+            ]
+        for stones in placements:
+            free = set(cells).difference(stones)
+            while free:
+                area = region(min(free), stones)
+                free.difference_update(area)
+                key = (stones, min(area))
+                best[key] = 0
+                heapq.heappush(heap, (0, stones, min(area)))
+
+        while heap:
+            cost, stones, representative = heapq.heappop(heap)
+            if best.get((stones, representative), math.inf) < cost:
+                continue
+            area = region(representative, stones)
+            start = offset(stones)
+            for cell in area:
+                table[start + cell_index[cell]] = cost
+
+            # Undo a push: Ares stands next to a stone and steps back, pulling it onto his cell
+            for index, stone in enumerate(stones):
+                for direction in range(len(board.directions)):
+                    ares = neighbors[stone][direction]
+                    if ares < 0 or ares not in area:
+                        continue
+                    behind = neighbors[ares][direction]
+                    if behind < 0 or behind in stones:
+                        continue
+                    new_stones = stones[:index] + (ares,) + stones[index + 1 :]
+                    new_cost = cost + weights[index]
+                    new_representative = min(region(behind, new_stones))
+                    key = (new_stones, new_representative)
+                    if new_cost < best.get(key, math.inf):
+                        best[key] = new_cost
+                        heapq.heappush(heap, (new_cost, new_stones, new_representative))
+        return table
+
+    def estimate(self, stones: tuple[int, ...], position: int) -> int | float:
+        """
+        Return the sum of the pattern costs of a state.
+
+        Args:
+            stones (tuple of int): The cell of each stone slot.
+            position (int): The cell of Ares.
+
+        Returns:
+            int or float: The heuristic cost, or infinity if a pattern can never be solved.
+        """
+        live_lookup, live_count = self.live_lookup, self.live_count
+        ares = self.cell_lookup[position]
+        total = 0
+        for pattern, view in zip(self.patterns, self.views):
+            index = 0
+            for slot in pattern:
+                live = live_lookup[stones[slot]]
+                if live < 0:
+                    return math.inf  # A stone on a dead square
+                index = index * live_count + live
+            value = view[index * self.cell_count + ares]
+            if value == self.UNSOLVABLE:
+                return math.inf
+            total += value
+        return total
+
+    def estimate_batch(
+        self, configurations: list[tuple[int, ...]], positions: list[int]
+    ) -> list[int | float]:
+        """
+        Return the sum of the pattern costs of several states in one NumPy gather per pattern.
+
+        Args:
+            configurations (list of tuple of int): The stone cells of each state.
+            positions (list of int): The cell of Ares in each state.
+
+        Returns:
+            list of int or float: The heuristic cost of each state, in order.
+        """
+        if len(configurations) < self.NUMPY_BATCH:
+            return [
+                self.estimate(stones, position)
+                for stones, position in zip(configurations, positions)
+            ]
+        stones = np.array(configurations, dtype=np.int64)
+        ares = self.cell_index[np.array(positions, dtype=np.int64)]
+        totals = np.zeros(len(configurations), dtype=np.int64)
+        unsolvable = np.zeros(len(configurations), dtype=bool)
+        for pattern, table in zip(self.patterns, self.tables):
+            index = np.zeros(len(configurations), dtype=np.int64)
+            for slot in pattern:
+                live = self.live_index[stones[:, slot]]
+                unsolvable |= live < 0  # A stone on a dead square
+                index = index * self.live_count + live
+            index = np.where(unsolvable, 0, index)
+            values = table[index * self.cell_count + ares]
+            unsolvable |= values == self.UNSOLVABLE
+            totals += values
+        return [
+            math.inf if dead else total
+            for total, dead in zip(totals.tolist(), unsolvable.tolist())
+        ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Build the pattern databases of a set of levels ahead of the searches."
+    )
+    parser.add_argument("levels", help='A glob of level files, e.g. "input-*.txt".')
+    parser.add_argument(
+        "-d",
+        "--directory",
+        default=PatternDatabase.DEFAULT_DIRECTORY,
+        help="Where the database files are written.",
+    )
+    args = parser.parse_args(argv)
+
+    levels = sorted(glob.glob(args.levels))
+    if not levels:
+        parser.error(f"No level matches {args.levels}")
+    for level in levels:
+        board = Board(IOHandler(level, None).load_from_file())
+        database = PatternDatabase.for_board(board, args.directory)
+        if database is None:
+            print(f"{level}: skipped (stones and switches differ in number)")
+        else:
+            print(f"{level}: patterns {database.patterns}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+import os
+import sys
+import tracemalloc
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+
+class Instrumentation:
+    """
+    Measures the memory used by a search. This base class is the "off" mode: it measures nothing and
+    costs nothing, and the solution reports 0 MB.
+
+    A search calls `start` when it begins and `stop` when it ends; `current` may be called in between
+    for a cheap estimate (used by telemetry).
+    """
+
+    name = "off"
+
+    def start(self) -> None:
+        """Start measuring."""
+
+    def current(self) -> float:
+        """Return the current memory estimate in MB."""
+        return 0.0
+
+    def stop(self) -> float:
+        """Stop measuring and return the peak memory used by the search in MB."""
+        return 0.0
+
+
+class RSSInstrumentation(Instrumentation):
+    """
+    The cheap mode: samples the resident set size of the process from /proc (Linux) or the resource
+    module, without hooking allocations. The peak is the growth of the process' high-water mark during
+    the search, so memory the process had already used before is not counted again.
+    """
+
+    name = "rss"
+
+    def __init__(self):
+        self.baseline = 0.0
+
+    def start(self) -> None:
+        self.baseline = self.peak_rss()
+
+    def current(self) -> float:
+        return self.read_rss()
+
+    def stop(self) -> float:
+        return max(self.peak_rss() - self.baseline, 0.0)
+
+    @staticmethod
+    def read_rss() -> float:
+        """Return the current resident set size in MB, or the peak if the current one is unavailable."""
+        try:
+            with open("/proc/self/statm") as file:
+                pages = int(file.read().split()[1])
+            return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        except (OSError, ValueError, AttributeError):
+            return RSSInstrumentation.peak_rss()
+
+    @staticmethod
+    def peak_rss() -> float:
+        """Return the peak resident set size of the process in MB, 0 if it is unavailable."""
+        if resource is None:
+            return 0.0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # KB on Linux, bytes on macOS
+        return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+class TracemallocInstrumentation(Instrumentation):
+    """
+    The full mode: traces every Python allocation with tracemalloc and reports the exact peak of the
+    memory allocated during the search. Every allocation pays for the hook, so searches run noticeably
+    slower.
+    """
+
+    name = "tracemalloc"
+
+    def __init__(self):
+        self.owner = False  # Whether this instance started tracing (and so must stop it)
+
+    def start(self) -> None:
+        self.owner = not tracemalloc.is_tracing()
+        if self.owner:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+
+    def current(self) -> float:
+        return tracemalloc.get_traced_memory()[0] / (1024 * 1024)
+
+    def stop(self) -> float:
+        _, peak_memory = tracemalloc.get_traced_memory()
+        if self.owner:
+            tracemalloc.stop()
+        return peak_memory / (1024 * 1024)
+
+
+# The instrumentation class of each mode name
+INSTRUMENTATION_MODES = {
+    mode.name: mode
+    for mode in (Instrumentation, RSSInstrumentation, TracemallocInstrumentation)
+}
+
+
+def create_instrumentation(mode: str) -> Instrumentation:
+    """
+    Create the instrumentation of a mode.
+
+    Args:
+        mode (str): "off", "rss" or "tracemalloc".
+
+    Returns:
+        Instrumentation: A new instrumentation object.
+    """
+    if mode not in INSTRUMENTATION_MODES:
+        raise ValueError(f"Invalid instrumentation mode: {mode}")
+    return INSTRUMENTATION_MODES[mode]()
@@ -0,0 +1,66 @@
+import csv
+import json
+
+
+class SearchObserver:
+    """
+    Receives live telemetry from a search. A search given an observer calls it every `observe_every`
+    expansions, and once more when it finishes, with a sample dict:
+
+        - node_count (int): The number of nodes expanded so far.
+        - elapsed (float): The time since the search started, in milliseconds.
+        - frontier (int): The number of nodes waiting to be expanded.
+        - visited (int): The number of states in the visited table.
+        - best_f (float): The f cost (g + h) of the node just expanded, the lowest on the frontier for
+          UCS and A*.
+        - nodes_per_second (float): The average expansion rate since the search started.
+        - memory (float): The current memory estimate of the instrumentation mode, in MB.
+        - deadlocks (dict(str, int)): How many states each deadlock check pruned so far.
+        - finished (bool): True for the last sample of the search.
+
+    Any callable taking the sample can be used instead of a subclass.
+    """
+
+    def __call__(self, sample: dict) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class TelemetrySampler(SearchObserver):
+    """
+    Writes every sample of a search to a time series file, flushed after each sample so it can be
+    followed while the search runs. Deadlock counts are flattened into "deadlock_<check>" columns.
+
+    Args:
+        path (str): The output file.
+        format (str, optional): "jsonl" or "csv". Defaults to "csv" for .csv files, else "jsonl".
+    """
+
+    def __init__(self, path: str, format: str | None = None):
+        self.format = format or ("csv" if path.endswith(".csv") else "jsonl")
+        self.file = open(path, "w", newline="")
+        self.writer = None
+
+    def __call__(self, sample: dict) -> None:
+        row = {key: value for key, value in sample.items() if key != "deadlocks"}
+        for name, count in sample["deadlocks"].items():
+            row["deadlock_" + name] = count
+        if self.format == "csv":
+            if self.writer is None:
+                self.writer = csv.DictWriter(self.file, list(row))
+                self.writer.writeheader()
+            self.writer.writerow(row)
+        else:
+            self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,41 +1,388 @@
+import multiprocessing
+import queue
+import time
+
 from .custom_io.input_output_handler import InputOutputHandler as IOHandler
+from .custom_io.solution_cache import SolutionCache
 from .algorithms.dfs import DFS
 from .algorithms.bfs import BFS
 from .algorithms.ucs import UCS
 from .algorithms.a_star import AStar
+from .algorithms.ida_star import IDAStar
+from .algorithms.bidirectional import Bidirectional
+from .algorithms.hda_star import HDAStar
+from .algorithms.anytime_a_star import AnytimeAStar
 from .algorithms.base_search import BaseSearch, Solution
+from .algorithms.cancellation import CancellationToken
 from .core.grid import Grid
 
+# The search class of each algorithm name accepted by Solver
+ALGORITHMS = {
+    "DFS": DFS,
+    "BFS": BFS,
+    "UCS": UCS,
+    "A*": AStar,
+    "IDA*": IDAStar,
+    "Bidirectional": Bidirectional,
+    "HDA*": HDAStar,
+    "Anytime A*": AnytimeAStar,
+}
+
+# What the solutions of each algorithm are guaranteed to be, with its default options
+GUARANTEES = {
+    "DFS": "any",
+    "BFS": "step-optimal",
+    "Bidirectional": "step-optimal",
+    "UCS": "weight-optimal",
+    "A*": "weight-optimal",
+    "IDA*": "weight-optimal",
+    "HDA*": "weight-optimal",
+    "Anytime A*": "weight-optimal",  # Only when it runs to completion (Solution.stop_reason is None)
+}
+
+# The search options that can rule out the cheapest solutions, voiding the guarantee of any algorithm
+NARROWING_OPTIONS = ("macros",)
+
+# The algorithms raced by default for each guarantee
+PORTFOLIO_MEMBERS = {
+    "any": ("DFS", "A*", "BFS", "UCS"),
+    "step-optimal": ("Bidirectional", "BFS"),
+    "weight-optimal": ("A*", "UCS", "IDA*"),
+}
+
 
 class Solver:
-    def __init__(self, algorithm_name, input_file, output_file):
+    """
+    Loads a level, solves it with the chosen algorithm and saves the solution.
+
+    The "PORTFOLIO" algorithm races several algorithms in separate processes (see Portfolio). Each member
+    gets the instrumentation mode and the node and memory limits, and the time limit bounds the race.
+
+    Args:
+        algorithm_name (str): A key of ALGORITHMS, or "PORTFOLIO".
+        input_file (str): The level file.
+        output_file (str): The file the solution is written to.
+        guarantee (str): For "PORTFOLIO", the guarantee the returned solution must have: "any",
+            "step-optimal" or "weight-optimal".
+        members (list, optional): For "PORTFOLIO", the algorithm names or (algorithm name, keyword
+            arguments) pairs to race. Defaults to PORTFOLIO_MEMBERS[guarantee].
+        instrumentation (str): How the search measures memory: "off", "rss" or "tracemalloc".
+        observer (callable, optional): Receives live telemetry from the search (see SearchObserver). Not
+            supported with "PORTFOLIO", whose searches run in other processes.
+        cancel_token (CancellationToken, optional): Stops the search when cancelled.
+        time_limit (float, optional): The time budget of the search in seconds.
+        node_limit (int, optional): The expansion budget of the search.
+        memory_limit (float, optional): The memory ceiling of the search in MB.
+        cache (SolutionCache, optional): Where solutions are looked up before searching, and stored after
+            searches that finished. A portfolio accepts any stored solution with its guarantee.
+    """
+
+    def __init__(
+        self,
+        algorithm_name,
+        input_file,
+        output_file,
+        guarantee: str = "any",
+        members: list[str | tuple[str, dict]] | None = None,
+        instrumentation: str = "rss",
+        observer=None,
+        cancel_token: CancellationToken | None = None,
+        time_limit: float | None = None,
+        node_limit: int | None = None,
+        memory_limit: float | None = None,
+        cache: SolutionCache | None = None,
+    ):
         self.algorithm_name = algorithm_name
         self.input_file = input_file
         self.output_file = output_file
+        self.guarantee = guarantee
+        self.members = members
+        self.instrumentation = instrumentation
+        self.observer = observer
+        self.limits = {
+            "cancel_token": cancel_token,
+            "time_limit": time_limit,
+            "node_limit": node_limit,
+            "memory_limit": memory_limit,
+        }
+        self.cache = cache
         self.io_handler = IOHandler(self.input_file, self.output_file)
 
     def run(self):
+        if self.algorithm_name == "PORTFOLIO":
+            if self.observer is not None:
+                raise ValueError("An observer cannot follow the searches of a portfolio")
+            if self.cache is not None:
+                hit = self.cache.lookup_guarantee(self.input_file, self.guarantee)
+                if hit is not None:
+                    winner, solution = hit
+                    self.io_handler.save_to_file(winner + "\n" + str(solution))
+                    return solution
+            portfolio = Portfolio(
+                self.input_file,
+                self.guarantee,
+                self.members,
+                self.limits["cancel_token"],
+                self.limits["time_limit"],
+                {
+                    "instrumentation": self.instrumentation,
+                    "node_limit": self.limits["node_limit"],
+                    "memory_limit": self.limits["memory_limit"],
+                },
+            )
+            winner, solution = portfolio.run()
+            if winner is not None:
+                self.io_handler.save_to_file(winner + "\n" + str(solution))
+                if self.cache is not None:
+                    self.cache.store(
+                        self.input_file, winner, portfolio.guarantee_of(winner), solution
+                    )
+            return solution
+
+        if self.algorithm_name not in ALGORITHMS:
+            raise ValueError("Invalid algorithm name")
+        if self.cache is not None:
+            solution = self.cache.lookup(self.input_file, self.algorithm_name)
+            if solution is not None:
+                if solution.status == "solved":
+                    self.io_handler.save_to_file(self.algorithm_name + "\n" + str(solution))
+                return solution
+
         # Load initial state
         initial_grid = self.io_handler.load_from_file()
 
         # Choose algorithm
         algorithm: BaseSearch | None = None
-        if self.algorithm_name == "DFS":
-            algorithm = DFS(initial_grid)
-        elif self.algorithm_name == "BFS":
-            algorithm = BFS(initial_grid)
-        elif self.algorithm_name == "UCS":
-            algorithm = UCS(initial_grid)
-        elif self.algorithm_name == "A*":
-            algorithm = AStar(initial_grid)
-        else:
-            raise ValueError("Invalid algorithm name")
-        # Add other algorithms here (BFS, UCS, AStar)
+        algorithm = ALGORITHMS[self.algorithm_name](
+            initial_grid,
+            instrumentation=self.instrumentation,
+            observer=self.observer,
+            **self.limits,
+        )
 
         # Run the search
-        if algorithm.search():
+        found = algorithm.search()
+        solution = algorithm.get_solution()
+        if found:
             # Write output
-            self.io_handler.save_to_file(
-                self.algorithm_name + "\n" + str(algorithm.get_solution()),
+            self.io_handler.save_to_file(self.algorithm_name + "\n" + str(solution))
+        if self.cache is not None and solution.stop_reason is None:
+            # Only finished searches: a partial one says nothing about the level
+            self.cache.store(
+                self.input_file,
+                self.algorithm_name,
+                GUARANTEES[self.algorithm_name],
+                solution,
             )
-        return algorithm.get_solution()
+        return solution
+
+
+def member_label(algorithm_name: str, options: dict) -> str:
+    """Name a portfolio member by its algorithm and the options it overrides, e.g. "A* (macros=True)"."""
+    if not options:
+        return algorithm_name
+    overrides = ", ".join(f"{key}={value!r}" for key, value in sorted(options.items()))
+    return f"{algorithm_name} ({overrides})"
+
+
+def run_member(
+    label: str, algorithm_name: str, options: dict, input_file: str, results, cancel_event
+) -> None:
+    """
+    The entry point of a portfolio member process: solve the level and report the Solution.
+
+    Args:
+        label (str): The name the member is reported under.
+        algorithm_name (str): A key of ALGORITHMS.
+        options (dict): Keyword arguments passed to the search.
+        input_file (str): The level file.
+        results (Queue): Receives (label, found, solution), or (label, False, error) on an exception.
+        cancel_event (Event): Set by the portfolio to stop the search cooperatively.
+    """
+    try:
+        grid = IOHandler(input_file, None).load_from_file()
+        algorithm = ALGORITHMS[algorithm_name](
+            grid, cancel_token=CancellationToken(cancel_event), **options
+        )
+        found = algorithm.search()
+        results.put((label, found, algorithm.get_solution()))
+    except Exception as error:  # Reported as a failed member instead of leaving the race hanging
+        results.put((label, False, repr(error)))
+
+
+class Portfolio:
+    """
+    Races several algorithms on the same level, each in its own process, and keeps the first solution
+    that has the requested guarantee. The other members are then cancelled through a shared event and
+    joined once they stopped.
+
+    A member is either an algorithm name or an (algorithm name, keyword arguments) pair, so the same
+    algorithm can be raced with different options. Members are reported under member_label. Members whose
+    solutions do not have the guarantee may still be raced, but their results are only recorded in the
+    statistics.
+
+    Args:
+        input_file (str): The level file.
+        guarantee (str): "any", "step-optimal" or "weight-optimal".
+        members (list, optional): The member configurations to race. Defaults to
+            PORTFOLIO_MEMBERS[guarantee].
+        cancel_token (CancellationToken, optional): Stops the race when cancelled.
+        time_limit (float, optional): The wall-clock budget of the race in seconds.
+        search_options (dict, optional): Keyword arguments given to the search of every member, such as
+            instrumentation, node_limit or memory_limit. A member's own options take precedence.
+    """
+
+    def __init__(
+        self,
+        input_file: str,
+        guarantee: str = "any",
+        members: list[str | tuple[str, dict]] | None = None,
+        cancel_token: CancellationToken | None = None,
+        time_limit: float | None = None,
+        search_options: dict | None = None,
+    ):
+        if guarantee not in PORTFOLIO_MEMBERS:
+            raise ValueError(f"Invalid guarantee: {guarantee}")
+        self.input_file = input_file
+        self.guarantee = guarantee
+        self.cancel_token = cancel_token
+        self.time_limit = time_limit
+        self.search_options = dict(search_options or {})
+        # The (algorithm name, options) of each member, by label
+        self.members = {}
+        for member in members or PORTFOLIO_MEMBERS[guarantee]:
+            name, options = (member, {}) if isinstance(member, str) else member
+            if name not in ALGORITHMS:
+                raise ValueError(f"Invalid algorithm name: {name}")
+            label = member_label(name, options)
+            if label in self.members:
+                raise ValueError(f"Duplicate portfolio member: {label}")
+            self.members[label] = (name, dict(options))
+        if not any(self.qualifies(label) for label in self.members):
+            raise ValueError(f"No member of the portfolio is {guarantee}")
+
+    def guarantee_of(self, label: str) -> str:
+        """Return what the solutions of a member are guaranteed to be, given its options."""
+        name, options = self.members[label]
+        if any(options.get(option) for option in NARROWING_OPTIONS):
+            return "any"
+        return GUARANTEES[name]
+
+    def qualifies(self, label: str, solution: Solution | None = None) -> bool:
+        """
+        Check if the solutions of a member have the requested guarantee.
+
+        Args:
+            label (str): The member.
+            solution (Solution, optional): A solution of the member. One found by a search stopped early
+                (an anytime search's incumbent) only qualifies for the "any" guarantee.
+        """
+        if self.guarantee == "any":
+            return True
+        if solution is not None and solution.stop_reason is not None:
+            return False
+        return self.guarantee_of(label) == self.guarantee
+
+    def run(self) -> tuple[str | None, Solution]:
+        """
+        Run the race.
+
+        Returns:
+            tuple: (winner, solution). winner is the label of the member whose solution is returned, or
+            None if no qualifying member found one. solution.members holds the statistics of every member
+            by label: its status ("won", "error", or the stop reason or else the status of its Solution),
+            its wall-clock time in milliseconds, and its steps, weight, node count and memory when it
+            finished. If the race was cancelled or ran out of time, solution.status is "cancelled" or
+            "timeout".
+        """
+        start_time = time.perf_counter()
+        context = multiprocessing.get_context()
+        results = context.Queue()
+        cancel_event = context.Event()
+        # Not daemonic, so members can start their own workers (HDA*)
+        processes = {
+            label: context.Process(
+                target=run_member,
+                args=(
+                    label,
+                    name,
+                    {**self.search_options, **options},
+                    self.input_file,
+                    results,
+                    cancel_event,
+                ),
+            )
+            for label, (name, options) in self.members.items()
+        }
+        for process in processes.values():
+            process.start()
+
+        stats = {}
+        winner, best = None, Solution(0, 0, 0, 0.0, 0.0, "", status="failed")
+
+        def record(label: str, found: bool, solution) -> None:
+            elapsed = (time.perf_counter() - start_time) * 1000
+            if not isinstance(solution, Solution):
+                stats[label] = {"status": "error", "time": elapsed, "error": solution}
+            elif solution.status == "cancelled":
+                stats[label] = {"status": "cancelled", "time": elapsed}
+            else:
+                stats[label] = {
+                    "status": solution.stop_reason or solution.status,
+                    "time": elapsed,
+                    "steps": solution.steps,
+                    "weight": solution.weight,
+                    "node_count": solution.node_count,
+                    "memory": solution.memory,
+                }
+
+        try:
+            while len(stats) < len(processes) and winner is None:
+                try:
+                    label, found, solution = results.get(timeout=0.1)
+                except queue.Empty:
+                    if self.cancel_token is not None and self.cancel_token.cancelled:
+                        best.status = best.stop_reason = "cancelled"
+                        break
+                    if (
+                        self.time_limit is not None
+                        and time.perf_counter() - start_time >= self.time_limit
+                    ):
+                        best.status = best.stop_reason = "timeout"
+                        break
+                    if results.empty() and not any(
+                        process.is_alive() for process in processes.values()
+                    ):
+                        break  # A member died without reporting
+                    continue
+
+                record(label, found, solution)
+                if found and self.qualifies(label, solution):
+                    winner, best = label, solution
+                    stats[label]["status"] = "won"
+        finally:
+            # Ask the other members to stop, and keep reading their reports while they do: a member
+            # cannot exit before the queue accepted everything it put
+            cancel_event.set()
+            while len(stats) < len(processes) and any(
+                process.is_alive() for process in processes.values()
+            ):
+                try:
+                    record(*results.get(timeout=0.1))
+                except queue.Empty:
+                    pass
+            while len(stats) < len(processes) and not results.empty():
+                record(*results.get())
+            for label, process in processes.items():
+                process.join()
+                stats.setdefault(
+                    label,
+                    {
+                        "status": "cancelled" if process.exitcode == 0 else "error",
+                        "time": (time.perf_counter() - start_time) * 1000,
+                    },
+                )
+            results.close()
+
+        best.members = stats
+        return winner, best
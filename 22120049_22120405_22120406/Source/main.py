@@ -2,6 +2,8 @@ import pygame
 import sys
 import os
 from Codes.solver import Solver
+from Codes.algorithms.cancellation import CancellationToken
+from Codes.custom_io.solution_cache import SolutionCache
 import threading
 import queue
 from collections import deque
@@ -9,11 +11,14 @@ import time
 from copy import deepcopy
 
 time_out = 0.1
+# Giới hạn thời gian (giây) của các thuật toán anytime: hết giờ thì dùng lời giải tốt nhất đã tìm được
+SOLVER_TIME_LIMITS = {"Anytime A*": 10}
 solver_result = queue.Queue()
 move_history = deque()  # Lưu lịch sử các bước di chuyển
 state_history = deque()  # Lưu trạng thái của game sau mỗi bước
 current_move = None
 is_running = True  # Biến kiểm soát thread
+cancel_token = None  # Token dừng thread giải đang chạy
 # Thêm biến global để lưu thông tin solution
 current_solution = None
 current_algorithm = None
@@ -38,7 +43,7 @@ def restore_game_state(state):
     weght_pushed[0] = state["weight_pushed"]
 
 
-def solve_level(text):
+def solve_level(text, token):
     global is_running, current_solution, current_algorithm
     current_algorithm = text
     level_str = ""
@@ -46,10 +51,17 @@ def solve_level(text):
         level_str = "0" + level.__str__()
     else:
         level_str = level.__str__()
-    solver = Solver(
-        text, os.path.join(FILE_DIR, f"input-{level_str}.txt"), os.path.join(FILE_DIR, f"output-{level_str}.txt"),
-    )
-    solution = solver.run()  # Nhận đối tượng Solution
+    # Lời giải đã tìm trước đó được lấy lại từ cache thay vì tìm lại
+    with SolutionCache(CACHE_FILE) as cache:
+        solver = Solver(
+            text, os.path.join(FILE_DIR, f"input-{level_str}.txt"), os.path.join(FILE_DIR, f"output-{level_str}.txt"),
+            cancel_token=token,
+            time_limit=SOLVER_TIME_LIMITS.get(text),
+            cache=cache,
+        )
+        solution = solver.run()  # Nhận đối tượng Solution
+    if token.cancelled:  # Đã bấm Stop/Restart: bỏ kết quả dở dang
+        return
     current_solution = solution  # Lưu solution để hiển thị
     if not is_running:
         return
@@ -60,13 +72,22 @@ def solve_level(text):
 
 
 def start_solver(text):
-    global is_running
+    global is_running, cancel_token
     is_running = True
-    solver_thread = threading.Thread(target=solve_level, args=(text,))
+    cancel_token = CancellationToken()
+    solver_thread = threading.Thread(target=solve_level, args=(text, cancel_token))
     solver_thread.daemon = True
     solver_thread.start()
 
 
+def stop_solver():
+    # Yêu cầu thread giải dừng lại (thuật toán tự kiểm tra token trong vòng lặp)
+    global is_running
+    is_running = False
+    if cancel_token is not None:
+        cancel_token.cancel()
+
+
 def illustrate_solution():
     global state, current_move, is_running
     state = "pausing"
@@ -111,7 +132,7 @@ BUTTON_SPACING = 20  # Khoảng cách giữa các button
 button_texts = {
     "playing": ["Levels", "Solution", "Restart"],
     "selecting": [f"Level {i+1}" for i in range(10)],
-    "solution": ["DFS", "BFS", "UCS", "A*", "Restart"],
+    "solution": ["DFS", "BFS", "UCS", "A*", "Anytime A*", "Restart"],
     "solving": ["Stop"],
     "illustrating": ["Pause", "Next", "Restart"],
     "pausing": ["Start", "Next", "Restart"],
@@ -122,6 +143,7 @@ button_texts = {
 # Paths to texture images
 FILE_DIR = os.path.dirname(os.path.abspath(__file__))
 GUI_RESOURCES_PATH = os.path.join(FILE_DIR, "Resources", "Gui")
+CACHE_FILE = os.path.join(FILE_DIR, "solution_cache.sqlite")
 TEXTURE_PATHS = {
     "button": os.path.join(GUI_RESOURCES_PATH, "grid", "button.png"),
     "floor": os.path.join(GUI_RESOURCES_PATH, "grid", "floor.png"),
@@ -493,11 +515,11 @@ def handle_button_click(text):
             start_solver(text)
     elif state == "solving":
         if text == "Stop":
-            is_running = False
+            stop_solver()
             state = "playing"
             reset_level()
         elif text == "Restart":
-            is_running = False
+            stop_solver()
             reset_level()
     elif state == "illustrating" or state == "pausing":
         if text == "Pause":
@@ -604,7 +626,7 @@ def game_loop():
             state = "won"
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                is_running = False  # Dừng các thread
+                stop_solver()  # Dừng các thread
                 running = False
             elif event.type == pygame.KEYDOWN:
                 handle_key(event.key)
@@ -0,0 +1,84 @@
+import glob
+import os
+import sys
+
+import pytest
+
+SOURCE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SOURCE)  # So the tests import Codes the way main.py does
+
+from Codes.configs.constants import MOVEMENTS  # noqa: E402
+from Codes.custom_io.input_output_handler import InputOutputHandler as IOHandler  # noqa: E402
+
+# The bundled levels, solved by every algorithm
+LEVELS = sorted(glob.glob(os.path.join(SOURCE, "input-*.txt")))
+
+
+def replay(level_file: str, path: str) -> int:
+    """
+    Play a path on a level and check every move, like the GUI would.
+
+    Args:
+        level_file (str): The level file.
+        path (str): The moves, lowercase for walking and uppercase for pushing.
+
+    Returns:
+        int: The total weight pushed. Fails the test if a move is illegal or the level is not solved.
+    """
+    with open(level_file) as file:
+        weight_line, *rows = file.read().split("\n")
+    weights = [int(weight) for weight in weight_line.split()]
+    walls, switches, stone_cells = set(), set(), []
+    ares = None
+    for row, line in enumerate(rows):
+        for col, char in enumerate(line):
+            if char == "#":
+                walls.add((row, col))
+            if char in "$*":
+                stone_cells.append((row, col))
+            if char in ".*+":
+                switches.add((row, col))
+            if char in "@+":
+                ares = (row, col)
+    stones = dict(zip(stone_cells, weights))
+
+    total = 0
+    for move in path:
+        delta_row, delta_col = MOVEMENTS[move.upper()]
+        cell = (ares[0] + delta_row, ares[1] + delta_col)
+        assert cell not in walls, f"walks into a wall: {path}"
+        if cell in stones:
+            assert move.isupper(), f"push written as a walk: {path}"
+            target = (cell[0] + delta_row, cell[1] + delta_col)
+            assert target not in walls and target not in stones, f"illegal push: {path}"
+            weight = stones.pop(cell)
+            stones[target] = weight
+            total += weight
+        else:
+            assert move.islower(), f"walk written as a push: {path}"
+        ares = cell
+    assert switches <= set(stones), f"not solved: {path}"
+    return total
+
+
+def load_grid(level_file: str):
+    """Parse a level file into a Grid."""
+    return IOHandler(level_file, None).load_from_file()
+
+
+@pytest.fixture
+def level_file(tmp_path):
+    """Write a level given as text to a file and return its path."""
+
+    def write(text: str) -> str:
+        path = tmp_path / "level.txt"
+        path.write_text(text)
+        return str(path)
+
+    return write
+
+
+@pytest.fixture(scope="session")
+def pattern_directory(tmp_path_factory):
+    """A pattern database directory of the test session, so tests do not write into the tree."""
+    return str(tmp_path_factory.mktemp("pattern_databases"))
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from conftest import LEVELS, load_grid, replay
+from Codes.algorithms.a_star import AStar
+from Codes.core.board import Board
+from Codes.solver import ALGORITHMS, GUARANTEES
+
+# Every optimization that narrows the search, turned off to get the reference costs
+PLAIN = {"macros": False, "packing": False, "symmetry": False}
+
+
+def create(name: str, grid, pattern_directory: str, **options):
+    """Build the search of an algorithm, keeping its pattern databases out of the tree."""
+    if issubclass(ALGORITHMS[name], AStar):
+        options["pattern_directory"] = pattern_directory
+    if name == "HDA*":
+        options["workers"] = 2
+    return ALGORITHMS[name](grid, instrumentation="off", **options)
+
+
+@pytest.mark.parametrize("name", list(ALGORITHMS))
+@pytest.mark.parametrize("level", LEVELS, ids=os.path.basename)
+def test_bundled_levels_are_solved(level, name, pattern_directory):
+    algorithm = create(name, load_grid(level), pattern_directory)
+    assert algorithm.search()
+    solution = algorithm.get_solution()
+    assert solution.status == "solved"
+    assert replay(level, solution.path) == solution.weight
+    assert len(solution.path) == solution.steps
+
+
+@pytest.mark.parametrize(
+    "name", [name for name, guarantee in GUARANTEES.items() if guarantee == "weight-optimal"]
+)
+@pytest.mark.parametrize("level", LEVELS, ids=os.path.basename)
+def test_weight_optimal_algorithms_match_ucs(level, name, pattern_directory):
+    reference = create("UCS", load_grid(level), pattern_directory, **PLAIN)
+    reference.search()
+    algorithm = create(name, load_grid(level), pattern_directory, **PLAIN)
+    algorithm.search()
+    assert algorithm.get_solution().weight == reference.get_solution().weight
+
+
+@pytest.mark.parametrize("name", list(ALGORITHMS))
+def test_no_search_narrows_itself_by_default(name, pattern_directory):
+    algorithm = create(name, load_grid(LEVELS[0]), pattern_directory)
+    assert not algorithm.board.macros
+    assert not algorithm.board.packing
+
+
+def test_boards_narrow_nothing_by_default():
+    board = Board(load_grid(LEVELS[0]))
+    assert not board.macros
+    assert not board.packing
+
+
+@pytest.mark.parametrize(
+    "name", [name for name, guarantee in GUARANTEES.items() if guarantee == "weight-optimal"]
+)
+@pytest.mark.parametrize("level", LEVELS, ids=os.path.basename)
+def test_weight_optimal_algorithms_match_ucs_with_default_options(level, name, pattern_directory):
+    reference = create("UCS", load_grid(level), pattern_directory, **PLAIN)
+    reference.search()
+    algorithm = create(name, load_grid(level), pattern_directory)
+    algorithm.search()
+    assert algorithm.get_solution().weight == reference.get_solution().weight
@@ -0,0 +1,54 @@
+from conftest import LEVELS, load_grid, replay
+from Codes.algorithms.anytime_a_star import AnytimeAStar
+
+
+def test_stopping_early_keeps_the_first_solution(pattern_directory):
+    level = LEVELS[2]
+    algorithm = AnytimeAStar(
+        load_grid(level), pattern_directory=pattern_directory, instrumentation="off"
+    )
+    improvements = algorithm.improvements()
+    first = next(improvements)
+    improvements.close()
+
+    solution = algorithm.get_solution()
+    assert solution.path == first.path
+    assert replay(level, solution.path) == solution.weight
+    assert algorithm.stop_reason == "cancelled"
+    assert not algorithm.optimal
+
+
+def test_running_to_completion_is_optimal(pattern_directory):
+    algorithm = AnytimeAStar(
+        load_grid(LEVELS[2]), pattern_directory=pattern_directory, instrumentation="off"
+    )
+    solutions = list(algorithm.improvements())
+    assert algorithm.optimal
+    assert algorithm.get_solution().weight == solutions[-1].weight == 504
+
+
+def test_an_incumbent_stopped_by_a_limit_is_not_proven(pattern_directory):
+    # On input-06 the first solution comes after 78 expansions and the proof after about 440
+    level = LEVELS[5]
+    algorithm = AnytimeAStar(
+        load_grid(level),
+        pattern_directory=pattern_directory,
+        instrumentation="off",
+        node_limit=100,
+    )
+    assert algorithm.search()
+    assert not algorithm.optimal
+
+    solution = algorithm.get_solution()
+    assert solution.status == "solved"
+    assert solution.stop_reason == "node_limit"
+    assert replay(level, solution.path) == solution.weight
+
+
+def test_a_finished_search_has_no_stop_reason(pattern_directory):
+    algorithm = AnytimeAStar(
+        load_grid(LEVELS[5]), pattern_directory=pattern_directory, instrumentation="off"
+    )
+    assert algorithm.search()
+    assert algorithm.optimal
+    assert algorithm.get_solution().stop_reason is None
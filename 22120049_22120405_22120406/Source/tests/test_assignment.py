@@ -0,0 +1,56 @@
+import os
+import random
+
+import numpy as np
+import pytest
+from scipy.optimize import linear_sum_assignment
+
+from conftest import LEVELS, load_grid
+from Codes.core.board import Board
+from Codes.heuristics.assignment import AssignmentHeuristic, push_distances
+
+# The levels with more than one stone, where the assignment is not trivial
+MULTI_STONE = [level for level in LEVELS if len(load_grid(level).stones) > 1]
+
+
+def reference(heuristic: AssignmentHeuristic, stones: tuple[int, ...]) -> int | float:
+    """Solve the assignment of a configuration from scratch with SciPy's Hungarian solver."""
+    costs = np.array(
+        [heuristic.cost_row(slot, cell) for slot, cell in enumerate(stones)], dtype=np.int64
+    )
+    rows, columns = linear_sum_assignment(costs)
+    total = int(costs[rows, columns].sum())
+    return total if total < AssignmentHeuristic.UNREACHABLE else float("inf")
+
+
+def random_pushes(board: Board, count: int, seed: int):
+    """Yield (parent_stones, children) for a seeded random walk of pushes from the initial state."""
+    generator = random.Random(seed)
+    position, stones = board.start_position, board.start_stones
+    for _ in range(count):
+        moves = list(board.push_successors(position, stones))
+        if not moves:
+            return
+        yield stones, [move[2] for move in moves]
+        _, position, stones, *_ = generator.choice(moves)
+
+
+@pytest.mark.parametrize("level", MULTI_STONE, ids=os.path.basename)
+def test_incremental_costs_match_a_full_solve(level):
+    board = Board(load_grid(level))
+    heuristic = AssignmentHeuristic(board, push_distances(board))
+    for parent, children in random_pushes(board, 40, seed=1):
+        assert heuristic.estimate(parent) == reference(heuristic, parent)
+        for child in children:
+            assert heuristic.estimate(child, parent) == reference(heuristic, child)
+    assert heuristic.incremental > 0
+
+
+@pytest.mark.parametrize("level", MULTI_STONE, ids=os.path.basename)
+def test_batched_costs_match_a_full_solve(level):
+    board = Board(load_grid(level))
+    heuristic = AssignmentHeuristic(board, push_distances(board))
+    for parent, children in random_pushes(board, 40, seed=2):
+        costs = heuristic.estimate_batch(children, parent)
+        assert costs == [reference(heuristic, child) for child in children]
+    assert heuristic.batched > 0
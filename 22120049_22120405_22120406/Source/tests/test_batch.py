@@ -0,0 +1,89 @@
+import csv
+import glob
+import json
+import multiprocessing
+import shutil
+
+import pytest
+
+from conftest import LEVELS, replay
+from Codes import batch
+
+pytestmark = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork", reason="needs forked tasks"
+)
+
+
+@pytest.fixture
+def levels(tmp_path):
+    """Copy two bundled levels into a directory of their own and return a glob of them."""
+    directory = tmp_path / "levels"
+    directory.mkdir()
+    for level in LEVELS[:2]:
+        shutil.copy(level, directory)
+    return str(directory / "*.txt")
+
+
+def run(levels: str, **limits) -> list[dict]:
+    """Solve the levels with BFS under the limits and return the results."""
+    return list(batch.BatchRunner(sorted(glob.glob(levels)), ["BFS"], 2, **limits).run())
+
+
+def read_jsonl(path) -> list[dict]:
+    with open(path) as file:
+        return [json.loads(line) for line in file]
+
+
+def test_results_are_written_as_jsonl(levels, tmp_path):
+    output = tmp_path / "results.jsonl"
+    assert batch.main([levels, "-a", "BFS", "DFS", "-w", "2", "-o", str(output)]) == 0
+
+    records = read_jsonl(output)
+    assert len(records) == 4
+    assert {(record["level"].rsplit("/", 1)[1], record["algorithm"]) for record in records} == {
+        (level.rsplit("/", 1)[1], name) for level in LEVELS[:2] for name in ("BFS", "DFS")
+    }
+    for record in records:
+        assert record["status"] == "solved"
+        assert record["stop_reason"] is None
+        assert replay(record["level"], record["path"]) == record["weight"]
+        assert record["wall_time"] > 0
+
+
+def test_results_are_written_as_csv(levels, tmp_path):
+    output = tmp_path / "results.csv"
+    assert batch.main([levels, "-a", "BFS", "-w", "2", "-o", str(output)]) == 0
+
+    with open(output, newline="") as file:
+        reader = csv.DictReader(file)
+        assert tuple(reader.fieldnames) == batch.FIELDS
+        rows = list(reader)
+    assert len(rows) == 2
+    for row in rows:
+        assert row["status"] == "solved"
+        assert replay(row["level"], row["path"]) == int(row["weight"])
+
+
+def test_format_overrides_the_extension(levels, tmp_path):
+    output = tmp_path / "results.txt"
+    assert batch.main([levels, "-a", "BFS", "-w", "2", "-f", "csv", "-o", str(output)]) == 0
+    with open(output) as file:
+        assert file.readline().strip() == ",".join(batch.FIELDS)
+
+
+def test_every_task_gets_the_time_limit(levels):
+    records = run(levels, time_limit=0.001)
+    assert [record["status"] for record in records] == ["timeout", "timeout"]
+    assert [record["stop_reason"] for record in records] == ["timeout", "timeout"]
+    # The searches stop by themselves, long before they would be killed
+    assert all(record["wall_time"] < batch.BatchRunner.KILL_GRACE * 1000 for record in records)
+
+
+def test_every_task_gets_the_memory_limit(levels):
+    records = run(levels, memory_limit=1)
+    assert [record["status"] for record in records] == ["memory_limit", "memory_limit"]
+
+
+def test_generous_limits_change_nothing(levels):
+    records = run(levels, time_limit=600, memory_limit=8192)
+    assert [record["status"] for record in records] == ["solved", "solved"]
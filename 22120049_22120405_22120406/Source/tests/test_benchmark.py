@@ -0,0 +1,73 @@
+import pytest
+
+from conftest import LEVELS, load_grid
+from Codes import benchmark
+from Codes.algorithms.bfs import BFS
+
+BASELINE = {
+    "input-01.txt A*": {
+        "status": "solved",
+        "node_count": 1000,
+        "median": 100.0,
+        "p95": 120.0,
+        "nodes_per_second": 10000.0,
+        "rss": 50.0,
+    },
+    "input-02.txt BFS": {"status": "timeout"},
+}
+
+
+def changed(**metrics) -> dict:
+    """The baseline with some metrics of the A* case replaced."""
+    return {**BASELINE, "input-01.txt A*": {**BASELINE["input-01.txt A*"], **metrics}}
+
+
+def test_results_within_the_threshold_are_no_regression():
+    results = changed(median=124.0, p95=149.0, rss=62.0, node_count=1249)
+    assert benchmark.compare(results, BASELINE, 0.25) == []
+
+
+@pytest.mark.parametrize("metric", ["median", "p95", "rss", "node_count"])
+def test_growth_beyond_the_threshold_is_a_regression(metric):
+    results = changed(**{metric: BASELINE["input-01.txt A*"][metric] * 1.3})
+    (message,) = benchmark.compare(results, BASELINE, 0.25)
+    assert message.startswith(f"input-01.txt A*: {metric} ")
+
+
+def test_faster_results_are_no_regression():
+    results = changed(median=10.0, p95=12.0, rss=5.0, node_count=100)
+    assert benchmark.compare(results, BASELINE, 0.0) == []
+
+
+def test_a_case_that_no_longer_finishes_is_a_regression():
+    results = {**BASELINE, "input-01.txt A*": {"status": "timeout"}}
+    assert benchmark.compare(results, BASELINE, 0.25) == ["input-01.txt A*: solved -> timeout"]
+
+
+def test_cases_that_did_not_finish_in_the_baseline_are_skipped():
+    results = {**BASELINE, "input-02.txt BFS": {"status": "error"}}
+    assert benchmark.compare(results, BASELINE, 0.25) == []
+
+
+def test_summary_of_the_timed_runs():
+    records = [
+        {"status": "solved", "node_count": 500, "time": time, "rss": rss}
+        for time, rss in ((30.0, 10.0), (10.0, 12.0), (20.0, None))
+    ]
+    summary = benchmark.Benchmark.summarize(records)
+    assert summary == {
+        "status": "solved",
+        "node_count": 500,
+        "median": 20.0,
+        "p95": 30.0,
+        "nodes_per_second": 25000.0,
+        "rss": 12.0,
+    }
+
+
+def test_generated_levels_are_solvable_and_reproducible(tmp_path):
+    (level,) = benchmark.build_corpus(LEVELS[:1], str(tmp_path))[1:]
+    with open(level) as file:
+        content = file.read()
+    assert content == benchmark.generate_level(LEVELS[0], benchmark.GENERATOR_SEED)
+    assert BFS(load_grid(level)).search()
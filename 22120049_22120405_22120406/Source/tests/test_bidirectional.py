@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from conftest import LEVELS, load_grid, replay
+from Codes.algorithms.bfs import BFS
+from Codes.algorithms.bidirectional import Bidirectional
+
+ROOM = "1 1\n#######\n#  .  #\n# $ $ #\n#. @  #\n#######\n"
+
+# The same room, with floor outside its walls that Ares can never reach
+PADDED = "1 1\n#######     \n#  .  #     \n# $ $ #     \n#. @  #     \n#######     \n"
+
+
+def solve(level: str) -> Bidirectional:
+    algorithm = Bidirectional(load_grid(level), instrumentation="off")
+    meetings = []
+    join = algorithm.join
+
+    def record(forward_node, backward_node):
+        meetings.append(backward_node)
+        return join(forward_node, backward_node)
+
+    algorithm.join = record
+    assert algorithm.search()
+    algorithm.meetings = meetings
+    return algorithm
+
+
+def shortest(level: str) -> int:
+    reference = BFS(load_grid(level), instrumentation="off")
+    assert reference.search()
+    return reference.get_solution().steps
+
+
+@pytest.mark.parametrize("level", LEVELS, ids=os.path.basename)
+def test_bundled_paths_are_shortest(level):
+    solution = solve(level).get_solution()
+    assert replay(level, solution.path) == solution.weight
+    assert solution.steps == shortest(level)
+
+
+def test_frontiers_meet_on_a_shortest_path(level_file):
+    level = level_file(ROOM)
+    algorithm = solve(level)
+    solution = algorithm.get_solution()
+    # The forward path was continued with the moves of a backward node
+    assert len(algorithm.meetings) == 1 and algorithm.meetings[0].parent is not None
+    assert replay(level, solution.path) == solution.weight
+    assert solution.steps == shortest(level)
+
+
+def test_backward_roots_are_reachable(level_file):
+    algorithm = Bidirectional(load_grid(level_file(PADDED)), instrumentation="off")
+    algorithm.create_goals()
+    board = algorithm.board
+    reachable = board.walk_distances(board.start_position, ())
+    assert algorithm.backward_seen
+    assert all(node.position in reachable for node in algorithm.backward_seen.values())
+
+
+def test_unreachable_floor_costs_no_expansions(level_file):
+    plain = solve(level_file(ROOM))
+    padded = solve(level_file(PADDED))
+    assert padded.get_solution().node_count == plain.get_solution().node_count
+    assert padded.get_solution().steps == plain.get_solution().steps
@@ -0,0 +1,69 @@
+import pytest
+
+from conftest import load_grid, replay
+from Codes.algorithms.a_star import AStar
+from Codes.algorithms.bfs import BFS
+from Codes.core.board import Board
+from Codes.core.deadlock import DeadlockDetector
+
+# Two stones, one switch against the top wall
+SURPLUS = "1 1\n#######\n#  .  #\n# $ $ #\n#  @  #\n#######\n"
+
+# Two stones, two switches
+EQUAL = "1 1\n#######\n#  .  #\n# $.$ #\n#  @  #\n#######\n"
+
+# Three stones, two switches
+WIDE_SURPLUS = "1 1 1\n#########\n#   .   #\n#  $*$  #\n#   @   #\n#########\n"
+
+
+# The spare stone has to be pushed into the dead pocket to clear the way
+DEAD_POCKET = "1 1\n#######\n#@    #\n# $$ .#\n## ####\n#######\n"
+
+
+def detector_for(level_file, text: str) -> DeadlockDetector:
+    return DeadlockDetector(Board(load_grid(level_file(text))))
+
+
+def test_block_with_a_surplus_stone_is_not_a_deadlock(level_file):
+    detector = detector_for(level_file, SURPLUS)
+    board = detector.board
+    # Both stones against the top wall, one of them on the switch: already solved
+    stones = (board.cell(1, 2), board.cell(1, 3))
+    assert board.is_goal(stones)
+    assert not detector.is_deadlock(stones, board.cell(1, 2))
+
+
+def test_freeze_with_a_surplus_stone_is_not_a_deadlock(level_file):
+    detector = detector_for(level_file, SURPLUS)
+    board = detector.board
+    # The stone on the switch freezes the other one against the wall
+    stones = (board.cell(1, 3), board.cell(1, 4))
+    assert not detector.is_freeze(set(stones), board.cell(1, 4))
+    assert not detector.is_deadlock(stones, board.cell(1, 4))
+
+
+def test_block_without_surplus_is_a_deadlock(level_file):
+    detector = detector_for(level_file, EQUAL)
+    board = detector.board
+    stones = (board.cell(1, 2), board.cell(1, 3))
+    assert detector.is_deadlock(stones, board.cell(1, 2))
+    assert detector.counts["block"] == 1
+
+
+def test_more_stuck_stones_than_the_surplus_is_a_deadlock(level_file):
+    detector = detector_for(level_file, WIDE_SURPLUS)
+    board = detector.board
+    assert detector.surplus == 1
+    # Two stones off the switches, stuck against the wall side by side
+    stones = (board.cell(1, 5), board.cell(1, 6), board.cell(2, 4))
+    assert detector.is_deadlock(stones, board.cell(1, 5))
+
+
+@pytest.mark.parametrize("search", [BFS, AStar], ids=lambda search: search.__name__)
+@pytest.mark.parametrize("push_level", [False, True], ids=["step", "push"])
+def test_surplus_stone_can_be_pushed_onto_a_dead_square(search, push_level, level_file, tmp_path):
+    level = level_file(DEAD_POCKET)
+    options = {"pattern_directory": str(tmp_path)} if search is AStar else {}
+    algorithm = search(load_grid(level), push_level=push_level, instrumentation="off", **options)
+    assert algorithm.search()
+    assert replay(level, algorithm.get_solution().path) == 3
@@ -0,0 +1,44 @@
+import multiprocessing
+import os
+
+import pytest
+
+from conftest import LEVELS, load_grid
+from Codes.algorithms import hda_star
+from Codes.algorithms.hda_star import HDAStar
+
+# The workers only see a patched HDAWorker when they are forked
+pytestmark = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork", reason="needs forked workers"
+)
+
+
+def create(pattern_directory: str) -> HDAStar:
+    return HDAStar(
+        load_grid(LEVELS[1]),
+        workers=2,
+        pattern_directory=pattern_directory,
+        instrumentation="off",
+    )
+
+
+def test_worker_error_is_raised(monkeypatch, pattern_directory):
+    def fail(self):
+        raise ValueError("broken worker")
+
+    monkeypatch.setattr(hda_star.HDAWorker, "run", fail)
+    with pytest.raises(RuntimeError, match="broken worker"):
+        create(pattern_directory).search()
+
+
+def test_worker_exit_is_raised(monkeypatch, pattern_directory):
+    run = hda_star.HDAWorker.run
+
+    def crash(self):
+        if self.index == 1:
+            os._exit(3)
+        run(self)
+
+    monkeypatch.setattr(hda_star.HDAWorker, "run", crash)
+    with pytest.raises(RuntimeError, match="worker 1 exited with code 3"):
+        create(pattern_directory).search()
@@ -0,0 +1,80 @@
+import tracemalloc
+
+import pytest
+
+from conftest import LEVELS, load_grid
+from Codes.algorithms.a_star import AStar
+from Codes.algorithms.bfs import BFS
+from Codes.profiling.instrumentation import (
+    INSTRUMENTATION_MODES,
+    Instrumentation,
+    RSSInstrumentation,
+    TracemallocInstrumentation,
+    create_instrumentation,
+)
+
+
+@pytest.mark.parametrize("mode", list(INSTRUMENTATION_MODES))
+def test_every_mode_is_created_by_name(mode):
+    instrumentation = create_instrumentation(mode)
+    assert type(instrumentation) is INSTRUMENTATION_MODES[mode]
+    assert instrumentation.name == mode
+
+
+def test_an_unknown_mode_is_refused():
+    with pytest.raises(ValueError):
+        create_instrumentation("perf")
+    with pytest.raises(ValueError):
+        BFS(load_grid(LEVELS[0]), instrumentation="perf")
+
+
+def test_off_measures_nothing():
+    instrumentation = Instrumentation()
+    instrumentation.start()
+    data = bytearray(8 * 1024 * 1024)
+    assert instrumentation.current() == 0.0
+    assert instrumentation.stop() == 0.0
+    del data
+
+
+def test_rss_reads_the_resident_set_size():
+    instrumentation = RSSInstrumentation()
+    instrumentation.start()
+    assert instrumentation.current() > 0.0
+    assert instrumentation.stop() >= 0.0
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracemalloc_measures_the_peak_and_stops_tracing():
+    instrumentation = TracemallocInstrumentation()
+    instrumentation.start()
+    data = bytearray(8 * 1024 * 1024)
+    assert instrumentation.current() >= 8.0
+    del data
+    assert instrumentation.stop() >= 8.0
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracemalloc_leaves_tracing_started_by_someone_else_on():
+    tracemalloc.start()
+    try:
+        instrumentation = TracemallocInstrumentation()
+        instrumentation.start()
+        instrumentation.stop()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("algorithm", [BFS, AStar])
+def test_searches_report_the_memory_of_their_mode(algorithm, pattern_directory):
+    options = {"pattern_directory": pattern_directory} if algorithm is AStar else {}
+    memory = {}
+    for mode in INSTRUMENTATION_MODES:
+        search = algorithm(load_grid(LEVELS[0]), instrumentation=mode, **options)
+        assert search.search()
+        memory[mode] = search.get_solution().memory
+    assert memory["off"] == 0.0
+    assert memory["rss"] >= 0.0
+    assert memory["tracemalloc"] > 0.0
+    assert not tracemalloc.is_tracing()
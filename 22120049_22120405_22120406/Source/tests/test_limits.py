@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from conftest import LEVELS, load_grid, replay
+from Codes.algorithms.cancellation import CancellationToken
+from Codes.solver import ALGORITHMS
+
+# input-05 keeps every search busy well past its first limit checks
+BUSY_LEVEL = LEVELS[4]
+
+
+def create(name: str, level: str, pattern_directory: str, **limits):
+    options = {}
+    if name in ("A*", "IDA*", "Anytime A*", "HDA*"):
+        options["pattern_directory"] = pattern_directory
+    if name == "HDA*":
+        options["workers"] = 2
+    return ALGORITHMS[name](load_grid(level), **options, **limits)
+
+
+def stopped(search, status: str) -> None:
+    """Check that a search stopped early for a reason and reports it."""
+    assert not search.search()
+    assert search.stop_reason == status
+    solution = search.get_solution()
+    assert solution.status == status
+    assert solution.path == ""
+
+
+@pytest.mark.parametrize("name", list(ALGORITHMS))
+def test_a_cancelled_token_stops_the_search(name, pattern_directory):
+    token = CancellationToken()
+    token.cancel()
+    stopped(create(name, LEVELS[0], pattern_directory, cancel_token=token), "cancelled")
+
+
+@pytest.mark.parametrize("name", [name for name in ALGORITHMS if name != "HDA*"])
+def test_the_node_limit_stops_the_search(name, pattern_directory):
+    search = create(name, BUSY_LEVEL, pattern_directory, node_limit=10)
+    stopped(search, "node_limit")
+    assert search.node_count == 10
+
+
+@pytest.mark.parametrize("name", list(ALGORITHMS))
+def test_a_spent_time_limit_stops_the_search(name, pattern_directory):
+    stopped(create(name, LEVELS[0], pattern_directory, time_limit=0.0), "timeout")
+
+
+@pytest.mark.parametrize("name", list(ALGORITHMS))
+def test_the_memory_limit_stops_the_search(name, pattern_directory):
+    # Any process already uses more than 1 MB
+    stopped(create(name, LEVELS[0], pattern_directory, memory_limit=1), "memory_limit")
+
+
+def test_cancellation_from_another_thread():
+    token = CancellationToken()
+    search = create("BFS", BUSY_LEVEL, "", cancel_token=token)
+    timer = threading.Timer(0.2, token.cancel)
+    timer.start()
+    start = time.perf_counter()
+    try:
+        stopped(search, "cancelled")
+    finally:
+        timer.cancel()
+    assert time.perf_counter() - start < 5.0
+
+
+def test_the_time_limit_is_a_budget():
+    search = create("BFS", BUSY_LEVEL, "", time_limit=0.3)
+    start = time.perf_counter()
+    stopped(search, "timeout")
+    assert time.perf_counter() - start < 5.0
+    assert search.node_count > 0
+
+
+@pytest.mark.parametrize("name", [name for name in ALGORITHMS if name != "HDA*"])
+def test_generous_limits_change_nothing(name, pattern_directory):
+    token = CancellationToken()
+    limits = {"time_limit": 600, "node_limit": 10**7, "memory_limit": 10**6, "cancel_token": token}
+    search = create(name, LEVELS[0], pattern_directory, **limits)
+    assert search.search()
+    solution = search.get_solution()
+    assert solution.status == "solved"
+    assert replay(LEVELS[0], solution.path) == solution.weight
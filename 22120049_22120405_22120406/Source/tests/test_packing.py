@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from conftest import LEVELS, load_grid, replay
+from Codes.algorithms.a_star import AStar
+from Codes.algorithms.bfs import BFS
+from Codes.algorithms.bidirectional import Bidirectional
+from Codes.algorithms.dfs import DFS
+from Codes.algorithms.ucs import UCS
+from Codes.core.board import Board
+
+# The upper switch can only be filled with Ares standing on the lower one, which is walled in on two
+# sides: a stone resting there is frozen for good. The stone next to the lower switch has to wait until
+# the other one was pushed along the upper corridor and up onto the upper switch.
+FROZEN = "1 1\n########\n#.######\n#    $ #\n#.  $ @#\n########\n"
+
+# The same blocking switches, but a stone on the lower one can still be pushed off to the right. Ares
+# starts boxed in behind the other stone, which crosses the lower switch while the upper one is empty.
+CROSSING = "1 1\n#########\n###.#####\n### $   #\n#@$.    #\n#########\n"
+
+SEARCHES = [
+    (BFS, {}),
+    (BFS, {"push_level": True}),
+    (Bidirectional, {}),
+    (DFS, {}),
+    (UCS, {}),
+]
+SEARCH_IDS = ["BFS", "BFS-push", "Bidirectional", "DFS", "UCS"]
+
+
+def test_a_frozen_switch_waits_for_the_switches_it_blocks(level_file):
+    board = Board(load_grid(level_file(FROZEN)), packing=True)
+    lower, upper = board.cell(3, 1), board.cell(1, 1)
+    assert board.is_frozen(lower)
+    assert board.packing_prerequisites == {lower: (upper,)}
+
+    waiting = (board.cell(3, 2), board.cell(2, 3))
+    assert board.breaks_packing((lower, board.cell(2, 3)), lower)
+    assert not board.breaks_packing((lower, upper), lower)
+    assert not board.breaks_packing(waiting, board.cell(3, 2))
+
+
+def test_a_switch_a_stone_can_leave_has_no_prerequisites(level_file):
+    board = Board(load_grid(level_file(CROSSING)), packing=True)
+    lower = board.cell(3, 3)
+    assert not board.is_frozen(lower)
+    assert board.packing_prerequisites == {}
+    assert not board.breaks_packing((board.cell(2, 4), lower), lower)
+
+
+def test_packing_is_checked_only_when_asked(level_file):
+    board = Board(load_grid(level_file(FROZEN)))
+    lower = board.cell(3, 1)
+    assert not board.packing
+    assert not board.breaks_packing((lower, board.cell(2, 3)), lower)
+
+
+@pytest.mark.parametrize("level", [FROZEN, CROSSING], ids=["frozen", "crossing"])
+@pytest.mark.parametrize("search, options", SEARCHES, ids=SEARCH_IDS)
+def test_packing_keeps_the_solution(search, options, level, level_file):
+    level = level_file(level)
+    plain = search(load_grid(level), instrumentation="off", **options)
+    packing = search(load_grid(level), packing=True, instrumentation="off", **options)
+    assert plain.search() and packing.search()
+
+    solution = packing.get_solution()
+    assert replay(level, solution.path) == solution.weight
+    if search is not DFS:
+        expected = plain.get_solution()
+        assert (solution.steps, solution.weight) == (expected.steps, expected.weight)
+
+
+@pytest.mark.parametrize("search, options", SEARCHES[:2], ids=SEARCH_IDS[:2])
+def test_frozen_pushes_are_pruned(search, options, level_file):
+    algorithm = search(load_grid(level_file(FROZEN)), packing=True, **options)
+    assert algorithm.search()
+    assert algorithm.get_solution().deadlocks["packing"] > 0
+
+
+@pytest.mark.parametrize("level", LEVELS, ids=os.path.basename)
+def test_packing_keeps_optimal_costs_on_the_bundled_levels(level, pattern_directory):
+    reference = UCS(load_grid(level), instrumentation="off")
+    reference.search()
+    algorithm = AStar(
+        load_grid(level), packing=True, pattern_directory=pattern_directory, instrumentation="off"
+    )
+    algorithm.search()
+    assert algorithm.get_solution().weight == reference.get_solution().weight
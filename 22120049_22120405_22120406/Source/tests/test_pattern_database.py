@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from conftest import load_grid, replay
+from Codes.algorithms.a_star import AStar
+from Codes.algorithms.anytime_a_star import AnytimeAStar
+from Codes.algorithms.hda_star import HDAStar
+from Codes.algorithms.ida_star import IDAStar
+from Codes.core.board import Board
+from Codes.heuristics.pattern_database import PatternDatabase
+
+HEURISTIC_SEARCHES = [AStar, IDAStar, AnytimeAStar, HDAStar]
+
+# A solved stone in a pocket Ares cannot reach
+SEALED_POCKET = "1\n#####\n#   #\n##@ #\n# ###\n#* ##\n#####\n"
+
+# A stone Ares cannot reach, off its switch
+CUT_OFF = "1 1\n########\n#@$  . #\n########\n#$    .#\n########\n"
+
+
+def create(search, level: str, pattern_directory: str):
+    options = {"workers": 2} if search is HDAStar else {}
+    return search(
+        load_grid(level), pattern_directory=pattern_directory, instrumentation="off", **options
+    )
+
+
+@pytest.mark.parametrize("search", HEURISTIC_SEARCHES, ids=lambda search: search.__name__)
+def test_unreachable_solved_stone(search, level_file, pattern_directory):
+    level = level_file(SEALED_POCKET)
+    assert PatternDatabase.for_board(Board(load_grid(level)), pattern_directory) is None
+    algorithm = create(search, level, pattern_directory)
+    assert algorithm.search()
+    assert algorithm.get_solution().path == ""
+
+
+@pytest.mark.parametrize("search", HEURISTIC_SEARCHES, ids=lambda search: search.__name__)
+def test_unreachable_stone_off_switch(search, level_file, pattern_directory):
+    algorithm = create(search, level_file(CUT_OFF), pattern_directory)
+    assert not algorithm.search()
+    assert algorithm.get_solution().status == "failed"
+
+
+def test_databases_are_built_when_the_search_starts(level_file, tmp_path):
+    level = level_file("1 2\n#######\n#@$ . #\n# $ . #\n#######\n")
+    directory = str(tmp_path / "databases")
+    algorithm = AStar(load_grid(level), pattern_directory=directory)
+    assert not os.path.exists(directory)
+    assert algorithm.search()
+    assert os.listdir(directory)
+    assert replay(level, algorithm.get_solution().path) == algorithm.get_solution().weight
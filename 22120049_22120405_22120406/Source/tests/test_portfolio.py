@@ -0,0 +1,167 @@
+import multiprocessing
+import time
+
+import pytest
+
+from conftest import LEVELS, replay
+from Codes import solver
+from Codes.algorithms.base_search import Solution
+from Codes.custom_io.solution_cache import SolutionCache
+from Codes.heuristics.pattern_database import PatternDatabase
+from Codes.solver import Portfolio
+
+# The members only see the patched ALGORITHMS when they are forked
+pytestmark = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork", reason="needs forked members"
+)
+
+
+class WaitForCancel:
+    """A member that never finishes on its own, and leaves a marker once it was cancelled."""
+
+    def __init__(self, grid, cancel_token=None, marker=None, **kwargs):
+        self.cancel_token = cancel_token
+        self.marker = marker
+
+    def search(self) -> bool:
+        while not self.cancel_token.cancelled:
+            time.sleep(0.01)
+        with open(self.marker, "w") as file:
+            file.write("cancelled")
+        return False
+
+    def get_solution(self) -> Solution:
+        return Solution(0, 0, 0, 0.0, 0.0, "", status="cancelled")
+
+
+@pytest.fixture
+def waiting_member(monkeypatch):
+    monkeypatch.setitem(solver.ALGORITHMS, "Wait", WaitForCancel)
+    monkeypatch.setitem(solver.GUARANTEES, "Wait", "any")
+
+
+def test_losers_are_cancelled_cooperatively(waiting_member, tmp_path, pattern_directory):
+    marker = str(tmp_path / "marker")
+    a_star = ("A*", {"pattern_directory": pattern_directory})
+    waiting = ("Wait", {"marker": marker})
+    portfolio = Portfolio(LEVELS[1], "weight-optimal", [a_star, waiting])
+
+    winner, solution = portfolio.run()
+    assert winner == solver.member_label(*a_star)
+    assert replay(LEVELS[1], solution.path) == solution.weight
+    assert solution.members[solver.member_label(*waiting)]["status"] == "cancelled"
+    with open(marker) as file:
+        assert file.read() == "cancelled"
+
+
+def test_members_are_raced_with_their_options(pattern_directory):
+    members = [
+        ("A*", {"pattern_directory": pattern_directory, "macros": False}),
+        ("A*", {"pattern_databases": False}),
+    ]
+    winner, solution = Portfolio(LEVELS[1], "weight-optimal", members).run()
+    assert winner in {solver.member_label(*member) for member in members}
+    assert solution.weight == 39
+
+
+def test_duplicate_members_are_refused():
+    with pytest.raises(ValueError, match="Duplicate"):
+        Portfolio(LEVELS[1], "any", ["A*", ("A*", {})])
+
+
+def test_race_timeout_cancels_the_members(waiting_member, tmp_path):
+    marker = str(tmp_path / "marker")
+    portfolio = Portfolio(LEVELS[1], "any", [("Wait", {"marker": marker})], time_limit=0.2)
+    winner, solution = portfolio.run()
+    assert winner is None
+    assert solution.status == "timeout"
+    with open(marker) as file:
+        assert file.read() == "cancelled"
+
+
+def test_narrowing_options_void_the_guarantee_of_a_member():
+    member = ("A*", {"macros": True})
+    portfolio = Portfolio(LEVELS[1], "weight-optimal", ["UCS", member])
+    assert portfolio.guarantee_of("UCS") == "weight-optimal"
+    assert portfolio.guarantee_of(solver.member_label(*member)) == "any"
+    assert not portfolio.qualifies(solver.member_label(*member))
+
+
+def test_packing_keeps_the_guarantee_of_a_member():
+    member = ("A*", {"packing": True})
+    portfolio = Portfolio(LEVELS[1], "weight-optimal", [member])
+    assert portfolio.guarantee_of(solver.member_label(*member)) == "weight-optimal"
+
+
+def test_solver_passes_its_limits_to_the_members(tmp_path, pattern_directory):
+    a_star = ("A*", {"pattern_directory": pattern_directory})
+    solver_ = solver.Solver(
+        "PORTFOLIO",
+        LEVELS[1],
+        str(tmp_path / "output.txt"),
+        members=[a_star],
+        node_limit=1,
+    )
+    solution = solver_.run()
+    assert solution.status == "failed"
+    assert solution.members[solver.member_label(*a_star)]["status"] == "node_limit"
+
+
+@pytest.mark.parametrize("instrumentation", ["off", "tracemalloc"])
+def test_solver_passes_its_instrumentation_to_the_members(
+    instrumentation, tmp_path, pattern_directory
+):
+    solver_ = solver.Solver(
+        "PORTFOLIO",
+        LEVELS[1],
+        str(tmp_path / "output.txt"),
+        members=[("A*", {"pattern_directory": pattern_directory})],
+        instrumentation=instrumentation,
+    )
+    solution = solver_.run()
+    assert solution.status == "solved"
+    assert (solution.memory > 0.0) == (instrumentation == "tracemalloc")
+
+
+def test_solver_refuses_an_observer_for_a_portfolio(tmp_path):
+    solver_ = solver.Solver(
+        "PORTFOLIO", LEVELS[1], str(tmp_path / "output.txt"), observer=lambda sample: None
+    )
+    with pytest.raises(ValueError, match="observer"):
+        solver_.run()
+
+
+@pytest.mark.parametrize("guarantee", ["any", "weight-optimal"])
+def test_an_unproven_incumbent_only_wins_without_a_guarantee(guarantee, pattern_directory):
+    # On input-06 Anytime A* finds a solution after 78 expansions and proves it after about 440
+    anytime = ("Anytime A*", {"pattern_directory": pattern_directory})
+    members = [anytime, ("UCS", {"time_limit": 0.0})]
+    winner, solution = Portfolio(
+        LEVELS[5], guarantee, members, search_options={"node_limit": 100}
+    ).run()
+
+    label = solver.member_label(*anytime)
+    if guarantee == "any":
+        assert winner == label
+        assert solution.stop_reason == "node_limit"
+        assert replay(LEVELS[5], solution.path) == solution.weight
+    else:
+        assert winner is None
+        assert solution.status == "failed"
+        assert solution.members[label]["status"] == "node_limit"
+        assert solution.members[label]["weight"] > 0
+
+
+def test_solver_does_not_cache_an_unproven_incumbent(tmp_path, pattern_directory, monkeypatch):
+    monkeypatch.setattr(PatternDatabase, "DEFAULT_DIRECTORY", pattern_directory)
+    with SolutionCache(str(tmp_path / "cache.sqlite")) as cache:
+        solver_ = solver.Solver(
+            "Anytime A*", LEVELS[5], str(tmp_path / "output.txt"), node_limit=100, cache=cache
+        )
+        solution = solver_.run()
+        assert solution.status == "solved"
+        assert solution.stop_reason == "node_limit"
+        assert cache.lookup(LEVELS[5], "Anytime A*") is None
+
+        cache.store(LEVELS[5], "Anytime A*", "weight-optimal", solution)
+        assert cache.lookup_guarantee(LEVELS[5], "any") is None
@@ -0,0 +1,110 @@
+import pytest
+
+from conftest import LEVELS, load_grid, replay
+from Codes.algorithms.a_star import AStar
+from Codes.algorithms.base_search import Solution
+from Codes.custom_io.solution_cache import (
+    SYMMETRIES,
+    STONE_CHARS,
+    SolutionCache,
+    canonical_level,
+    transform_cell,
+    transform_rows,
+)
+
+LEVEL = LEVELS[8]  # Four stones of different weights
+
+
+def transformed_level(text: str, symmetry: tuple) -> str:
+    """Rotate or reflect a level, keeping each weight with its stone."""
+    weight_line, _, grid_text = text.partition("\n")
+    lines = grid_text.rstrip("\n").split("\n")
+    width = max(len(line) for line in lines)
+    rows = [line.ljust(width) for line in lines]
+    height = len(rows)
+    stones = [
+        (row, col)
+        for row, line in enumerate(rows)
+        for col, char in enumerate(line)
+        if char in STONE_CHARS
+    ]
+    cells = [transform_cell(cell, height, width, symmetry) for cell in stones]
+    weights = [weight for _, weight in sorted(zip(cells, weight_line.split()))]
+    return " ".join(weights) + "\n" + "\n".join(transform_rows(rows, symmetry)) + "\n"
+
+
+@pytest.fixture(scope="module")
+def solution(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("pattern_databases"))
+    search = AStar(load_grid(LEVEL), pattern_directory=directory, instrumentation="off")
+    assert search.search()
+    return search.get_solution()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with SolutionCache(str(tmp_path / "cache.sqlite")) as cache:
+        yield cache
+
+
+@pytest.mark.parametrize("symmetry", SYMMETRIES)
+def test_a_solution_is_found_under_every_symmetry(symmetry, solution, cache, level_file):
+    cache.store(LEVEL, "A*", "weight-optimal", solution)
+    with open(LEVEL) as file:
+        level = level_file(transformed_level(file.read(), symmetry))
+
+    hit = cache.lookup(level, "A*")
+    assert hit is not None and hit.cached
+    assert (hit.steps, hit.weight) == (solution.steps, solution.weight)
+    assert replay(level, hit.path) == solution.weight
+
+    algorithm, hit = cache.lookup_guarantee(level, "weight-optimal")
+    assert algorithm == "A*"
+    assert replay(level, hit.path) == solution.weight
+
+
+@pytest.mark.parametrize("symmetry", SYMMETRIES)
+def test_a_solution_stored_for_an_image_maps_back(symmetry, solution, cache, level_file):
+    with open(LEVEL) as file:
+        image = level_file(transformed_level(file.read(), symmetry))
+    # Solved again on the image, so the stored path goes through the image's own symmetry
+    search = AStar(load_grid(image), pattern_databases=False, instrumentation="off")
+    assert search.search()
+    cache.store(image, "A*", "weight-optimal", search.get_solution())
+
+    hit = cache.lookup(LEVEL, "A*")
+    assert replay(LEVEL, hit.path) == solution.weight
+
+
+def test_padding_does_not_change_the_key():
+    with open(LEVEL) as file:
+        text = file.read()
+    weight_line, _, grid_text = text.partition("\n")
+    rows = ["  " + line + "   " for line in grid_text.split("\n")]
+    padded = weight_line + "\n\n" + "\n".join(rows)
+    assert canonical_level(padded)[0] == canonical_level(text)[0]
+
+
+def test_weights_are_part_of_the_key():
+    with open(LEVEL) as file:
+        text = file.read()
+    weight_line, _, grid_text = text.partition("\n")
+    reordered = " ".join(reversed(weight_line.split())) + "\n" + grid_text
+    assert len(set(weight_line.split())) > 1
+    assert canonical_level(reordered)[0] != canonical_level(text)[0]
+
+
+def test_least_recently_used_solutions_are_evicted(tmp_path, solution):
+    with SolutionCache(str(tmp_path / "cache.sqlite"), max_entries=2) as cache:
+        for name in ("A*", "UCS", "IDA*"):
+            cache.store(LEVEL, name, "weight-optimal", solution)
+        assert cache.lookup(LEVEL, "A*") is None
+        assert cache.lookup(LEVEL, "UCS") is not None
+        assert cache.lookup(LEVEL, "IDA*") is not None
+
+
+def test_failed_solutions_do_not_answer_a_guarantee(cache):
+    failed = Solution(0, 0, 100, 1.0, 0.0, "", status="failed")
+    cache.store(LEVEL, "UCS", "weight-optimal", failed)
+    assert cache.lookup(LEVEL, "UCS").status == "failed"
+    assert cache.lookup_guarantee(LEVEL, "any") is None
@@ -0,0 +1,68 @@
+import pytest
+
+from conftest import load_grid, replay
+from Codes.algorithms.bfs import BFS
+from Codes.algorithms.ucs import UCS
+
+# An open square room with the switch in the middle: all 8 rotations and reflections map it onto itself
+SQUARE = "1\n#######\n#     #\n# $   #\n#  .  #\n#   @ #\n#     #\n#######\n"
+
+
+def keys(search, states) -> set[int]:
+    """Hash states given as (Ares' cell, stone cells) in (row, col) form."""
+    board = search.board
+    result = set()
+    for ares, stones in states:
+        position = board.cell(*ares)
+        stones = tuple(board.cell(*stone) for stone in stones)
+        region = board.normalize(position, stones) if search.push_level else position
+        result.add(search.state_key(position, stones, region))
+    return result
+
+
+# Ares on the center of the room, which every symmetry fixes, so step-level states are symmetric too
+CENTER = (3, 3)
+
+# A stone next to a corner of the room, and its images under the rotations and reflections
+IMAGES = [(CENTER, [stone]) for stone in ((2, 2), (2, 4), (4, 2), (4, 4))]
+
+
+def test_symmetry_is_opt_in(level_file):
+    grid = load_grid(level_file(SQUARE))
+    search = BFS(grid)
+    assert len(search.board.automorphisms) == 7
+    assert not search.symmetry
+    assert len(keys(search, IMAGES)) == len(IMAGES)
+
+
+@pytest.mark.parametrize("push_level", [True, False])
+def test_symmetric_states_share_one_key(push_level, level_file):
+    search = BFS(load_grid(level_file(SQUARE)), push_level=push_level, symmetry=True)
+    assert len(keys(search, IMAGES)) == 1
+
+
+@pytest.mark.parametrize("push_level", [True, False])
+def test_other_states_keep_their_own_key(push_level, level_file):
+    search = BFS(load_grid(level_file(SQUARE)), push_level=push_level, symmetry=True)
+    states = [(CENTER, [stone]) for stone in ((2, 2), (2, 3), (3, 2), (1, 1))]
+    # (2, 3) and (3, 2) are images of each other; the others are not
+    assert len(keys(search, states)) == 3
+
+
+def test_push_level_keys_ignore_where_ares_stands_in_his_region(level_file):
+    search = UCS(load_grid(level_file(SQUARE)), symmetry=True)
+    assert len(keys(search, [((5, 5), [(2, 2)]), ((1, 5), [(2, 2)]), ((5, 1), [(4, 4)])])) == 1
+
+
+@pytest.mark.parametrize("algorithm", [BFS, UCS])
+def test_symmetry_keeps_the_solution_and_saves_expansions(algorithm, level_file):
+    level = level_file(SQUARE)
+    plain = algorithm(load_grid(level))
+    symmetric = algorithm(load_grid(level), symmetry=True)
+    assert plain.search() and symmetric.search()
+
+    solution = symmetric.get_solution()
+    expected = plain.get_solution()
+    assert (solution.steps, solution.weight) == (expected.steps, expected.weight)
+    assert replay(level, solution.path) == solution.weight
+    assert symmetric.node_count < plain.node_count
@@ -0,0 +1,80 @@
+import csv
+import json
+
+import pytest
+
+from conftest import LEVELS, load_grid
+from Codes.profiling.telemetry import TelemetrySampler
+from Codes.solver import ALGORITHMS
+
+SAMPLE_KEYS = {
+    "node_count",
+    "elapsed",
+    "frontier",
+    "visited",
+    "best_f",
+    "nodes_per_second",
+    "memory",
+    "deadlocks",
+    "finished",
+}
+
+
+def observed_search(name: str, observer, pattern_directory: str, observe_every: int = 10):
+    options = {}
+    if name in ("A*", "IDA*", "Anytime A*"):
+        options["pattern_directory"] = pattern_directory
+    if name == "HDA*":
+        options["workers"] = 2
+    search = ALGORITHMS[name](
+        load_grid(LEVELS[0]), observer=observer, observe_every=observe_every, **options
+    )
+    assert search.search()
+    return search
+
+
+@pytest.mark.parametrize("name", [name for name in ALGORITHMS if name != "HDA*"])
+def test_samples_arrive_at_the_configured_rate(name, pattern_directory):
+    samples = []
+    search = observed_search(name, samples.append, pattern_directory)
+
+    *live, last = samples
+    assert all(sample.keys() == SAMPLE_KEYS for sample in samples)
+    assert [sample["node_count"] for sample in live] == list(
+        range(10, search.node_count + 1, 10)
+    )
+    assert not any(sample["finished"] for sample in live)
+    assert last["finished"]
+    assert last["node_count"] == search.get_solution().node_count
+
+
+def test_hda_star_only_sends_the_final_sample(pattern_directory):
+    samples = []
+    search = observed_search("HDA*", samples.append, pattern_directory)
+    (last,) = samples
+    assert last["finished"]
+    assert last["node_count"] == search.node_count
+
+
+def test_no_observer_costs_no_samples():
+    search = ALGORITHMS["BFS"](load_grid(LEVELS[0]), observe_every=1)
+    assert search.search()
+    assert search.next_observation == float("inf")
+
+
+@pytest.mark.parametrize("extension", ["jsonl", "csv"])
+def test_sampler_writes_a_time_series(extension, tmp_path, pattern_directory):
+    path = str(tmp_path / f"telemetry.{extension}")
+    with TelemetrySampler(path) as sampler:
+        search = observed_search("BFS", sampler, pattern_directory, observe_every=100)
+
+    with open(path, newline="") as file:
+        if extension == "csv":
+            rows = list(csv.DictReader(file))
+        else:
+            rows = [json.loads(line) for line in file]
+    assert len(rows) == search.node_count // 100 + 1
+    assert "deadlocks" not in rows[0]
+    assert any(key.startswith("deadlock_") for key in rows[0])
+    assert int(rows[-1]["node_count"]) == search.node_count
+    assert rows[-1]["finished"] in (True, "True")